@@ -0,0 +1,110 @@
+"""
+bench_fission.py
+
+Local harness for the Fission function in ``functions/fission/klingon_serial``.
+Measures the cold start of a fresh interpreter importing ``app`` and serving
+its first invocation, then the warm latency of further invocations for a
+range of ``count`` values:
+
+    python benchmarks/bench_fission.py
+    python benchmarks/bench_fission.py --cold 20 --counts 1 100 10000
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "functions" / "fission" / "klingon_serial" / "app.py"
+sys.path.insert(0, str(ROOT))
+
+# Run in a fresh interpreter: load the app as Fission does, invoke it once and
+# report both phases in seconds.
+COLD_START = f"""
+import time
+start = time.perf_counter()
+import importlib.util, json
+spec = importlib.util.spec_from_file_location("app", {str(APP)!r})
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+loaded = time.perf_counter()
+app.main()
+print(json.dumps([loaded - start, time.perf_counter() - loaded]))
+"""
+
+
+def load_app():
+    """Load the Fission app module from its file.
+
+    Returns:
+        module: The ``app`` module.
+    """
+    spec = importlib.util.spec_from_file_location("app", APP)
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    return app
+
+
+def cold_start(runs):
+    """Start `runs` fresh interpreters that load the app and invoke it once.
+
+    Args:
+        runs (int): Number of interpreters to start.
+
+    Returns:
+        tuple: Median seconds for the whole process, for loading the app and for the first invocation.
+    """
+    environment = dict(os.environ, PYTHONPATH=str(ROOT))
+    processes, loads, firsts = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", COLD_START], capture_output=True, text=True, check=True, env=environment)
+        processes.append(time.perf_counter() - start)
+        load, first = json.loads(result.stdout)
+        loads.append(load)
+        firsts.append(first)
+    return statistics.median(processes), statistics.median(loads), statistics.median(firsts)
+
+
+def warm(app, count, invocations):
+    """Invoke a warm app repeatedly.
+
+    Args:
+        app (module): The loaded ``app`` module.
+        count (int): The ``count`` parameter, or None for a single serial.
+        invocations (int): Number of invocations to time.
+
+    Returns:
+        float: Mean seconds per invocation.
+    """
+    event = {} if count is None else {"count": str(count)}
+    main = app.main
+    start = time.perf_counter()
+    for _ in range(invocations):
+        main(None, event)
+    return (time.perf_counter() - start) / invocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start and warm latency of the Fission function.")
+    parser.add_argument("--cold", type=int, default=10, help="Fresh interpreters to start for the cold start.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 100, 1000, 10000], help="Values of the count parameter to measure warm.")
+    parser.add_argument("--serials", type=int, default=200_000, help="Serials generated per warm measurement.")
+    args = parser.parse_args()
+
+    process, load, first = cold_start(args.cold)
+    print(f"cold start (median of {args.cold}): process {process * 1e3:.1f} ms, load app {load * 1e3:.1f} ms, first invocation {first * 1e6:.0f} us")
+    app = load_app()
+    print(f"{'count':>8} {'us/invocation':>14} {'ns/serial':>10}")
+    for count in [None] + args.counts:
+        per_invocation = warm(app, count, max(1, args.serials // (count or 1)))
+        print(f"{count or '-':>8} {per_invocation * 1e6:>14.1f} {per_invocation / (count or 1) * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
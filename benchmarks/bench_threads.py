@@ -0,0 +1,68 @@
+"""
+bench_threads.py
+
+Measures how serial generation throughput scales with the number of threads
+sharing one `ThreadSafeSerialGenerator`. Run it on a standard CPython and on a
+free-threaded build (e.g. ``python3.13t``) to compare the two:
+
+    python benchmarks/bench_threads.py
+    python3.13t -X gil=0 benchmarks/bench_threads.py
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from klingon_serial.generate import ThreadSafeSerialGenerator
+
+
+def run(threads, calls):
+    """Generate `calls` serials on each of `threads` threads.
+
+    Args:
+        threads (int): Number of threads to start.
+        calls (int): Number of serials each thread generates.
+
+    Returns:
+        float: Serials generated per second across all threads.
+    """
+    generator = ThreadSafeSerialGenerator(thread_bits=6, sequence_bits=2)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        generate = generator.generate
+        barrier.wait()
+        for _ in range(calls):
+            generate()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark threaded serial generation.")
+    parser.add_argument("--calls", type=int, default=100_000, help="Serials generated per thread.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Thread counts to measure.")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]} ({'GIL' if gil else 'free-threaded'})")
+    print(f"{'threads':>8} {'serials/s':>14} {'scaling':>8}")
+    baseline = None
+    for threads in args.threads:
+        rate = run(threads, args.calls)
+        baseline = baseline or rate
+        print(f"{threads:>8} {rate:>14,.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+run.py
+
+Benchmark suite for klingon_serial. Each case is timed with `timeit` and
+reported in nanoseconds per operation. Results are scaled by a calibration
+loop so that a baseline recorded on one machine can be checked on another.
+
+    python benchmarks/run.py                 # run and print results
+    python benchmarks/run.py --save          # record benchmarks/baseline.json
+    python benchmarks/run.py --check         # fail if a case regressed past --threshold
+
+The HTTP cases need the OpenFaaS handler requirements (fastapi, httpx) and
+are skipped when they are not installed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from klingon_serial.generate import generate_serial, generate_serials
+from klingon_serial.utils import parse_serial, parse_serials
+from klingon_serial.validate import is_serial, validate_serials
+
+BASELINE = Path(__file__).with_name("baseline.json")
+BULK = 10_000
+ACCEPT_HEADERS = ["application/json", "text/plain", "text/html", "application/xml", "application/xhtml+xml", "application/yaml"]
+
+# Benchmark cases by name: (setup returning the callable to time, operations per call, self-timed).
+CASES = {}
+
+
+def case(name, operations=1, self_timed=False):
+    """Register a benchmark case whose setup function returns the callable to time.
+
+    A self-timed case's callable returns its own measurement in nanoseconds
+    instead of being timed from the outside.
+    """
+    def register(setup):
+        CASES[name] = (setup, operations, self_timed)
+        return setup
+    return register
+
+
+def calibrate():
+    """A fixed pure-Python workload used to normalise results across machines."""
+    total = 0
+    for i in range(1000):
+        total += i * i
+    return total
+
+
+@case("generate_serial")
+def bench_generate_serial():
+    return generate_serial
+
+
+@case("generate_serials", BULK)
+def bench_generate_serials():
+    return lambda: generate_serials(BULK)
+
+
+@case("generate_serials_bytes", BULK)
+def bench_generate_serials_bytes():
+    return lambda: generate_serials(BULK, as_bytes=True)
+
+
+@case("parse_serial")
+def bench_parse_serial():
+    serial = generate_serial()
+    return lambda: parse_serial(serial)
+
+
+@case("parse_serials", BULK)
+def bench_parse_serials():
+    serials = generate_serials(BULK)
+    return lambda: parse_serials(serials)
+
+
+@case("is_serial")
+def bench_is_serial():
+    serial = generate_serial()
+    return lambda: is_serial(serial)
+
+
+@case("validate_serials", BULK)
+def bench_validate_serials():
+    serials = generate_serials(BULK)
+    return lambda: validate_serials(serials)
+
+
+def _handler_client():
+    """Build a test client for the OpenFaaS handler, or None if its requirements are missing."""
+    try:
+        from starlette.testclient import TestClient
+        from openfaas.handler import app
+    except ImportError:
+        return None
+    return TestClient(app)
+
+
+for _accept in ACCEPT_HEADERS:
+    def _bench_root(accept=_accept):
+        client = _handler_client()
+        if client is None:
+            return None
+        headers = {"Accept": accept}
+        return lambda: client.get("/", headers=headers)
+    case(f"root[{_accept}]")(_bench_root)
+
+
+@case("import", self_timed=True)
+def bench_import():
+    def run():
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import klingon_serial"],
+            capture_output=True, text=True, cwd=ROOT, env=dict(os.environ, PYTHONPATH=str(ROOT)),
+        )
+        for line in result.stderr.splitlines():
+            if line.rstrip().endswith("| klingon_serial"):
+                return int(line.split("|")[1]) * 1000
+        raise RuntimeError("klingon_serial missing from -X importtime output")
+    return run
+
+
+def measure(function, operations, repeat, budget, self_timed=False):
+    """Time `function` and return the best nanoseconds per operation."""
+    if self_timed:
+        return min(function() for _ in range(repeat)) / operations
+    number, _ = timeit.Timer(function).autorange()
+    number = max(1, int(number * budget / 0.2))
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number / operations * 1e9
+
+
+def run_cases(names, repeat, budget):
+    """Run the selected cases.
+
+    Returns:
+        dict: Calibration-scaled nanoseconds per operation by case name, plus the raw calibration time.
+    """
+    calibration = measure(calibrate, 1, repeat, budget)
+    results = {"calibration_ns": calibration, "cases": {}}
+    for name in names:
+        setup, operations, self_timed = CASES[name]
+        function = setup()
+        if function is None:
+            print(f"{name:<40} skipped")
+            continue
+        raw = measure(function, operations, repeat, budget, self_timed)
+        results["cases"][name] = raw / calibration
+        print(f"{name:<40} {raw:>14,.1f} ns/op")
+    return results
+
+
+def check(results, baseline, threshold):
+    """Compare results with the baseline.
+
+    Returns:
+        list: Descriptions of the cases that regressed past `threshold`.
+    """
+    regressions = []
+    for name, score in results["cases"].items():
+        expected = baseline["cases"].get(name)
+        if expected and score > expected * threshold:
+            regressions.append(f"{name}: {score / expected:.2f}x the baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the klingon_serial benchmark suite.")
+    parser.add_argument("cases", nargs="*", help="Cases to run, default all.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per case; the best is kept.")
+    parser.add_argument("--budget", type=float, default=0.2, help="Approximate seconds per timing repeat.")
+    parser.add_argument("--save", action="store_true", help="Write the results to the baseline file.")
+    parser.add_argument("--check", action="store_true", help="Fail if a case regressed against the baseline.")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed slowdown factor before --check fails.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="Baseline JSON file.")
+    args = parser.parse_args()
+
+    names = args.cases or list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    results = run_cases(names, args.repeat, args.budget)
+    results["python"] = sys.version.split()[0]
+    results["recorded"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    if args.check:
+        regressions = check(results, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No case regressed past {args.threshold:.2f}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
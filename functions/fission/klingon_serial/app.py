@@ -1,9 +1,72 @@
-from klingon_serial.generate import generate_serial
+"""
+app.py
+
+The Fission function for generating klingon serial numbers, with the
+entrypoint ``app.main``.
+
+A ``count`` query parameter returns that many serials from one reserved
+block in a single invocation. The generator is built once per container and
+kept warm between invocations, and only the generator is imported on cold
+start; Flask, which the Fission Python environment has already loaded, is
+imported on the first invocation to read the request.
+"""
+import os
+import threading
+
+from klingon_serial.generate import SerialGenerator
+
+# Maximum number of serials a single invocation may ask for.
+MAX_SERIALS = int(os.environ.get("KLINGON_MAX_SERIALS", "100000"))
+
+# The warm generator, kept between invocations. The Fission server may run
+# invocations on several threads, so reservations take a lock.
+_generator = SerialGenerator()
+_lock = threading.Lock()
+
+
+def _parameters(event):
+    """Get the invocation's parameters.
+
+    Args:
+        event (dict): Parameters passed directly, e.g. by a local harness.
+
+    Returns:
+        Mapping: The parameters, the request's query string inside Fission, or an empty dict.
+    """
+    if event is not None:
+        return event
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return {}
+    return request.args if has_request_context() else {}
+
 
 def main(context=None, event=None):
-    # Generate a unique serial number
-    unique_serial = generate_serial()
-    return {"status": 200, "message": "OK", "serial": unique_serial.upper()}
+    """Generate one serial number, or ``count`` of them from one reserved block.
+
+    Args:
+        context: Unused, kept for callers that pass a context.
+        event (dict): Parameters to use instead of the request's query string.
+
+    Returns:
+        dict or tuple: The response body, with ``serial`` or, when ``count`` is given, ``serials``; or the body and 400 for a bad ``count``.
+    """
+    count = _parameters(event).get("count")
+    if count is None:
+        with _lock:
+            serial = _generator.generate(upper=True)
+        return {"status": 200, "message": "OK", "serial": serial}
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        count = -1
+    if not 0 <= count <= MAX_SERIALS:
+        return {"status": 400, "message": f"count must be between 0 and {MAX_SERIALS}"}, 400
+    with _lock:
+        block = _generator.reserve_block(count)
+    return {"status": 200, "message": "OK", "serials": block.to_list(upper=True)}
+
 
 if __name__ == "__main__":
-    main(None, None)
+    print(main(None, None))
@@ -1,23 +1,186 @@
-import logging
-
-from .utils import validate_serial
+from functools import lru_cache
+from .utils import get_debug, validate_serial
+from .serial import Serial
+from .validate import SERIAL_LENGTH, is_serial, validate_serials
 from .generate import (
+    SerialBlock,
+    SerialGenerator,
+    ThreadSafeSerialGenerator,
     generate_serial,
+    generate_serial_base32,
+    generate_serial_base62,
+    generate_serial_bytes,
+    generate_serial_int,
+    generate_serials,
+    reserve_block,
 )
+from .layout import DEFAULT_LAYOUT, SerialLayout
+from .pipeline import atag_records, tag_records
+from .pool import SerialPool
+
+
+
+# Output formats of the ``klingon_serial`` command.
+OUTPUT_FORMATS = ("hex", "upper", "int", "bytes", "base32")
+
+# Serials rendered per write by the ``klingon_serial`` command, about 2 MB of hexadecimal lines.
+WRITE_BLOCK = 1 << 16
+
+
+def main(argv=None):
+    """Main function to run when the module is executed as a script.
+
+    Prints ``--count`` serial numbers, one per line, or with ``--stream``
+    keeps printing until the reader goes away. Serials are rendered a block
+    at a time and written to ``sys.stdout.buffer`` in large writes. The
+    ``bytes`` format writes packed 14-byte records with no separator.
+    ``--validate FILE`` checks the serials in a file instead, and
+    ``klingon_serial audit [FILE ...]`` audits serials for duplicates,
+    distributions and clock anomalies with `klingon_serial.audit.audit()`.
+
+    Args:
+        argv (list): Command line arguments, defaulting to ``sys.argv[1:]``.
+
+    Returns:
+        int: The exit status, 1 if validation found an invalid serial or an audit found duplicates and 0 otherwise.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="klingon_serial", description="Generate and audit klingon serial numbers.")
+    parser.add_argument("--count", type=int, default=1, help="Number of serials to print.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="hex", help="Output format of the serials.")
+    parser.add_argument("--stream", action="store_true", help="Print serials until the reader goes away.")
+    parser.add_argument("--validate", metavar="FILE", help="Check the serials in FILE ('-' for standard input) and print the invalid lines.")
+    commands = parser.add_subparsers(dest="command")
+    auditor = commands.add_parser("audit", help="Check serials for duplicates and clock anomalies.")
+    auditor.add_argument("files", nargs="*", help="Files with one serial per line; standard input if none.")
+    auditor.add_argument("--bloom", action="store_true", help="Find duplicates with a Bloom filter pre-pass (files only).")
+    auditor.add_argument("--run-size", type=int, help="Serials sorted in memory per run of the external sort.")
+    auditor.add_argument("--sequence-bits", type=int, default=0, help="Timestamp bits the generators used for their sequence.")
+    auditor.add_argument("--encoding", choices=("hex", "base32", "base62"), default="hex", help="Text encoding of the serials.")
+    auditor.add_argument("--tmpdir", help="Directory for the external sort's runs.")
+    auditor.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+    if args.command == "audit":
+        return _audit(args)
+    if args.count < 0:
+        parser.error(f"invalid count {args.count}")
+    if args.validate:
+        if args.format in ("int", "bytes"):
+            parser.error(f"cannot validate the {args.format} format")
+        return _validate(args.validate, "base32" if args.format == "base32" else "hex")
+    if get_debug():
+        from .generate import print_debug_info
+        print_debug_info()
+    return _write_serials(args.count, args.format, args.stream)
+
+
+def _render(block, output_format):
+    """Render a `SerialBlock` in one of ``OUTPUT_FORMATS``."""
+    if output_format == "bytes":
+        return block.to_packed()
+    if output_format == "int":
+        return _render_decimal(block)
+    if output_format == "base32":
+        return "".join(serial + "\n" for serial in block.to_base32()).encode()
+    return block.to_bytes(b"\n", upper=output_format == "upper")
+
+
+def _render_decimal(block):
+    """Render a block without a checksum as decimal lines.
+
+    Consecutive serials share all but their lowest decimal digits, so runs
+    join a shared head onto a table of every four-digit tail, as
+    `SerialBlock.to_bytes()` does for hexadecimal.
+    """
+    if block.layout.checksum_bits:
+        return b"".join(b"%d\n" % value for value in block._values())
+    tails = _decimal_tails()
+    step = block.step
+    value = (int(block.prefix, 16) << block.layout.timestamp_bits) + block.first
+    end = value + block.count * step
+    chunks = []
+    while value < end:
+        head, low = divmod(value, 10_000)
+        stop = min(end, (head + 1) * 10_000)
+        head = b"%d" % head
+        chunks.append(head + (b"\n" + head).join(tails[low:stop - value + low:step]) + b"\n")
+        value += -(-(stop - value) // step) * step
+    return b"".join(chunks)
+
+
+@lru_cache(maxsize=1)
+def _decimal_tails():
+    """Build the table of four-digit decimal tails."""
+    return [b"%04d" % tail for tail in range(10_000)]
+
+
+def _write_serials(count, output_format, stream):
+    """Write `count` serials, or serials until the reader goes away, to standard output."""
+    import os
+    import sys
+
+    # One generator for this process; the module-level generator's thread
+    # slots would spread a block over 64 times as many milliseconds.
+    generator = SerialGenerator()
+    output = sys.stdout.buffer
+    try:
+        while stream or count > 0:
+            size = WRITE_BLOCK if stream else min(count, WRITE_BLOCK)
+            output.write(_render(generator.reserve_block(size), output_format))
+            count -= size
+        output.flush()
+    except BrokenPipeError:
+        # The reader, e.g. `head`, has gone; point stdout at /dev/null so the
+        # interpreter's final flush does not fail too.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+def _validate(path, encoding):
+    """Print the invalid lines of a file of serials as ``LINE: TEXT``."""
+    import sys
+
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    invalid = 0
+    number = 0
+    with stream:
+        while True:
+            lines = stream.readlines(WRITE_BLOCK * (SERIAL_LENGTH + 1))
+            if not lines:
+                break
+            serials = [line.rstrip(b"\r\n").decode("utf-8", "replace") for line in lines]
+            for offset, valid in enumerate(validate_serials(serials, encoding=encoding), number + 1):
+                if not valid:
+                    invalid += 1
+                    print(f"{offset}: {serials[offset - number - 1]}")
+            number += len(lines)
+    return 1 if invalid else 0
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
+def _audit(args):
+    """Run the ``audit`` command and print its report."""
+    import json
+    import sys
+    from .audit import RUN_SIZE, audit, format_report
 
-def main():
-    """Main function to run when the module is executed as a script."""
-    serial = generate_serial()
-    print(serial)
-    logging.debug(f"Generated Serial: {serial}")
-    logging.debug(f"Serial Valid: {validate_serial(serial)}")
+    sources = args.files or [sys.stdin.buffer]
+    try:
+        report = audit(sources, run_size=args.run_size or RUN_SIZE, bloom=args.bloom, sequence_bits=args.sequence_bits,
+                       encoding=args.encoding, tmpdir=args.tmpdir)
+    except (OSError, ValueError) as error:
+        print(f"klingon_serial audit: {error}", file=sys.stderr)
+        return 2
+    if args.json:
+        fields = report._asdict()
+        fields["nodes"] = {f"{node:012x}": count for node, count in report.nodes.items()}
+        fields["processes"] = {f"{node:012x}/{process_id}": count for (node, process_id), count in report.processes.items()}
+        fields["per_ms"] = {str(size): count for size, count in sorted(report.per_ms.items())}
+        print(json.dumps(fields, indent=2))
+    else:
+        print(format_report(report))
+    return 1 if report.duplicates else 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,376 @@
+"""
+This module audits large corpora of serial numbers, such as production logs,
+for uniqueness. `audit()` streams serials from files or standard input and
+reports duplicates, the distribution of serials over nodes, processes and
+milliseconds, and clock anomalies.
+
+Memory stays bounded however large the input is. Serials are held in their
+14-byte packed form and duplicates are found with an external merge sort:
+runs of ``run_size`` serials are sorted in memory and spilled to temporary
+files, then merged so that equal serials meet. With ``bloom=True`` the
+inputs are instead read twice: a Bloom filter pass collects the few serials
+that may repeat, and a second pass counts only those exactly, which needs
+about 10 bits per serial and no temporary files.
+
+The distributions and clock anomalies are tracked in input order per
+process stream (node ID and process ID), which needs memory for each stream
+but not for each serial. A regression is a serial timestamped earlier than
+the one before it from the same stream.
+"""
+import heapq
+import os
+import random
+import tempfile
+from collections import Counter, namedtuple
+from functools import lru_cache
+from .clock import wall_clock
+from .encoding import ENCODINGS
+from .validate import PROCESS_ID_BITS, SERIAL_BYTES, SERIAL_LENGTH, TIMESTAMP_BITS, _to_hex
+
+# Default number of serials sorted in memory per run of the external sort.
+RUN_SIZE = 1 << 22
+
+# Default milliseconds a timestamp may lie ahead of the audit's clock.
+FUTURE_TOLERANCE = 60_000
+
+# Bloom filter bits per expected serial and bits set per serial, for a few
+# percent false positives.
+BLOOM_BITS_PER_SERIAL = 10
+BLOOM_HASHES = 7
+
+# Lines read from a source at a time.
+_CHUNK_LINES = 1 << 16
+
+AuditReport = namedtuple("AuditReport", [
+    "total", "invalid", "unique", "duplicates", "duplicate_serials", "nodes", "processes",
+    "per_ms", "max_per_ms", "regressions", "max_regression_ms", "future", "first_timestamp", "last_timestamp",
+])
+AuditReport.__doc__ = """The result of auditing a corpus of serial numbers.
+
+Attributes:
+    total: The number of lines read, excluding blank lines.
+    invalid: The number of lines that are not serials.
+    unique: The number of distinct serials.
+    duplicates: The number of repeated occurrences, ``total - invalid - unique``.
+    duplicate_serials: Up to ``max_examples`` ``(serial, occurrences)`` pairs of repeated serials.
+    nodes: A Counter of serials per node ID.
+    processes: A Counter of serials per ``(node ID, process ID)`` stream.
+    per_ms: A Counter mapping serials in one millisecond of one stream to how many such milliseconds there were.
+    max_per_ms: The most serials one stream produced in one millisecond.
+    regressions: The number of times a stream's timestamp moved backwards.
+    max_regression_ms: The largest backward step in milliseconds.
+    future: The number of serials timestamped ahead of the audit's clock.
+    first_timestamp: The earliest timestamp, or None.
+    last_timestamp: The latest timestamp, or None.
+"""
+
+
+def audit(sources, run_size=RUN_SIZE, bloom=False, sequence_bits=0, encoding="hex", max_examples=10,
+          future_tolerance=FUTURE_TOLERANCE, tmpdir=None):
+    """Audit serial numbers for duplicates, distributions and clock anomalies.
+
+    Args:
+        sources (list): Paths, or binary file objects such as ``sys.stdin.buffer``, with one serial per line.
+        run_size (int): Serials sorted in memory per run of the external sort.
+        bloom (bool): Find duplicates with a Bloom filter pre-pass; every source must be a path.
+        sequence_bits (int): Number of timestamp field bits the generators used for their sequence.
+        encoding (str): The serials' text encoding, ``"hex"``, ``"base32"`` or ``"base62"``.
+        max_examples (int): Most duplicated serials to list in the report.
+        future_tolerance (int): Milliseconds a timestamp may lie ahead of the clock before it counts as future.
+        tmpdir (str): Directory for the sorted runs, defaulting to the system temporary directory.
+
+    Returns:
+        AuditReport: The audit's findings.
+
+    Raises:
+        ValueError: If `bloom` is set and a source is not a path, or `encoding` is unknown.
+    """
+    if bloom and not all(isinstance(source, (str, os.PathLike)) for source in sources):
+        raise ValueError("A Bloom filter audit reads its sources twice, so they must be paths")
+    if encoding not in ("hex",) + ENCODINGS:
+        raise ValueError(f"Unknown serial encoding {encoding}")
+    stats = _StreamStats(sequence_bits, wall_clock() + future_tolerance)
+    if bloom:
+        repeated = _bloom_repeats(sources, encoding, stats)
+    else:
+        repeated = _sorted_repeats(sources, encoding, stats, run_size, tmpdir)
+    duplicate_serials, duplicates = _summarise(repeated, max_examples)
+    return stats.report(duplicates, duplicate_serials)
+
+
+def format_report(report):
+    """Render an audit report as text.
+
+    Args:
+        report (AuditReport): The report to render.
+
+    Returns:
+        str: One finding per line.
+    """
+    lines = [
+        f"serials: {report.total}",
+        f"invalid: {report.invalid}",
+        f"unique: {report.unique}",
+        f"duplicates: {report.duplicates}",
+    ]
+    lines += [f"  {serial} x{count}" for serial, count in report.duplicate_serials]
+    lines += [
+        f"nodes: {len(report.nodes)}",
+        f"processes: {len(report.processes)}",
+        f"max per ms: {report.max_per_ms}",
+        "per ms: " + " ".join(f"{size}:{count}" for size, count in sorted(report.per_ms.items())),
+        f"regressions: {report.regressions} (max {report.max_regression_ms} ms)",
+        f"future: {report.future}",
+        f"timestamps: {report.first_timestamp} to {report.last_timestamp}",
+    ]
+    lines += [f"  node {node:012x}: {count}" for node, count in report.nodes.most_common()]
+    return "\n".join(lines)
+
+
+class _StreamStats:
+    """Distributions and clock anomalies of serials, tracked per process stream in input order.
+
+    Each stream keeps the timestamp and size of its current millisecond run
+    and is only updated further when the run ends, so serials that share a
+    millisecond with the one before them cost a single comparison.
+    """
+
+    def __init__(self, sequence_bits, future_after):
+        self.sequence_bits = sequence_bits
+        self.future_after = future_after
+        self.total = 0
+        self.invalid = 0
+        self.per_ms = Counter()
+        self.regressions = 0
+        self.max_regression_ms = 0
+        self.future = 0
+        # Stream -> [timestamp of the current run, serials in the run, serials
+        # in earlier runs, earliest timestamp, latest timestamp].
+        self._streams = {}
+
+    def observe(self, records):
+        """Account for a chunk of packed serials."""
+        from_bytes = int.from_bytes
+        tick_mask = (1 << TIMESTAMP_BITS) - 1
+        sequence_bits = self.sequence_bits
+        streams = self._streams
+        per_ms = self.per_ms
+        future_after = self.future_after
+        for record in records:
+            value = from_bytes(record, "big")
+            timestamp = (value & tick_mask) >> sequence_bits
+            state = streams.get(value >> TIMESTAMP_BITS)
+            if state is None:
+                streams[value >> TIMESTAMP_BITS] = [timestamp, 1, 0, timestamp, timestamp]
+            elif state[0] == timestamp:
+                state[1] += 1
+            else:
+                # _end_run(), inlined.
+                per_ms[state[1]] += 1
+                state[2] += state[1]
+                if state[0] > future_after:
+                    self.future += state[1]
+                if timestamp > state[4]:
+                    state[4] = timestamp
+                elif timestamp < state[0]:
+                    self.regressions += 1
+                    self.max_regression_ms = max(self.max_regression_ms, state[0] - timestamp)
+                    state[3] = min(state[3], timestamp)
+                state[0] = timestamp
+                state[1] = 1
+        self.total += len(records)
+
+    def _end_run(self, state):
+        """Account for the serials of a stream's current millisecond."""
+        self.per_ms[state[1]] += 1
+        state[2] += state[1]
+        if state[0] > self.future_after:
+            self.future += state[1]
+
+    def report(self, duplicates, duplicate_serials):
+        """Build the report once every serial has been observed."""
+        nodes = Counter()
+        processes = Counter()
+        for stream, state in self._streams.items():
+            self._end_run(state)
+            node, process_id = stream >> PROCESS_ID_BITS, stream & ((1 << PROCESS_ID_BITS) - 1)
+            nodes[node] += state[2]
+            processes[node, process_id] = state[2]
+        timestamps = self._streams.values()
+        return AuditReport(
+            self.total + self.invalid, self.invalid, self.total - duplicates, duplicates, duplicate_serials,
+            nodes, processes, self.per_ms, max(self.per_ms, default=0), self.regressions, self.max_regression_ms,
+            self.future, min((state[3] for state in timestamps), default=None),
+            max((state[4] for state in timestamps), default=None),
+        )
+
+
+def _read_sources(sources, encoding, stats=None):
+    """Yield the packed serials of each source in chunks, counting invalid lines in `stats`."""
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as stream:
+                yield from _read_stream(stream, encoding, stats)
+        else:
+            yield from _read_stream(source, encoding, stats)
+
+
+def _read_stream(stream, encoding, stats):
+    """Yield the packed serials of a binary stream in chunks."""
+    while True:
+        lines = stream.readlines(_CHUNK_LINES * (SERIAL_LENGTH + 1))
+        if not lines:
+            return
+        records, invalid = _pack_lines(lines, encoding)
+        if stats is not None:
+            stats.invalid += invalid
+        yield records
+
+
+def _pack_lines(lines, encoding):
+    """Pack lines of serials into 14-byte records, skipping blank lines.
+
+    Returns:
+        tuple: The packed records and the number of invalid lines.
+    """
+    lines = [line for line in map(bytes.strip, lines) if line]
+    if encoding == "hex" and set(map(len, lines)) <= {SERIAL_LENGTH}:
+        # The common case: hex-decode the whole chunk in one call.
+        try:
+            packed = bytes.fromhex(b"".join(lines).decode("ascii"))
+        except (UnicodeDecodeError, ValueError):
+            packed = b""
+        if len(packed) == len(lines) * SERIAL_BYTES:
+            return [packed[start:start + SERIAL_BYTES] for start in range(0, len(packed), SERIAL_BYTES)], 0
+    records = []
+    for line in lines:
+        try:
+            text = line.decode("ascii")
+        except UnicodeDecodeError:
+            continue
+        serial = text if encoding == "hex" else _to_hex(text, encoding)
+        if serial is not None and len(serial) == SERIAL_LENGTH:
+            try:
+                record = bytes.fromhex(serial)
+            except ValueError:
+                continue
+            if len(record) == SERIAL_BYTES:
+                records.append(record)
+    return records, len(lines) - len(records)
+
+
+def _sorted_repeats(sources, encoding, stats, run_size, tmpdir):
+    """Find repeated serials with an external merge sort of their packed records."""
+    runs, buffer = [], []
+    try:
+        for records in _read_sources(sources, encoding, stats):
+            stats.observe(records)
+            buffer.extend(records)
+            if len(buffer) >= run_size:
+                runs.append(_spill(buffer, tmpdir))
+                buffer = []
+        buffer.sort()
+        yield from _repeats(heapq.merge(buffer, *map(_read_run, runs)) if runs else buffer)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _bloom_repeats(sources, encoding, stats):
+    """Find repeated serials with a Bloom filter pass and an exact count of its candidates."""
+    bloom_filter = _BloomFilter(max(1, sum(os.path.getsize(source) for source in sources) // (SERIAL_LENGTH + 1)))
+    candidates = set()
+    for records in _read_sources(sources, encoding, stats):
+        stats.observe(records)
+        for record in records:
+            if bloom_filter.add(record):
+                candidates.add(record)
+    del bloom_filter
+    counts = Counter()
+    for records in _read_sources(sources, encoding):
+        counts.update(record for record in records if record in candidates)
+    return [(record, count) for record, count in sorted(counts.items()) if count > 1]
+
+
+def _spill(records, tmpdir):
+    """Sort `records` and write them to an anonymous temporary file."""
+    records.sort()
+    run = tempfile.TemporaryFile(dir=tmpdir)
+    run.write(b"".join(records))
+    return run
+
+
+def _read_run(run):
+    """Yield the records of a sorted run."""
+    run.seek(0)
+    block_size = SERIAL_BYTES * 4096
+    while True:
+        block = run.read(block_size)
+        if not block:
+            return
+        for start in range(0, len(block), SERIAL_BYTES):
+            yield block[start:start + SERIAL_BYTES]
+
+
+def _repeats(records):
+    """Yield ``(record, occurrences)`` for each record repeated in a sorted stream."""
+    previous, count = None, 0
+    for record in records:
+        if record == previous:
+            count += 1
+            continue
+        if count > 1:
+            yield previous, count
+        previous, count = record, 1
+    if count > 1:
+        yield previous, count
+
+
+def _summarise(repeated, max_examples):
+    """Count repeated occurrences and keep the first `max_examples` as hexadecimal serials.
+
+    Returns:
+        tuple: The example ``(serial, occurrences)`` pairs and the number of repeated occurrences.
+    """
+    examples, duplicates = [], 0
+    for record, count in repeated:
+        duplicates += count - 1
+        if len(examples) < max_examples:
+            examples.append((record.hex(), count))
+    return examples, duplicates
+
+
+class _BloomFilter:
+    """A blocked Bloom filter over packed serials, sized for `capacity` serials.
+
+    Each serial sets ``BLOOM_HASHES`` bits of a single 64-bit word, so adding
+    one costs one word read and write rather than a read per hash. The word
+    and the bit pattern come from Python's per-process ``hash()`` of the
+    record, so a filter is only valid within one process.
+    """
+
+    def __init__(self, capacity):
+        self.words = memoryview(bytearray(8 * max(1, capacity * BLOOM_BITS_PER_SERIAL // 64))).cast("Q")
+        self.masks = _bloom_masks()
+
+    def add(self, record):
+        """Add a record.
+
+        Returns:
+            bool: True if the record may have been added before.
+        """
+        digest = hash(record)
+        index = digest % len(self.words)
+        mask = self.masks[digest >> 52 & 4095]
+        word = self.words[index]
+        if word & mask == mask:
+            return True
+        self.words[index] = word | mask
+        return False
+
+
+@lru_cache(maxsize=None)
+def _bloom_masks():
+    """Build the 4096 bit patterns of ``BLOOM_HASHES`` bits in a 64-bit word."""
+    choose = random.Random(0).sample
+    return tuple(sum(1 << bit for bit in choose(range(64), BLOOM_HASHES)) for _ in range(4096))
@@ -0,0 +1,72 @@
+"""
+This module provides the time sources used for serial number timestamps.
+
+`MonotonicClock` reads the wall clock once and then advances it with
+``time.monotonic_ns()``, so a step of the system clock (for example an NTP
+correction) does not move serial timestamps backwards. It re-anchors to the
+wall clock every ``resync_interval`` seconds to follow slow drift and
+deliberate time changes; a re-anchor that moves time backwards is seen by
+the generators as a clock regression and handled by their regression policy.
+`wall_clock()` reads the wall clock directly on every call.
+"""
+import time
+
+# Default seconds between re-anchoring a `MonotonicClock` to the wall clock.
+RESYNC_INTERVAL = 60.0
+
+
+class ClockRegressionError(RuntimeError):
+    """Raised when the clock moved backwards under the ``"raise"`` regression policy."""
+
+
+def wall_clock():
+    """Read the wall clock.
+
+    Returns:
+        int: Milliseconds since the epoch.
+    """
+    return time.time_ns() // 1_000_000
+
+
+class MonotonicClock:
+    """Wall time anchored once and advanced by the monotonic clock.
+
+    Calling the clock costs one ``time.monotonic_ns()`` read, an addition and
+    a comparison with the next re-anchor time.
+
+    Args:
+        resync_interval (float): Seconds between re-anchoring to the wall clock, or None to never re-anchor.
+    """
+
+    def __init__(self, resync_interval=RESYNC_INTERVAL):
+        self.resync_interval = resync_interval
+        self.resync()
+
+    def resync(self):
+        """Re-anchor to the wall clock.
+
+        Returns:
+            int: Milliseconds since the epoch.
+        """
+        monotonic = time.monotonic_ns()
+        self._offset = time.time_ns() - monotonic
+        if self.resync_interval is None:
+            self._resync_at = float("inf")
+        else:
+            self._resync_at = monotonic + int(self.resync_interval * 1e9)
+        return (monotonic + self._offset) // 1_000_000
+
+    def __call__(self):
+        """Read the clock.
+
+        Returns:
+            int: Milliseconds since the epoch.
+        """
+        monotonic = time.monotonic_ns()
+        if monotonic >= self._resync_at:
+            return self.resync()
+        return (monotonic + self._offset) // 1_000_000
+
+
+# The clock generators use unless they are given another.
+default_clock = MonotonicClock()
@@ -0,0 +1,261 @@
+"""
+This module provides compact text encodings of serial numbers: Crockford
+base32 (23 characters for a 112-bit serial) and base62 (19 characters).
+
+Both are fixed width and their alphabets are in ASCII order, so encoded
+serials sort exactly like their hexadecimal form and their integer value.
+Within one node and process that is timestamp order.
+
+Decoding Crockford base32 is case-insensitive and reads ``I`` and ``L`` as
+``1`` and ``O`` as ``0``. Encoders are compiled once per length into
+straight-line table lookups, and the batch encoders apply them to a buffer of
+packed serials such as `SerialBlock.to_packed()`.
+"""
+from functools import lru_cache
+from .validate import SERIAL_BYTES, _import_numpy
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+BASE62_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# Text encodings of serial numbers besides hexadecimal.
+ENCODINGS = ("base32", "base62")
+
+# Maps Crockford digits, in either case and with their aliases, to the digits
+# `int(..., 32)` reads, and U, which `int()` would accept, to an invalid digit.
+_TO_BASE32_DIGITS = str.maketrans(
+    CROCKFORD_ALPHABET + CROCKFORD_ALPHABET.lower() + "IiLlOoUu",
+    "0123456789abcdefghijklmnopqrstuv" * 2 + "111100!!",
+)
+_BASE62_VALUES = {digit: value for value, digit in enumerate(BASE62_ALPHABET)}
+
+
+def base32_length(bits=8 * SERIAL_BYTES):
+    """Get the length of a Crockford base32 serial number.
+
+    Args:
+        bits (int): Width of the serial number in bits.
+
+    Returns:
+        int: The number of characters.
+    """
+    return -(-bits // 5)
+
+
+@lru_cache(maxsize=None)
+def base62_length(bits=8 * SERIAL_BYTES):
+    """Get the length of a base62 serial number.
+
+    Args:
+        bits (int): Width of the serial number in bits.
+
+    Returns:
+        int: The number of characters.
+    """
+    length = 1
+    while 62 ** length < 1 << bits:
+        length += 1
+    return length
+
+
+def encode_base32(value, bits=8 * SERIAL_BYTES):
+    """Encode a serial number as Crockford base32.
+
+    Args:
+        value (int): The serial number as an integer.
+        bits (int): Width of the serial number in bits.
+
+    Returns:
+        str: The serial number as uppercase Crockford base32.
+    """
+    return _compile_base32(base32_length(bits))(value)
+
+
+def decode_base32(text):
+    """Decode a Crockford base32 serial number.
+
+    Args:
+        text (str): The serial number as Crockford base32, in either case.
+
+    Returns:
+        int: The serial number as an integer.
+
+    Raises:
+        ValueError: If `text` is not Crockford base32.
+    """
+    digits = text.translate(_TO_BASE32_DIGITS)
+    if not digits.isascii() or not digits.isalnum():
+        raise ValueError(f"Invalid base32 serial {text!r}")
+    return int(digits, 32)
+
+
+def encode_base62(value, bits=8 * SERIAL_BYTES):
+    """Encode a serial number as base62.
+
+    Args:
+        value (int): The serial number as an integer.
+        bits (int): Width of the serial number in bits.
+
+    Returns:
+        str: The serial number as base62.
+    """
+    return _compile_base62(base62_length(bits))(value)
+
+
+def decode_base62(text):
+    """Decode a base62 serial number.
+
+    Args:
+        text (str): The serial number as base62.
+
+    Returns:
+        int: The serial number as an integer.
+
+    Raises:
+        ValueError: If `text` is not base62.
+    """
+    value = 0
+    try:
+        for digit in text:
+            value = value * 62 + _BASE62_VALUES[digit]
+    except KeyError:
+        raise ValueError(f"Invalid base62 serial {text!r}") from None
+    return value
+
+
+def encode_base32_batch(packed, size=SERIAL_BYTES, bits=None):
+    """Encode a buffer of packed serial numbers as Crockford base32.
+
+    Args:
+        packed (bytes): Big-endian serial numbers of `size` bytes each, concatenated.
+        size (int): Length of each packed serial number in bytes.
+        bits (int): Width of each serial number in bits. Defaults to ``8 * size``.
+
+    Returns:
+        list: The serial numbers as uppercase Crockford base32.
+
+    Raises:
+        ValueError: If the buffer is not a whole number of records.
+    """
+    return _encode_batch(packed, size, base32_length(bits or 8 * size), 32)
+
+
+def encode_base62_batch(packed, size=SERIAL_BYTES, bits=None):
+    """Encode a buffer of packed serial numbers as base62.
+
+    Args:
+        packed (bytes): Big-endian serial numbers of `size` bytes each, concatenated.
+        size (int): Length of each packed serial number in bytes.
+        bits (int): Width of each serial number in bits. Defaults to ``8 * size``.
+
+    Returns:
+        list: The serial numbers as base62.
+
+    Raises:
+        ValueError: If the buffer is not a whole number of records.
+    """
+    return _encode_batch(packed, size, base62_length(bits or 8 * size), 62)
+
+
+# Smallest batch worth handing to NumPy.
+_NUMPY_MIN_BATCH = 256
+
+
+def _encode_batch(packed, size, length, base):
+    """Encode every record of a packed buffer as `length` digits in `base` 32 or 62.
+
+    With NumPy installed, large batches are encoded with array operations;
+    otherwise the compiled single-serial encoder is applied to each record.
+    """
+    count, remainder = divmod(len(packed), size)
+    if remainder:
+        raise ValueError(f"Packed serials must be {size} bytes each")
+    numpy = _import_numpy() if count >= _NUMPY_MIN_BATCH else None
+    if numpy is not None:
+        return _encode_array(numpy, packed, count, size, length, base)
+    encode = _compile_base32(length) if base == 32 else _compile_base62(length)
+    from_bytes = int.from_bytes
+    return [encode(from_bytes(packed[start:start + size], "big")) for start in range(0, len(packed), size)]
+
+
+def _encode_array(numpy, packed, count, size, length, base):
+    """Encode a packed buffer with NumPy array operations.
+
+    Base32 digits are read straight from the bits. Base62 digits come from
+    long division by 62 ** 2 over 32-bit limbs held in ``uint64`` columns.
+
+    Returns:
+        list: The encoded serial numbers.
+    """
+    records = numpy.frombuffer(packed, dtype=numpy.uint8).reshape(count, size)
+    if base == 32:
+        bits = numpy.unpackbits(records, axis=1)
+        extra = 5 * length - 8 * size
+        bits = numpy.pad(bits, ((0, 0), (extra, 0))) if extra > 0 else bits[:, -extra:]
+        digits = bits.reshape(count, length, 5) @ numpy.array([16, 8, 4, 2, 1], dtype=numpy.uint8)
+        alphabet = CROCKFORD_ALPHABET
+    else:
+        limbs = -(-size // 4)
+        padded = numpy.zeros((count, 4 * limbs), dtype=numpy.uint8)
+        padded[:, 4 * limbs - size:] = records
+        words = padded.view(">u4").astype(numpy.uint64)
+        digits = numpy.empty((count, length), dtype=numpy.uint8)
+        thirty_two, divisor, sixty_two = numpy.uint64(32), numpy.uint64(3844), numpy.uint64(62)
+        for position in range(length - 2, -1, -2):
+            remainders = numpy.zeros(count, dtype=numpy.uint64)
+            for limb in range(limbs):
+                words[:, limb], remainders = numpy.divmod((remainders << thirty_two) | words[:, limb], divisor)
+            digits[:, position], digits[:, position + 1] = numpy.divmod(remainders, sixty_two)
+        if length % 2:
+            digits[:, 0] = words[:, -1]
+        alphabet = BASE62_ALPHABET
+    characters = numpy.frombuffer(alphabet.encode(), dtype=numpy.uint8)[digits]
+    return characters.view(f"S{length}").ravel().astype(f"U{length}").tolist()
+
+
+# Encoders are compiled for each length into straight-line code that looks up
+# two digits at a time in a table of every two-digit string.
+_BASE62_CHUNK = 10
+
+
+@lru_cache(maxsize=None)
+def _compile_base32(length):
+    """Compile an encoder producing `length` Crockford base32 digits."""
+    terms = [f"pairs[value >> {10 * pair} & 1023]" for pair in range(length // 2 - 1, -1, -1)]
+    if length % 2:
+        terms.insert(0, f"digits[value >> {10 * (length // 2)} & 31]")
+    source = f"def encode(value):\n    return {' + '.join(terms) or repr('')}\n"
+    pairs = [high + low for high in CROCKFORD_ALPHABET for low in CROCKFORD_ALPHABET]
+    return _compile(source, {"digits": CROCKFORD_ALPHABET, "pairs": pairs}, f"<base32 encoder {length}>")
+
+
+@lru_cache(maxsize=None)
+def _compile_base62(length):
+    """Compile an encoder producing `length` base62 digits.
+
+    The value is first split into chunks of ``_BASE62_CHUNK`` digits, so that
+    most divisions work on small integers.
+    """
+    sizes = [_BASE62_CHUNK] * ((length - 1) // _BASE62_CHUNK) + [length - _BASE62_CHUNK * ((length - 1) // _BASE62_CHUNK)]
+    lines, chunks = [], []
+    for index, size in enumerate(sizes):
+        if index < len(sizes) - 1:
+            lines.append(f"value, chunk{index} = divmod(value, {62 ** _BASE62_CHUNK})")
+        else:
+            lines.append(f"chunk{index} = value")
+        terms = []
+        for pair in range(size // 2):
+            lines.append(f"chunk{index}, pair{index}_{pair} = divmod(chunk{index}, 3844)")
+            terms.insert(0, f"pairs[pair{index}_{pair}]")
+        if size % 2:
+            terms.insert(0, f"digits[chunk{index}]")
+        chunks.insert(0, " + ".join(terms))
+    body = "".join(f"    {line}\n" for line in lines)
+    source = f"def encode(value):\n{body}    return {' + '.join(chunks)}\n"
+    pairs = [high + low for high in BASE62_ALPHABET for low in BASE62_ALPHABET]
+    return _compile(source, {"digits": BASE62_ALPHABET, "pairs": pairs}, f"<base62 encoder {length}>")
+
+
+def _compile(source, namespace, filename):
+    """Compile the source of an ``encode`` function in `namespace`."""
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["encode"]
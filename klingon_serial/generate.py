@@ -1,75 +1,792 @@
-import uuid
-import re
 import os
-from datetime import datetime, timezone
-from .str2bool import str2bool
-from .utils import get_debug, get_mac_address_and_interface
+import threading
+import time
+import weakref
+from binascii import unhexlify
+from .utils import PROCESS_ID_BITS, SERIAL_BYTES, get_mac_address_and_interface
+from . import metrics
+from .clock import ClockRegressionError, default_clock
+from .encoding import ENCODINGS, encode_base32, encode_base32_batch, encode_base62, encode_base62_batch
+from .layout import DEFAULT_LAYOUT
+from .node import resolve_node_id
+from .validate import is_serial
+from .worker import current_lease, worker_id
 
 def is_valid_serial(serial):
     """Validate the serial number format.
 
+    Delegates to `klingon_serial.validate.is_serial()`.
+
     Args:
         serial (str): The serial number to validate.
 
     Returns:
         bool: True if the serial number is valid, False otherwise.
     """
-    pattern = r'^[a-fA-F0-9]{12}[a-fA-F0-9]{5}[a-fA-F0-9]{11}$'
-    return bool(re.match(pattern, serial))
+    return is_serial(serial)
 
 def get_mac_address_hex():
     """Get the MAC address from the environment as a hexadecimal string.
 
+    The node ID is resolved once and cached; see `klingon_serial.node`.
+
     Returns:
         str: The MAC address as a hexadecimal string, padded to 12 characters.
     """
-    try:
-        mac_address_hex = hex(uuid.getnode())[2:]
-        return mac_address_hex.zfill(12)
-    except:
-        return None
+    return f"{resolve_node_id().node_id:012x}"
+
+_process_id_hex = None
 
 def get_process_id():
-    """Get the process ID as a fixed-length hexadecimal string.
+    """Get the process ID, or the leased worker ID, as a fixed-length hexadecimal string.
+
+    The value is cached and reset in forked children, so only the first call
+    in each process reads the PID. A PID wider than the 20-bit field is
+    reduced to its low bits, as the default layout does. See
+    `klingon_serial.worker` for leased worker IDs.
 
     Returns:
         str: The process ID as a fixed-length hexadecimal string, padded to 5 characters.
     """
-    process_id_hex = hex(os.getpid())[2:]
-    return process_id_hex.zfill(5)
+    global _process_id_hex
+    if _process_id_hex is None:
+        _process_id_hex = f"{worker_id() & ((1 << PROCESS_ID_BITS) - 1):05x}"
+    return _process_id_hex
 
 def get_millisecond_epoch_hex():
     """Get the epoch time in milliseconds as a fixed-length hexadecimal string.
 
+    The time is read from the monotonic-anchored default clock; see
+    `klingon_serial.clock`.
+
     Returns:
         str: The epoch time in milliseconds as a fixed-length hexadecimal string, padded to 11 characters.
     """
-    epoch = int(datetime.now(timezone.utc).timestamp() * 1000)
-    epoch_hex = hex(epoch)[2:]
-    return epoch_hex.zfill(11)
+    return f"{default_clock():011x}"
+
+# What to do when the in-millisecond sequence is exhausted.
+OVERFLOW_POLICIES = ("borrow", "spin")
+
+# What to do when the clock reads earlier than it did on the previous call.
+REGRESSION_POLICIES = ("hold", "wait", "raise")
+
+
+class SerialGenerator:
+    """Stateful serial number generator.
+
+    The MAC address and process ID prefix is built once when the generator is
+    created and the timestamp is read from a clock, by default the
+    monotonic-anchored ``klingon_serial.clock.default_clock``, so each call
+    costs one clock read and one string format.
+
+    The serial format is set by a ``SerialLayout``, ``DEFAULT_LAYOUT`` unless
+    another is given. ``generate()``, ``generate_int()`` and
+    ``generate_bytes()`` are compiled for the layout when the generator is
+    built, so a custom layout costs nothing extra per serial.
+
+    Serials issued within the same millisecond are kept unique by a monotonic
+    sequence stored in the low ``sequence_bits`` of the timestamp field. With
+    the default of 0 bits the serial format is unchanged and each millisecond
+    holds a single serial. When the sequence for a millisecond runs out the
+    generator either borrows the next millisecond ahead of the wall clock
+    (``"borrow"``) or spins until the clock reaches it (``"spin"``).
+
+    Two generators with the same prefix draw from the same slots unless they
+    are given different shards. Shard ``shard`` of ``shards`` only issues
+    timestamp field values congruent to ``shard`` modulo ``shards``, so
+    generators that share a prefix never collide. ``generate_serial()`` wraps
+    the module-level instance. A generator is not shared between threads.
+
+    When the clock reads earlier than on the previous call the generator
+    counts a regression in ``regressions`` and records the largest step back
+    in ``regression_ms``. It then either keeps issuing after the last serial
+    as though the clock had not moved (``"hold"``), sleeps until the clock
+    catches up (``"wait"``) or raises ``ClockRegressionError`` (``"raise"``).
+    Serials stay unique and ordered under ``"hold"`` and ``"wait"``.
+
+    The prefix is rebuilt in forked children, so a generator created before
+    ``os.fork()`` keeps issuing unique serials in the child.
+
+    Args:
+        sequence_bits (int): Number of timestamp field bits used for the in-millisecond sequence. Defaults to the layout's.
+        overflow (str): Policy when the sequence is exhausted, one of ``OVERFLOW_POLICIES``.
+        shard (int): Index of the slot shard this generator issues from.
+        shards (int): Number of shards the slot space is divided into.
+        clock (callable): Time source returning milliseconds since the Unix epoch. Defaults to ``klingon_serial.clock.default_clock``.
+        regression (str): Policy when the clock moves backwards, one of ``REGRESSION_POLICIES``.
+        layout (SerialLayout): The serial format. Defaults to ``klingon_serial.layout.DEFAULT_LAYOUT``.
+
+    Raises:
+        ValueError: If a policy or the shard is invalid, or the current time does not fit the layout's timestamp field.
+    """
+
+    def __init__(self, sequence_bits=None, overflow="borrow", shard=0, shards=1, clock=None, regression="hold", layout=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy {overflow}")
+        if regression not in REGRESSION_POLICIES:
+            raise ValueError(f"Invalid regression policy {regression}")
+        layout = layout or DEFAULT_LAYOUT
+        if sequence_bits is not None and sequence_bits != layout.sequence_bits:
+            layout = layout._replace(sequence_bits=sequence_bits)
+        clock = clock or default_clock
+        if layout.epoch:
+            epoch = layout.epoch
+            self._clock = lambda: clock() - epoch
+        else:
+            self._clock = clock
+        now = self._clock()
+        if now < 0 or now << layout.sequence_bits >> layout.timestamp_bits:
+            raise ValueError(f"The current time does not fit the layout {layout}")
+        if not 0 <= shard < shards:
+            raise ValueError(f"Invalid shard {shard} of {shards}")
+        self.layout = layout
+        self.sequence_bits = layout.sequence_bits
+        self.overflow = overflow
+        self.regression = regression
+        self.shard = shard
+        self.shards = shards
+        self.regressions = 0
+        self.regression_ms = 0
+        self._last = shard - shards
+        self._clock_last = 0
+        self._reset()
+        _generators.add(self)
+
+    def _reset(self):
+        """Rebuild the cached prefix and the compiled encoders, e.g. after the process forked."""
+        layout = self.layout
+        process_id = worker_id()
+        if current_lease() is not None and process_id >> layout.process_id_bits:
+            raise ValueError(f"Worker ID {process_id} does not fit the layout {layout}")
+        self.prefix = layout.prefix(resolve_node_id().node_id, process_id)
+        self._prefix_upper = self.prefix.upper()
+        self._prefix_int = int(self.prefix or "0", 16) << layout.timestamp_bits
+        self._compile()
+
+    def _compile(self):
+        """Build the compiled encoders, wrapped with counters and latency samplers while metrics are enabled."""
+        self.__dict__.pop("_claim", None)
+        self._tally = None
+        if metrics.enabled:
+            self._claim = metrics.counted_claim(self)
+        # Instance attributes shadow the generic methods below with versions compiled for the layout.
+        functions = self.layout.encoder()(self._claim, self.prefix, self._prefix_upper, self._prefix_int)
+        if metrics.enabled:
+            functions = metrics.sampled_generators(functions)
+        self.generate, self.generate_int, self.generate_bytes = functions
+
+    def _claim(self, count=1):
+        """Claim a contiguous range of timestamp/sequence slots.
+
+        Args:
+            count (int): Number of slots to claim.
+
+        Returns:
+            int: The first claimed timestamp field value, the millisecond shifted left by ``sequence_bits`` plus the sequence. Further slots follow every ``shards`` values.
+        """
+        bits = self.sequence_bits
+        shards = self.shards
+        millis = self._clock()
+        if millis < self._clock_last:
+            millis = self._regressed(millis)
+        self._clock_last = millis
+        now = millis << bits
+        tick = self._last + shards
+        if tick < now:
+            tick = now + (self.shard - now) % shards
+        last = tick + (count - 1) * shards
+        if self.overflow == "spin" and last >> bits > now >> bits:
+            millis = last >> bits
+            clock = self._clock
+            while clock() < millis:
+                pass
+        self._last = last
+        return tick
+
+    def _regressed(self, millis):
+        """Count a clock regression and apply the regression policy.
+
+        Args:
+            millis (int): The clock reading, earlier than the previous one.
+
+        Returns:
+            int: The reading to use in place of `millis`.
+
+        Raises:
+            ClockRegressionError: Under the ``"raise"`` policy.
+        """
+        behind = self._clock_last - millis
+        self.regressions += 1
+        self.regression_ms = max(self.regression_ms, behind)
+        if self._tally is not None:
+            self._tally[2] += 1
+            self._tally[3] = max(self._tally[3], behind)
+        if self.regression == "raise":
+            raise ClockRegressionError(f"Clock moved back {behind} ms")
+        if self.regression == "wait":
+            while millis < self._clock_last:
+                time.sleep((self._clock_last - millis) / 1000)
+                millis = self._clock()
+            return millis
+        return self._clock_last
+
+    # The methods below are the reference implementations; each generator
+    # replaces them with versions compiled for its layout in _reset().
+
+    def generate(self, upper=False):
+        """Generate a fixed-length serial number.
+
+        Args:
+            upper (bool): Render the serial with uppercase hexadecimal digits.
+
+        Returns:
+            str: The generated serial number, consisting of the MAC address, process ID, and timestamp.
+        """
+        return format(SerialGenerator.generate_int(self), f"0{self.layout.length}{'X' if upper else 'x'}")
+
+    def generate_int(self):
+        """Generate a serial number as an integer, 112 bits wide in the default layout.
+
+        Returns:
+            int: The generated serial number.
+        """
+        value = self._prefix_int | self._claim()
+        checksum_bits = self.layout.checksum_bits
+        return value << checksum_bits | self.layout.checksum(value) if checksum_bits else value
+
+    def generate_bytes(self):
+        """Generate a serial number as big-endian bytes, 14 in the default layout.
+
+        Returns:
+            bytes: The generated serial number.
+        """
+        return SerialGenerator.generate_int(self).to_bytes(self.layout.size, "big")
+
+    def reserve_block(self, count):
+        """Reserve a block of consecutive serial numbers in one step.
+
+        Under the ``"spin"`` policy this waits until the clock reaches the last
+        millisecond of the block.
+
+        Args:
+            count (int): Number of serial numbers to reserve.
+
+        Returns:
+            SerialBlock: The reserved block.
+
+        Raises:
+            ValueError: If `count` is negative.
+        """
+        if count < 0:
+            raise ValueError(f"Invalid block size {count}")
+        first = self._claim(count) if count else self._last + self.shards
+        return SerialBlock(self.prefix, first, count, self.shards, self.layout)
+
+    def generate_base32(self):
+        """Generate a serial number as Crockford base32, 23 characters in the default layout.
+
+        Returns:
+            str: The generated serial number.
+        """
+        return encode_base32(self.generate_int(), self.layout.bits)
+
+    def generate_base62(self):
+        """Generate a serial number as base62, 19 characters in the default layout.
+
+        Returns:
+            str: The generated serial number.
+        """
+        return encode_base62(self.generate_int(), self.layout.bits)
+
+
+# Serials in a block are rendered as a shared head plus the lowest
+# ``_BLOCK_DIGITS`` hexadecimal digits of the timestamp, taken from a table.
+_BLOCK_DIGITS = 3
+_BLOCK_BITS = 4 * _BLOCK_DIGITS
+_BLOCK_MASK = (1 << _BLOCK_BITS) - 1
+_block_tails = {}
+
+def _get_block_tails(upper=False):
+    """Build the digit tables on first use, as str and as bytes.
+
+    Args:
+        upper (bool): Use uppercase hexadecimal digits.
+
+    Returns:
+        tuple: Every ``_BLOCK_DIGITS``-digit hexadecimal string, and the same as bytes.
+    """
+    if upper not in _block_tails:
+        tails = tuple(f"{i:0{_BLOCK_DIGITS}{'X' if upper else 'x'}}" for i in range(1 << _BLOCK_BITS))
+        _block_tails[upper] = (tails, tuple(tail.encode() for tail in tails))
+    return _block_tails[upper]
+
+
+class SerialBlock:
+    """A block of serial numbers sharing one prefix.
+
+    The serials are rendered on demand. Consecutive timestamps only differ in
+    their lowest digits, so ``to_bytes()`` and ``to_list()`` join a shared head
+    onto runs of precomputed digit strings instead of formatting each serial.
+    Layouts with a checksum, which changes with every serial, are rendered one
+    serial at a time.
+
+    Args:
+        prefix (str): The MAC address and process ID prefix.
+        first (int): The first timestamp field value of the block.
+        count (int): Number of serial numbers in the block.
+        step (int): Distance between consecutive timestamp field values.
+        layout (SerialLayout): The serial format. Defaults to ``klingon_serial.layout.DEFAULT_LAYOUT``.
+    """
+
+    def __init__(self, prefix, first, count, step=1, layout=None):
+        self.prefix = prefix
+        self.first = first
+        self.count = count
+        self.step = step
+        self.layout = layout or DEFAULT_LAYOUT
+        self._tabled = not self.layout.checksum_bits and self.layout.timestamp_bits >= _BLOCK_BITS
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if not self._tabled:
+            length = self.layout.length
+            for value in self._values():
+                yield f"{value:0{length}x}"
+            return
+        prefix = self.prefix
+        digits = self.layout.timestamp_bits // 4
+        for tick in range(self.first, self.first + self.count * self.step, self.step):
+            yield f"{prefix}{tick:0{digits}x}"
+
+    def _values(self):
+        """Yield the serial numbers as integers, checksum included."""
+        layout = self.layout
+        prefix = int(self.prefix or "0", 16) << layout.timestamp_bits
+        checksum_bits = layout.checksum_bits
+        for tick in range(self.first, self.first + self.count * self.step, self.step):
+            value = prefix | tick
+            yield value << checksum_bits | layout.checksum(value) if checksum_bits else value
+
+    def chunks(self, size):
+        """Split the block into consecutive smaller blocks.
+
+        Args:
+            size (int): Maximum number of serial numbers per chunk.
+
+        Yields:
+            SerialBlock: The chunks, in order.
+        """
+        for start in range(0, self.count, size):
+            yield SerialBlock(self.prefix, self.first + start * self.step, min(size, self.count - start), self.step, self.layout)
+
+    def _runs(self, upper=False):
+        """Split the block into runs that share all but the lowest digits.
+
+        Args:
+            upper (bool): Use uppercase hexadecimal digits.
+
+        Yields:
+            tuple: The shared head string and the slice of the digit table that completes it.
+        """
+        prefix = self.prefix.upper() if upper else self.prefix
+        digits = "X" if upper else "x"
+        width = self.layout.timestamp_bits // 4 - _BLOCK_DIGITS
+        step = self.step
+        tick = self.first
+        end = tick + self.count * step
+        while tick < end:
+            high = tick >> _BLOCK_BITS
+            stop = min(end, (high + 1) << _BLOCK_BITS)
+            yield f"{prefix}{high:0{width}{digits}}", slice(tick & _BLOCK_MASK, ((stop - 1) & _BLOCK_MASK) + 1, step)
+            tick += -(-(stop - tick) // step) * step
+
+    def to_bytes(self, separator=b"", upper=False, opening=b""):
+        """Render the block as a buffer of fixed-width ASCII records.
+
+        Each record is `opening`, the hexadecimal serial and `separator`,
+        which is enough to frame the serials as lines, JSON strings or XML
+        elements without touching them one by one.
+
+        Args:
+            separator (bytes): Bytes appended to every serial.
+            upper (bool): Use uppercase hexadecimal digits.
+            opening (bytes): Bytes prepended to every serial.
+
+        Returns:
+            bytes: The records, concatenated.
+        """
+        if not self._tabled:
+            return b"".join(opening + serial.encode() + separator for serial in self.to_list(upper))
+        table = _get_block_tails(upper)[1]
+        chunks = []
+        for head, tails in self._runs(upper):
+            head = opening + head.encode()
+            chunks.append(head + (separator + head).join(table[tails]) + separator)
+        return b"".join(chunks)
+
+    def to_packed(self):
+        """Render the block as a buffer of packed serial numbers, 14 bytes each in the default layout.
+
+        Returns:
+            bytes: The packed serial numbers, concatenated.
+        """
+        if self._tabled and not self.layout.length % 2:
+            return unhexlify(self.to_bytes())
+        size = self.layout.size
+        return b"".join(value.to_bytes(size, "big") for value in self._values())
+
+    def to_list(self, upper=False):
+        """Render the block as a list of serial number strings.
+
+        Args:
+            upper (bool): Use uppercase hexadecimal digits.
+
+        Returns:
+            list: The serial numbers as strings.
+        """
+        if not self._tabled:
+            spec = f"0{self.layout.length}{'X' if upper else 'x'}"
+            return [format(value, spec) for value in self._values()]
+        table = _get_block_tails(upper)[0]
+        serials = []
+        for head, tails in self._runs(upper):
+            serials += [head + tail for tail in table[tails]]
+        return serials
+
+    def to_base32(self):
+        """Render the block as a list of Crockford base32 serial numbers.
+
+        Returns:
+            list: The serial numbers as base32 strings.
+        """
+        return encode_base32_batch(self.to_packed(), self.layout.size, self.layout.bits)
+
+    def to_base62(self):
+        """Render the block as a list of base62 serial numbers.
+
+        Returns:
+            list: The serial numbers as base62 strings.
+        """
+        return encode_base62_batch(self.to_packed(), self.layout.size, self.layout.bits)
+
+
+class ThreadSafeSerialGenerator:
+    """Serial number generator that can be shared between threads.
+
+    Rather than serialising every call on one lock, each thread leases a slot
+    the first time it generates a serial and then draws from its own
+    ``SerialGenerator``. Slot ``k`` is folded into the low ``thread_bits`` of
+    the timestamp field as an extra level of sharding, so threads never
+    contend or collide. Give the generator at least ``thread_bits`` sequence
+    bits to keep every thread's serials within the current millisecond;
+    otherwise threads take turns on whole milliseconds.
+
+    Slots are returned when their thread exits. A slot keeps its position in
+    the slot space, so a thread that reuses it never repeats serials that were
+    issued by the previous owner.
+
+    Args:
+        thread_bits (int): Number of bits used for the thread slot, allowing ``2 ** thread_bits`` concurrent threads.
+        sequence_bits (int): Number of timestamp field bits used for the in-millisecond sequence. Defaults to the layout's.
+        overflow (str): Policy when the sequence is exhausted, one of ``OVERFLOW_POLICIES``.
+        shard (int): Index of the slot shard this generator issues from.
+        shards (int): Number of shards the slot space is divided into.
+        clock (callable): Time source returning milliseconds since the Unix epoch. Defaults to ``klingon_serial.clock.default_clock``.
+        regression (str): Policy when the clock moves backwards, one of ``REGRESSION_POLICIES``.
+        layout (SerialLayout): The serial format. Defaults to ``klingon_serial.layout.DEFAULT_LAYOUT``.
+
+    Raises:
+        ValueError: If the thread bits are negative or any argument is rejected by ``SerialGenerator``.
+    """
+
+    def __init__(self, thread_bits=6, sequence_bits=None, overflow="borrow", shard=0, shards=1, clock=None, regression="hold", layout=None):
+        if thread_bits < 0:
+            raise ValueError(f"Invalid thread bits {thread_bits}")
+        threads = 1 << thread_bits
+        self.thread_bits = thread_bits
+        self.shard = shard
+        self.shards = shards
+        self._slots = [
+            SerialGenerator(sequence_bits, overflow, slot * shards + shard, threads * shards, clock, regression, layout)
+            for slot in range(threads)
+        ]
+        self._lock = threading.Lock()
+        self._reset()
+        _generators.add(self)
+
+    @property
+    def prefix(self):
+        """str: The MAC address and process ID prefix."""
+        return self._slots[0].prefix
+
+    @property
+    def layout(self):
+        """SerialLayout: The serial format."""
+        return self._slots[0].layout
+
+    @property
+    def regressions(self):
+        """int: Clock regressions seen across all threads."""
+        return sum(slot.regressions for slot in self._slots)
+
+    @property
+    def regression_ms(self):
+        """int: The largest clock regression seen by any thread, in milliseconds."""
+        return max(slot.regression_ms for slot in self._slots)
+
+    def _reset(self):
+        """Forget all slot leases, e.g. after the process forked."""
+        self._local = threading.local()
+        self._free = list(range(len(self._slots) - 1, -1, -1))
+        self._leases = 0
+
+    def _release(self, slot, leases):
+        """Return a slot to the free list unless the leases were reset since it was taken."""
+        with self._lock:
+            if leases == self._leases:
+                self._free.append(slot)
+
+    def _acquire(self):
+        """Lease a slot for the calling thread.
+
+        Returns:
+            SerialGenerator: The calling thread's generator.
+
+        Raises:
+            RuntimeError: If every slot is leased by a live thread.
+        """
+        with self._lock:
+            if not self._free:
+                raise RuntimeError(f"More than {len(self._slots)} threads are generating serials")
+            slot = self._free.pop()
+            lease = _SlotLease()
+            weakref.finalize(lease, self._release, slot, self._leases)
+        local = self._local
+        local.lease = lease
+        local.generator = self._slots[slot]
+        return local.generator
+
+    def _current(self):
+        """Get the calling thread's generator, leasing a slot if needed.
+
+        Returns:
+            SerialGenerator: The calling thread's generator.
+        """
+        try:
+            return self._local.generator
+        except AttributeError:
+            return self._acquire()
+
+    def generate(self, upper=False):
+        """Generate a fixed-length serial number.
+
+        Args:
+            upper (bool): Render the serial with uppercase hexadecimal digits.
+
+        Returns:
+            str: The generated serial number, consisting of the MAC address, process ID, and timestamp.
+        """
+        try:
+            return self._local.generator.generate(upper)
+        except AttributeError:
+            return self._acquire().generate(upper)
+
+    def generate_int(self):
+        """Generate a serial number as a 112-bit integer.
 
-def generate_serial():
+        Returns:
+            int: The generated serial number.
+        """
+        return self._current().generate_int()
+
+    def generate_bytes(self):
+        """Generate a serial number as 14 big-endian bytes.
+
+        Returns:
+            bytes: The generated serial number.
+        """
+        return self._current().generate_bytes()
+
+    def reserve_block(self, count):
+        """Reserve a block of serial numbers from the calling thread's slot.
+
+        Args:
+            count (int): Number of serial numbers to reserve.
+
+        Returns:
+            SerialBlock: The reserved block.
+        """
+        return self._current().reserve_block(count)
+
+    def generate_base32(self):
+        """Generate a serial number as Crockford base32.
+
+        Returns:
+            str: The generated serial number.
+        """
+        return self._current().generate_base32()
+
+    def generate_base62(self):
+        """Generate a serial number as base62.
+
+        Returns:
+            str: The generated serial number.
+        """
+        return self._current().generate_base62()
+
+
+class _SlotLease:
+    """Per-thread marker whose finalizer returns the thread's slot."""
+
+
+# Live generators, whose cached prefixes are rebuilt in forked children.
+_generators = weakref.WeakSet()
+
+def _reset_after_fork():
+    """Drop process-specific cached state in a forked child."""
+    global _process_id_hex
+    _process_id_hex = None
+    for generator in list(_generators):
+        generator._reset()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+_generator = ThreadSafeSerialGenerator()
+
+def generate_serial(upper=False):
     """Generate a fixed-length serial number.
 
+    Safe to call from any number of threads; see ``ThreadSafeSerialGenerator``.
+
+    Args:
+        upper (bool): Render the serial with uppercase hexadecimal digits.
+
     Returns:
         str: The generated serial number, consisting of the MAC address, process ID, and epoch time.
     """
-    mac_address_hex = get_mac_address_hex()
-    process_id = get_process_id()
-    epoch_millis_hex = get_millisecond_epoch_hex()
-    serial = f"{mac_address_hex}{process_id}{epoch_millis_hex}"
-    return serial
+    return _generator.generate(upper)
+
+def generate_serial_int():
+    """Generate a serial number as a 112-bit integer.
 
-debug = get_debug()
+    Returns:
+        int: The generated serial number.
+    """
+    return _generator.generate_int()
+
+def generate_serial_bytes():
+    """Generate a serial number as 14 big-endian bytes.
+
+    Returns:
+        bytes: The generated serial number.
+    """
+    return _generator.generate_bytes()
+
+def generate_serial_base32():
+    """Generate a serial number as 23 Crockford base32 characters.
+
+    Returns:
+        str: The generated serial number.
+    """
+    return _generator.generate_base32()
+
+def generate_serial_base62():
+    """Generate a serial number as 19 base62 characters.
+
+    Returns:
+        str: The generated serial number.
+    """
+    return _generator.generate_base62()
+
+def configure_shard(shard, shards):
+    """Replace the module-level generator with one that issues from a single shard.
+
+    Args:
+        shard (int): Index of the slot shard to issue from.
+        shards (int): Number of shards the slot space is divided into.
+    """
+    global _generator
+    _generator = ThreadSafeSerialGenerator(shard=shard, shards=shards)
+
+def shard_initializer(counter, shards):
+    """Give each pool worker its own shard of the slot space.
+
+    Intended as the ``initializer`` of a ``ProcessPoolExecutor`` or
+    ``multiprocessing.Pool``, with a shared ``multiprocessing.Value`` counter::
+
+        counter = multiprocessing.Value("i", 0)
+        ProcessPoolExecutor(4, initializer=shard_initializer, initargs=(counter, 4))
+
+    Workers started after the first `shards` reuse shards modulo `shards`.
+
+    Args:
+        counter (multiprocessing.Value): Shared integer counter handing out shard indexes.
+        shards (int): Number of shards the slot space is divided into.
+    """
+    with counter.get_lock():
+        shard = counter.value
+        counter.value += 1
+    configure_shard(shard % shards, shards)
+
+def clock_regressions():
+    """Get the clock regressions seen by the module-level generator.
+
+    Returns:
+        tuple: The number of regressions and the largest one in milliseconds.
+    """
+    return _generator.regressions, _generator.regression_ms
+
+def reserve_block(count):
+    """Reserve a block of consecutive serial numbers from the module-level generator.
+
+    Args:
+        count (int): Number of serial numbers to reserve.
+
+    Returns:
+        SerialBlock: The reserved block.
+    """
+    return _generator.reserve_block(count)
+
+def generate_serials(count, as_bytes=False, encoding="hex"):
+    """Generate many serial numbers in one step.
+
+    Args:
+        count (int): Number of serial numbers to generate.
+        as_bytes (bool): Return a buffer of fixed 28-byte records instead of a list of strings.
+        encoding (str): Text encoding of the list, ``"hex"``, ``"base32"`` or ``"base62"``.
+
+    Returns:
+        list or bytes: The generated serial numbers.
+
+    Raises:
+        ValueError: If `encoding` is unknown.
+    """
+    if encoding != "hex" and encoding not in ENCODINGS:
+        raise ValueError(f"Unknown serial encoding {encoding}")
+    block = _generator.reserve_block(count)
+    if as_bytes:
+        return block.to_bytes()
+    if encoding == "base32":
+        return block.to_base32()
+    if encoding == "base62":
+        return block.to_base62()
+    return block.to_list()
 
-if debug:
+def print_debug_info():
+    """Print the serial number components and a sample serial for diagnostics."""
     mac_address, interface = get_mac_address_and_interface()
-    print("Network Interface:       ", interface) 
-    print("MAC Address (int):       ",uuid.getnode())
-    print("MAC Address (hex):       ",get_mac_address_hex())
-    print("Process ID (hex):        ",get_process_id())
-    print("Epoch datetime (ms):     ",int(datetime.now(timezone.utc).timestamp() * 1000))
-    print("Epoch datetime (hex):    ",get_millisecond_epoch_hex())
-    print("Generated Serial:        ",generate_serial())
-    print("Serial Valid:            ", is_valid_serial(generate_serial()))
-    print("Serial Length:           ",len(generate_serial()))
+    node = resolve_node_id()
+    serial = generate_serial()
+    print("Network Interface:       ", interface)
+    print("Node ID Source:          ", node.source)
+    print("MAC Address (int):       ", node.node_id)
+    print("MAC Address (hex):       ", get_mac_address_hex())
+    print("Process ID (hex):        ", get_process_id())
+    print("Epoch datetime (ms):     ", time.time_ns() // 1_000_000)
+    print("Epoch datetime (hex):    ", get_millisecond_epoch_hex())
+    print("Generated Serial:        ", serial)
+    print("Serial Valid:            ", is_valid_serial(serial))
+    print("Serial Length:           ", len(serial))
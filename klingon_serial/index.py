@@ -0,0 +1,275 @@
+"""
+This module provides `SerialIndex`, a sorted file of packed serial numbers
+that answers range queries without parsing them.
+
+Serials are stored as 14-byte records after a 16-byte header, sorted in one
+of two orders chosen when the file is created:
+
+- ``"timestamp"``: by timestamp, then node ID and process ID. Serials
+  created between two times are one contiguous range.
+- ``"serial"``: by value, that is by node ID, process ID and timestamp.
+  The serials of a node, of one of its processes, or of a process between
+  two times are one contiguous range.
+
+The file is memory-mapped, so opening it reads only the header and a query
+touches only the pages its binary search visits: about 27 records for 100
+million serials. `select()` returns the matching records as a `memoryview`
+slice of the map, with no copying.
+
+Serials added after the last record are appended. Serials that sort earlier
+are merged in: the records after the first insertion point are rewritten in
+place, so a timestamp index fed roughly in time order stays cheap to add to.
+Views of records past the insertion point see the rewritten records; copy a
+view with ``bytes()`` to keep it. One process should add to an index at a
+time; readers in other processes see additions after `refresh()`.
+"""
+import heapq
+import mmap
+import os
+import struct
+from .validate import PROCESS_ID_BITS, SERIAL_BYTES, SERIAL_LENGTH, TIMESTAMP_BITS
+
+# Sort orders of an index.
+INDEX_ORDERS = ("timestamp", "serial")
+
+# Header: magic, sort order and sequence bits.
+_MAGIC = b"KSINDEX1"
+_HEADER = struct.Struct(">8sBB6x")
+
+_TICK_MASK = (1 << TIMESTAMP_BITS) - 1
+_PROCESS_ID_MASK = (1 << PROCESS_ID_BITS) - 1
+_unpack_low = struct.Struct(">Q").unpack_from
+
+
+class SerialIndex:
+    """A sorted, memory-mapped file of packed serial numbers.
+
+    Args:
+        path (str): The index file, created if missing.
+        order (str): The sort order of a new index, ``"timestamp"`` or ``"serial"``.
+        sequence_bits (int): Number of timestamp field bits the generators used for their sequence, for a new index.
+
+    Raises:
+        ValueError: If the order is unknown or the file is not a serial index.
+    """
+
+    def __init__(self, path, order="timestamp", sequence_bits=0):
+        if order not in INDEX_ORDERS:
+            raise ValueError(f"Unknown index order {order!r}")
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if not header:
+                header = _HEADER.pack(_MAGIC, INDEX_ORDERS.index(order), sequence_bits)
+                os.pwrite(self._fd, header, 0)
+            if len(header) < _HEADER.size or header[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"{path} is not a serial index")
+            _, order_code, self.sequence_bits = _HEADER.unpack(header)
+            self.order = INDEX_ORDERS[order_code]
+            self.refresh()
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._key = _timestamp_key if self.order == "timestamp" else _value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Get one record as a 14-byte `memoryview`."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("SerialIndex index out of range")
+        offset = _HEADER.size + index * SERIAL_BYTES
+        return self._view[offset:offset + SERIAL_BYTES]
+
+    def __iter__(self):
+        view = self._view
+        for offset in range(_HEADER.size, _HEADER.size + self._count * SERIAL_BYTES, SERIAL_BYTES):
+            yield view[offset:offset + SERIAL_BYTES]
+
+    def refresh(self):
+        """Map the file again to see records added since it was opened.
+
+        Raises:
+            ValueError: If the file ends in a partial record.
+        """
+        size = os.fstat(self._fd).st_size
+        count, remainder = divmod(size - _HEADER.size, SERIAL_BYTES)
+        if remainder:
+            raise ValueError(f"{self.path} ends in a partial record")
+        # Views handed out earlier keep the old map alive; it is never closed
+        # here, since closing a map with live views raises.
+        self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._count = count
+
+    def add(self, serials):
+        """Add serial numbers to the index, keeping it sorted.
+
+        Args:
+            serials: A `SerialBlock`, a buffer of packed 14-byte records, or an iterable of serials as hexadecimal strings, packed bytes, integers or `Serial` objects.
+
+        Returns:
+            int: The number of serials added.
+
+        Raises:
+            ValueError: If any serial is malformed.
+        """
+        records = sorted(_records(serials), key=self._key)
+        if not records:
+            return 0
+        key, before = self._key, self._count
+        start = self._bisect(key(records[0]), key, right=True)
+        offset = _HEADER.size + start * SERIAL_BYTES
+        if start < self._count:
+            tail = self._map[offset:_HEADER.size + self._count * SERIAL_BYTES]
+            existing = [tail[at:at + SERIAL_BYTES] for at in range(0, len(tail), SERIAL_BYTES)]
+            records = heapq.merge(existing, records, key=key)
+        os.pwrite(self._fd, b"".join(records), offset)
+        self.refresh()
+        return self._count - before
+
+    def merge(self, *indexes):
+        """Add every serial of other indexes, whatever their order.
+
+        Args:
+            *indexes (SerialIndex): The indexes to merge in.
+
+        Returns:
+            int: The number of serials added.
+        """
+        return sum(self.add(index._view[_HEADER.size:_HEADER.size + len(index) * SERIAL_BYTES]) for index in indexes)
+
+    def select(self, start=None, end=None, node=None, process_id=None):
+        """Find the serials in a range with a binary search.
+
+        A timestamp index answers time ranges. A serial index answers a node
+        ID, a node ID and process ID, or those with a time range. Other
+        queries are not one contiguous range in the index's order.
+
+        Args:
+            start (int): Optional first epoch millisecond, inclusive.
+            end (int): Optional last epoch millisecond, inclusive.
+            node (int): Optional node ID.
+            process_id (int): Optional process ID; requires `node`.
+
+        Returns:
+            memoryview: The matching 14-byte records, in index order, sharing memory with the map.
+
+        Raises:
+            ValueError: If the index's order cannot answer the query with one range.
+        """
+        span = 1 << TIMESTAMP_BITS
+        low = 0 if start is None else min(max(start, 0) << self.sequence_bits, span)
+        high = span if end is None else min(max(end + 1, 0) << self.sequence_bits, span)
+        if self.order == "timestamp":
+            if node is not None or process_id is not None:
+                raise ValueError("A timestamp index can only select time ranges; use a serial index")
+            key = _tick
+        elif node is None:
+            raise ValueError("A serial index needs a node ID to select a range")
+        elif process_id is None:
+            if start is not None or end is not None:
+                raise ValueError("A serial index needs a process ID to select a time range")
+            prefix = node << (PROCESS_ID_BITS + TIMESTAMP_BITS)
+            low, high, key = prefix, prefix + (1 << (PROCESS_ID_BITS + TIMESTAMP_BITS)), _value
+        else:
+            prefix = (node << PROCESS_ID_BITS | process_id & _PROCESS_ID_MASK) << TIMESTAMP_BITS
+            low, high, key = prefix + low, prefix + high, _value
+        first = self._bisect(low, key)
+        last = self._bisect(high, key, low=first)
+        return self._view[_HEADER.size + first * SERIAL_BYTES:_HEADER.size + last * SERIAL_BYTES]
+
+    def count(self, start=None, end=None, node=None, process_id=None):
+        """Count the serials in a range, taking the same arguments as `select()`.
+
+        Returns:
+            int: The number of matching serials.
+        """
+        return len(self.select(start, end, node, process_id)) // SERIAL_BYTES
+
+    def _bisect(self, target, key, right=False, low=0):
+        """Find where `target` sorts among the records by `key`.
+
+        Args:
+            target: The key to look for.
+            key (callable): Function of a buffer and the offset of a record in it giving the record's key.
+            right (bool): Place `target` after records with an equal key.
+            low (int): Index of the first record to search.
+
+        Returns:
+            int: The index of the first record whose key is not less than `target`, or greater with `right`.
+        """
+        view = self._map
+        high = self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = _HEADER.size + middle * SERIAL_BYTES
+            found = key(view, offset)
+            if found < target or right and found == target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def close(self):
+        """Close the index file. Views already returned stay readable."""
+        self._view = self._map = None
+        os.close(self._fd)
+
+
+def _tick(record, offset=0):
+    """Get the timestamp field of a packed record."""
+    return _unpack_low(record, offset + SERIAL_BYTES - 8)[0] & _TICK_MASK
+
+
+def _value(record, offset=0):
+    """Get a packed record as an integer."""
+    return int.from_bytes(record[offset:offset + SERIAL_BYTES], "big")
+
+
+def _timestamp_key(record, offset=0):
+    """Sort key of a timestamp index: timestamp, then node ID and process ID."""
+    value = _value(record, offset)
+    return (value & _TICK_MASK) << (8 * SERIAL_BYTES - TIMESTAMP_BITS) | value >> TIMESTAMP_BITS
+
+
+def _records(serials):
+    """Split serials in any supported form into packed 14-byte records.
+
+    Raises:
+        ValueError: If any serial is malformed.
+    """
+    if hasattr(serials, "to_packed"):
+        serials = serials.to_packed()
+    if isinstance(serials, (bytes, bytearray, memoryview)):
+        data = bytes(serials)
+        if len(data) % SERIAL_BYTES:
+            raise ValueError(f"Packed serials must be a multiple of {SERIAL_BYTES} bytes")
+        return [data[at:at + SERIAL_BYTES] for at in range(0, len(data), SERIAL_BYTES)]
+    records = []
+    for serial in serials:
+        try:
+            if isinstance(serial, str):
+                if len(serial) != SERIAL_LENGTH:
+                    raise ValueError
+                record = bytes.fromhex(serial)
+            elif isinstance(serial, (bytes, bytearray, memoryview)):
+                record = bytes(serial)
+            else:
+                record = int(serial).to_bytes(SERIAL_BYTES, "big")
+        except (ValueError, OverflowError, TypeError):
+            raise ValueError(f"Invalid serial {serial!r}") from None
+        if len(record) != SERIAL_BYTES:
+            raise ValueError(f"Invalid serial {serial!r}")
+        records.append(record)
+    return records
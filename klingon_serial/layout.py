@@ -0,0 +1,262 @@
+"""
+This module describes serial number layouts. A `SerialLayout` gives the width
+of each field, the epoch timestamps count from, the number of timestamp bits
+used for the in-millisecond sequence and an optional trailing checksum:
+
+    node ID | process ID | timestamp (sequence in the low bits) | checksum
+
+``DEFAULT_LAYOUT`` is the standard 12/5/11 hexadecimal character format.
+
+A layout is compiled once into specialised functions: `SerialLayout.encoder()`
+builds the generator's ``generate()``, ``generate_int()`` and
+``generate_bytes()`` with the field widths, shifts and checksum written into
+their code, and `SerialLayout.decoder()` does the same for decoding. Compiled
+code is cached per layout, so a generator pays for its layout's flexibility
+once, when it is built, and not on every serial.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from .utils import SerialFields
+from .validate import _HEX_DIGITS_BYTES, MAC_ADDRESS_BITS, PROCESS_ID_BITS, TIMESTAMP_BITS
+
+_LayoutFields = namedtuple(
+    "SerialLayout", ["node_bits", "process_id_bits", "timestamp_bits", "sequence_bits", "epoch", "checksum_bits"]
+)
+
+
+class SerialLayout(_LayoutFields):
+    """The field widths and options of a serial number format.
+
+    Field widths are in bits and must be multiples of 4, so every field is a
+    whole number of hexadecimal characters. Node IDs and process IDs wider
+    than their fields are reduced to their low bits; a process ID field
+    narrower than the platform's ``pid_max`` can therefore repeat for two live
+    processes, so size it to fit (22 bits covers ``pid_max=4194304``).
+
+    The checksum, when enabled, is the serial modulo the largest prime that
+    fits in ``checksum_bits``. It catches every single-character change and
+    every swap of two adjacent characters ahead of the checksum field.
+
+    Args:
+        node_bits (int): Width of the node ID field.
+        process_id_bits (int): Width of the process ID field.
+        timestamp_bits (int): Width of the timestamp field, including the sequence.
+        sequence_bits (int): Number of low timestamp bits used for the in-millisecond sequence.
+        epoch (int): Milliseconds since the Unix epoch that timestamps count from.
+        checksum_bits (int): Width of the trailing checksum, 0 or 8 to 32.
+
+    Raises:
+        ValueError: If a width is not a non-negative multiple of 4, the sequence leaves no timestamp bits, or the checksum or epoch is out of range.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, node_bits=MAC_ADDRESS_BITS, process_id_bits=PROCESS_ID_BITS, timestamp_bits=TIMESTAMP_BITS,
+                sequence_bits=0, epoch=0, checksum_bits=0):
+        for name, bits in (("node", node_bits), ("process ID", process_id_bits),
+                           ("timestamp", timestamp_bits), ("checksum", checksum_bits)):
+            if bits < 0 or bits % 4:
+                raise ValueError(f"Invalid {name} bits {bits}: must be a non-negative multiple of 4")
+        if not 0 <= sequence_bits < timestamp_bits:
+            raise ValueError(f"Invalid sequence bits {sequence_bits} for a {timestamp_bits}-bit timestamp")
+        if checksum_bits and not 8 <= checksum_bits <= 32:
+            raise ValueError(f"Invalid checksum bits {checksum_bits}: must be 0 or 8 to 32")
+        if epoch < 0:
+            raise ValueError(f"Invalid epoch {epoch}")
+        return super().__new__(cls, node_bits, process_id_bits, timestamp_bits, sequence_bits, epoch, checksum_bits)
+
+    @classmethod
+    def _make(cls, iterable):
+        # Validate layouts built by _replace().
+        return cls(*iterable)
+
+    @property
+    def bits(self):
+        """int: Width of a serial number in bits."""
+        return self.node_bits + self.process_id_bits + self.timestamp_bits + self.checksum_bits
+
+    @property
+    def length(self):
+        """int: Length of a serial number in hexadecimal characters."""
+        return self.bits // 4
+
+    @property
+    def size(self):
+        """int: Length of a packed serial number in bytes."""
+        return (self.bits + 7) // 8
+
+    @property
+    def checksum_modulus(self):
+        """int: The prime the checksum is taken modulo, or 0 without a checksum."""
+        return _largest_prime_below(1 << self.checksum_bits) if self.checksum_bits else 0
+
+    def prefix(self, node_id, process_id):
+        """Render the node ID and process ID fields.
+
+        Args:
+            node_id (int): The node ID, reduced to ``node_bits``.
+            process_id (int): The process ID, reduced to ``process_id_bits``.
+
+        Returns:
+            str: The fields as lowercase hexadecimal.
+        """
+        node = f"{node_id & ((1 << self.node_bits) - 1):0{self.node_bits // 4}x}" if self.node_bits else ""
+        process = f"{process_id & ((1 << self.process_id_bits) - 1):0{self.process_id_bits // 4}x}" if self.process_id_bits else ""
+        return node + process
+
+    def checksum(self, value):
+        """Compute the checksum of a serial number without its checksum field.
+
+        Args:
+            value (int): The node ID, process ID and timestamp fields as an integer.
+
+        Returns:
+            int: The checksum, or 0 without a checksum.
+        """
+        modulus = self.checksum_modulus
+        return value % modulus if modulus else 0
+
+    def encoder(self):
+        """Get the compiled encoder factory for this layout.
+
+        The factory takes the generator's ``claim()`` function and its prefix
+        as a lowercase string, an uppercase string and an integer already
+        shifted past the timestamp field, and returns the ``generate()``,
+        ``generate_int()`` and ``generate_bytes()`` functions.
+
+        Returns:
+            callable: The encoder factory.
+        """
+        return _compile_encoder(self)
+
+    def decoder(self):
+        """Get the compiled decoder for this layout.
+
+        The decoder takes a serial number as an integer and returns its
+        fields, with the timestamp counted from the Unix epoch.
+
+        Returns:
+            callable: The decoder, raising ValueError on a checksum mismatch.
+        """
+        return _compile_decoder(self)
+
+    def is_serial(self, serial):
+        """Check that a string is a serial number in this layout.
+
+        Args:
+            serial (str): The serial number to check.
+
+        Returns:
+            bool: True if it has the layout's length, is hexadecimal and its checksum matches.
+        """
+        if type(serial) is not str or len(serial) != self.length or serial.encode().translate(None, _HEX_DIGITS_BYTES):
+            return False
+        if self.checksum_bits:
+            value = int(serial, 16)
+            return value & ((1 << self.checksum_bits) - 1) == self.checksum(value >> self.checksum_bits)
+        return True
+
+    def parse(self, serial):
+        """Decode a serial number in this layout into its fields.
+
+        Args:
+            serial (str, bytes or int): The serial number as hexadecimal, packed bytes or an integer.
+
+        Returns:
+            SerialFields: The node ID, process ID, timestamp since the Unix epoch and sequence.
+
+        Raises:
+            ValueError: If `serial` is not a valid serial number in this layout.
+        """
+        if isinstance(serial, str):
+            if len(serial) != self.length or serial.encode().translate(None, _HEX_DIGITS_BYTES):
+                raise ValueError(f"Invalid serial {serial!r}")
+            value = int(serial, 16)
+        elif isinstance(serial, (bytes, bytearray)):
+            if len(serial) != self.size:
+                raise ValueError(f"Invalid serial {serial!r}")
+            value = int.from_bytes(serial, "big")
+        else:
+            value = int(serial)
+        if value < 0 or value >> self.bits:
+            raise ValueError(f"Invalid serial {serial!r}")
+        return self.decoder()(value)
+
+
+# The standard 12/5/11 hexadecimal character format.
+DEFAULT_LAYOUT = SerialLayout()
+
+
+@lru_cache(maxsize=None)
+def _largest_prime_below(limit):
+    """Find the largest prime below `limit` by trial division."""
+    candidate = limit - 1
+    while any(candidate % divisor == 0 for divisor in range(2, int(candidate ** 0.5) + 1)):
+        candidate -= 1
+    return candidate
+
+
+_ENCODER_SOURCE = '''\
+def make(claim, prefix, prefix_upper, prefix_int):
+    def generate(upper=False):
+        """Generate a serial number as hexadecimal, in uppercase if `upper` is true."""
+        {hex}
+    def generate_int():
+        """Generate a serial number as an integer."""
+        {int}
+    def generate_bytes():
+        """Generate a serial number as big-endian bytes."""
+        {bytes}
+    return generate, generate_int, generate_bytes
+'''
+
+_DECODER_SOURCE = '''\
+def decode(value):
+    {checksum}tick = value & {tick_mask}
+    return SerialFields(value >> {node_shift}, (value >> {timestamp_bits}) & {process_id_mask}, (tick >> {sequence_bits}) + {epoch}, tick & {sequence_mask})
+'''
+
+
+@lru_cache(maxsize=None)
+def _compile_encoder(layout):
+    """Compile the encoder factory for `layout`."""
+    if layout.checksum_bits:
+        # The checksum covers every field, so the serial is rendered from one integer.
+        seal = f"value = prefix_int | claim(); value = value << {layout.checksum_bits} | value % {layout.checksum_modulus}"
+        hex_body = f'{seal}\n        if upper:\n            return f"{{value:0{layout.length}X}}"\n        return f"{{value:0{layout.length}x}}"'
+        int_body = f"{seal}\n        return value"
+        bytes_body = f'{seal}\n        return value.to_bytes({layout.size}, "big")'
+    else:
+        digits = layout.timestamp_bits // 4
+        hex_body = (f'if upper:\n            return f"{{prefix_upper}}{{claim():0{digits}X}}"\n'
+                    f'        return f"{{prefix}}{{claim():0{digits}x}}"')
+        int_body = "return prefix_int | claim()"
+        bytes_body = f'return (prefix_int | claim()).to_bytes({layout.size}, "big")'
+    source = _ENCODER_SOURCE.format(hex=hex_body, int=int_body, bytes=bytes_body)
+    namespace = {}
+    exec(compile(source, f"<SerialLayout encoder {tuple(layout)}>", "exec"), namespace)
+    return namespace["make"]
+
+
+@lru_cache(maxsize=None)
+def _compile_decoder(layout):
+    """Compile the decoder for `layout`."""
+    checksum = ""
+    if layout.checksum_bits:
+        checksum = (f"payload = value >> {layout.checksum_bits}\n"
+                    f"    if payload % {layout.checksum_modulus} != value & {(1 << layout.checksum_bits) - 1}:\n"
+                    f"        raise ValueError(f\"Invalid serial checksum {{value:x}}\")\n"
+                    f"    value = payload\n    ")
+    source = _DECODER_SOURCE.format(
+        checksum=checksum,
+        tick_mask=(1 << layout.timestamp_bits) - 1,
+        node_shift=layout.timestamp_bits + layout.process_id_bits,
+        timestamp_bits=layout.timestamp_bits,
+        process_id_mask=(1 << layout.process_id_bits) - 1,
+        sequence_bits=layout.sequence_bits,
+        epoch=layout.epoch,
+        sequence_mask=(1 << layout.sequence_bits) - 1,
+    )
+    namespace = {"SerialFields": SerialFields}
+    exec(compile(source, f"<SerialLayout decoder {tuple(layout)}>", "exec"), namespace)
+    return namespace["decode"]
@@ -0,0 +1,268 @@
+"""
+This module provides opt-in instrumentation for serial number generation,
+rendered in the Prometheus text format by `render()`.
+
+Metrics are off unless the ``KLINGON_METRICS`` environment variable is true
+or `enable()` is called. While they are off, generators run their plain
+compiled fast paths and pay nothing. When they are on, each generator's
+``generate()``, ``generate_int()``, ``generate_bytes()`` and slot claims are
+wrapped as it is built, and existing generators are rebuilt by `enable()`:
+
+- ``klingon_serial_issued_total``: serial numbers issued.
+- ``klingon_serial_sequence_exhausted_total``: claims that ran past the
+  current millisecond's sequence, borrowing future milliseconds or spinning.
+- ``klingon_serial_clock_regressions_total`` and
+  ``klingon_serial_clock_regression_max_ms``: clock steps backwards.
+- ``klingon_serial_generate_seconds``: a latency histogram of one call in
+  every ``sample_every``, so its count is the number of samples.
+- ``klingon_serial_node_info``: the node ID and the source it came from.
+
+Counters are kept per generator, and a generator is only used by one thread,
+so counting takes no lock; `render()` sums them. Histograms are shared and
+take a lock, but only for sampled calls. Everything is reset in forked
+children, which are separate processes to a scraper.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from .str2bool import str2bool
+
+METRICS_ENV = "KLINGON_METRICS"
+
+# Default number of calls per latency sample.
+SAMPLE_EVERY = 64
+
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2, 1e-1)
+
+# Whether instrumentation is on; generators read this when they are built.
+enabled = False
+sample_every = SAMPLE_EVERY
+
+# Per-generator counters: [issued, sequence exhausted, clock regressions, largest regression in ms].
+_tallies = []
+# (name, labels) -> Histogram, and name -> help text.
+_histograms = {}
+_help = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """A latency histogram with cumulative buckets, in the Prometheus style.
+
+    Args:
+        buckets (tuple): Ascending upper bounds of the buckets, in seconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._reset()
+
+    def _reset(self):
+        """Forget every observation."""
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Record one observation.
+
+        Args:
+            seconds (float): The observed latency.
+        """
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+
+def histogram(name, documentation, **labels):
+    """Get or create a histogram.
+
+    Args:
+        name (str): The metric name.
+        documentation (str): The metric's help text.
+        **labels: Label names and values identifying one histogram of the metric.
+
+    Returns:
+        Histogram: The histogram.
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        if key not in _histograms:
+            _histograms[key] = Histogram()
+            _help[name] = documentation
+        return _histograms[key]
+
+
+def sampled(function, name, documentation, **labels):
+    """Time one call in every ``sample_every`` calls of a function.
+
+    Args:
+        function (callable): The function to time.
+        name (str): The histogram's metric name.
+        documentation (str): The histogram's help text.
+        **labels: Labels of the histogram.
+
+    Returns:
+        callable: A wrapper recording into the histogram, or `function` itself when metrics are disabled.
+    """
+    if not enabled:
+        return function
+    observe = histogram(name, documentation, **labels).observe
+    every = sample_every
+    countdown = every
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        nonlocal countdown
+        countdown -= 1
+        if countdown:
+            return function(*args, **kwargs)
+        countdown = every
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            observe((clock() - start) / 1e9)
+
+    return wrapper
+
+
+def enable(every=SAMPLE_EVERY):
+    """Turn instrumentation on and rebuild existing generators with it.
+
+    Args:
+        every (int): Number of calls per latency sample.
+    """
+    global enabled, sample_every
+    enabled, sample_every = True, every
+    _rebuild_generators()
+
+
+def disable():
+    """Turn instrumentation off and rebuild existing generators without it.
+
+    Counts gathered so far are kept.
+    """
+    global enabled
+    enabled = False
+    _rebuild_generators()
+
+
+def _rebuild_generators():
+    """Recompile the fast paths of every live `SerialGenerator`."""
+    from .generate import SerialGenerator, _generators
+    for generator in list(_generators):
+        if isinstance(generator, SerialGenerator):
+            generator._compile()
+
+
+def counted_claim(generator):
+    """Wrap a generator's claim function with its issued and exhaustion counters.
+
+    Called by `SerialGenerator` while it builds its fast paths; the counters
+    are also set as the generator's ``_tally`` for it to count regressions.
+
+    Args:
+        generator (SerialGenerator): The generator, whose ``_claim`` is still the plain method.
+
+    Returns:
+        callable: The counting claim function.
+    """
+    tally = [0, 0, 0, 0]
+    with _lock:
+        _tallies.append(tally)
+    generator._tally = tally
+    claim = generator._claim
+    bits = generator.sequence_bits
+
+    def claim_counted(count=1):
+        tick = claim(count)
+        tally[0] += count
+        if generator._last >> bits > generator._clock_last:
+            tally[1] += 1
+        return tick
+
+    return claim_counted
+
+
+def sampled_generators(functions):
+    """Wrap a generator's compiled ``generate()``, ``generate_int()`` and ``generate_bytes()`` with latency samplers.
+
+    Returns:
+        tuple: The wrapped functions, in the same order.
+    """
+    return tuple(
+        sampled(function, "klingon_serial_generate_seconds", "Sampled latency of serial generation.", method=method)
+        for function, method in zip(functions, ("generate", "generate_int", "generate_bytes"))
+    )
+
+
+def render():
+    """Render every metric in the Prometheus text exposition format.
+
+    Returns:
+        str: The exposition, ending in a newline.
+    """
+    from .node import resolve_node_id
+    with _lock:
+        tallies = [list(tally) for tally in _tallies]
+        histograms = sorted(_histograms.items())
+    issued, exhausted, regressions, regression_ms = (
+        sum(tally[0] for tally in tallies),
+        sum(tally[1] for tally in tallies),
+        sum(tally[2] for tally in tallies),
+        max((tally[3] for tally in tallies), default=0),
+    )
+    node = resolve_node_id()
+    lines = []
+    for name, kind, documentation, value in (
+        ("klingon_serial_issued_total", "counter", "Serial numbers issued.", issued),
+        ("klingon_serial_sequence_exhausted_total", "counter", "Claims that ran past the current millisecond's sequence.", exhausted),
+        ("klingon_serial_clock_regressions_total", "counter", "Times the clock moved backwards.", regressions),
+        ("klingon_serial_clock_regression_max_ms", "gauge", "Largest backward clock step in milliseconds.", regression_ms),
+    ):
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    lines += [
+        "# HELP klingon_serial_node_info The node ID in serial numbers and its source.",
+        "# TYPE klingon_serial_node_info gauge",
+        f'klingon_serial_node_info{{node_id="{node.node_id:012x}",source="{node.source}"}} 1',
+    ]
+    described = set()
+    for (name, labels), histogram in histograms:
+        if name not in described:
+            described.add(name)
+            lines += [f"# HELP {name} {_help[name]}", f"# TYPE {name} histogram"]
+        label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+        prefix = label_text + "," if label_text else ""
+        with histogram._lock:
+            counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+        cumulative = 0
+        for bound, bucket in zip(histogram.buckets + (float("inf"),), counts):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{{{prefix}le="{"+Inf" if bound == float("inf") else repr(bound)}"}} {cumulative}')
+        suffix = f"{{{label_text}}}" if label_text else ""
+        lines += [f"{name}_sum{suffix} {total!r}", f"{name}_count{suffix} {count}"]
+    return "\n".join(lines) + "\n"
+
+
+def _reset_after_fork():
+    """Forget the parent's counts in a forked child."""
+    global _lock
+    _lock = threading.Lock()
+    _tallies.clear()
+    for histogram in _histograms.values():
+        histogram._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+try:
+    enabled = bool(str2bool(os.environ.get(METRICS_ENV, "false")))
+except ValueError:
+    enabled = False
@@ -0,0 +1,179 @@
+"""
+This module resolves the 48-bit node ID embedded in serial numbers.
+
+The node ID is resolved once per process from a priority list of sources and
+cached, so node identity costs nothing per serial and never changes while the
+process runs. The sources, in default order, are:
+
+- ``env``: the ``KLINGON_NODE_ID`` environment variable, as hexadecimal with
+  optional ``:`` or ``-`` separators.
+- ``interface``: the MAC address of the default-route interface, or failing
+  that the first non-loopback interface with a non-zero MAC address.
+- ``machine-id``: a hash of ``/etc/machine-id``.
+- ``pod-uid``: a hash of the Kubernetes pod UID, read from the downward API
+  file named by ``KLINGON_POD_UID_FILE``.
+- ``uuid``: ``uuid.getnode()``, when it found a hardware address.
+
+When every source fails a random node ID is drawn once and reused. Hashed and
+random node IDs have the multicast bit set, as RFC 4122 requires for node IDs
+that are not hardware addresses.
+"""
+import os
+import uuid
+from collections import namedtuple
+from functools import lru_cache
+
+NODE_ID_ENV = "KLINGON_NODE_ID"
+NODE_SOURCES_ENV = "KLINGON_NODE_SOURCES"
+POD_UID_FILE_ENV = "KLINGON_POD_UID_FILE"
+DEFAULT_POD_UID_FILE = "/etc/podinfo/uid"
+MACHINE_ID_FILES = ("/etc/machine-id", "/var/lib/dbus/machine-id")
+
+NODE_ID_BITS = 48
+_MULTICAST_BIT = 1 << 40
+
+NodeIdentity = namedtuple("NodeIdentity", ["node_id", "source"])
+NodeIdentity.__doc__ = """The resolved node ID and the name of the source it came from."""
+
+
+def _read_file(path):
+    """Read and strip a small text file.
+
+    Returns:
+        str: The file contents, or None if the file cannot be read or is empty.
+    """
+    try:
+        with open(path) as handle:
+            return handle.read().strip() or None
+    except OSError:
+        return None
+
+
+def _hash_node_id(value):
+    """Derive a node ID from an identifier string.
+
+    Returns:
+        int: The first 48 bits of the SHA-256 digest, with the multicast bit set.
+    """
+    import hashlib
+    digest = hashlib.sha256(value.encode()).digest()
+    return int.from_bytes(digest[:6], "big") | _MULTICAST_BIT
+
+
+def _parse_mac_address(value):
+    """Parse a MAC address or node ID written as hexadecimal.
+
+    Returns:
+        int: The node ID, or None if `value` is not 1 to 12 hexadecimal digits or is all zeros.
+    """
+    digits = value.replace(":", "").replace("-", "")
+    if not 0 < len(digits) <= NODE_ID_BITS // 4:
+        return None
+    try:
+        node_id = int(digits, 16)
+    except ValueError:
+        return None
+    return node_id or None
+
+
+def node_id_from_env():
+    """Get the node ID from the ``KLINGON_NODE_ID`` environment variable."""
+    value = os.environ.get(NODE_ID_ENV)
+    return _parse_mac_address(value) if value else None
+
+
+def _default_route_interface():
+    """Find the interface of the IPv4 default route from ``/proc/net/route``.
+
+    Returns:
+        str: The interface name, or None if there is no default route or no procfs.
+    """
+    routes = _read_file("/proc/net/route")
+    for line in (routes or "").splitlines()[1:]:
+        fields = line.split()
+        if len(fields) > 1 and fields[1] == "00000000":
+            return fields[0]
+    return None
+
+
+def node_id_from_interface():
+    """Get the node ID from the MAC address of the default-route interface."""
+    interface = _default_route_interface()
+    if interface:
+        node_id = _parse_mac_address(_read_file(f"/sys/class/net/{interface}/address") or "")
+        if node_id:
+            return node_id
+    from .utils import get_mac_address_and_interface
+    mac_address, _ = get_mac_address_and_interface()
+    return _parse_mac_address(mac_address) if mac_address else None
+
+
+def node_id_from_machine_id():
+    """Get the node ID from a hash of the host's machine ID."""
+    for path in MACHINE_ID_FILES:
+        machine_id = _read_file(path)
+        if machine_id:
+            return _hash_node_id(machine_id)
+    return None
+
+
+def node_id_from_pod_uid():
+    """Get the node ID from a hash of the Kubernetes pod UID."""
+    pod_uid = _read_file(os.environ.get(POD_UID_FILE_ENV, DEFAULT_POD_UID_FILE))
+    return _hash_node_id(pod_uid) if pod_uid else None
+
+
+def node_id_from_uuid():
+    """Get the node ID from ``uuid.getnode()`` unless it fell back to a random number."""
+    node_id = uuid.getnode()
+    return None if node_id & _MULTICAST_BIT else node_id
+
+
+# Node ID sources by name. Register a callable returning an int or None to add a source.
+NODE_ID_SOURCES = {
+    "env": node_id_from_env,
+    "interface": node_id_from_interface,
+    "machine-id": node_id_from_machine_id,
+    "pod-uid": node_id_from_pod_uid,
+    "uuid": node_id_from_uuid,
+}
+
+DEFAULT_SOURCES = ("env", "interface", "machine-id", "pod-uid", "uuid")
+
+
+@lru_cache(maxsize=None)
+def _resolve(sources):
+    """Resolve and cache the node ID for a tuple of source names."""
+    for source in sources:
+        try:
+            resolver = NODE_ID_SOURCES[source]
+        except KeyError:
+            raise ValueError(f"Unknown node ID source {source}") from None
+        try:
+            node_id = resolver()
+        except Exception:
+            node_id = None
+        if node_id:
+            return NodeIdentity(node_id & ((1 << NODE_ID_BITS) - 1), source)
+    return NodeIdentity(int.from_bytes(os.urandom(6), "big") | _MULTICAST_BIT, "random")
+
+
+def resolve_node_id(sources=None):
+    """Resolve the node ID from the first source that provides one.
+
+    The result is cached for each priority list, so only the first call does
+    any work.
+
+    Args:
+        sources (list): Source names to try in order. Defaults to the comma-separated ``KLINGON_NODE_SOURCES`` environment variable, or ``DEFAULT_SOURCES``.
+
+    Returns:
+        NodeIdentity: The node ID and the name of the source it came from, or ``"random"``.
+
+    Raises:
+        ValueError: If a source name is not registered in ``NODE_ID_SOURCES``.
+    """
+    if sources is None:
+        configured = os.environ.get(NODE_SOURCES_ENV)
+        sources = [name.strip() for name in configured.split(",")] if configured else DEFAULT_SOURCES
+    return _resolve(tuple(sources))
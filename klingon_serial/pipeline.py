@@ -0,0 +1,131 @@
+"""
+This module provides `tag_records()` and `atag_records()`, pipeline stages
+that attach a serial number to each record flowing through an iterator.
+
+Serials are reserved from a generator a chunk at a time and rendered in one
+step, so a record costs one tuple, one dict assignment or one call of the
+caller's function rather than a ``generate_serial()`` call. The input is
+pulled one record at a time and never materialised, and the next chunk is
+only reserved once a record arrives for it. Serials of a chunk carry the
+time it was reserved, and serials of a chunk cut short by the end of the
+input are never issued.
+"""
+from itertools import islice
+from .generate import SerialBlock, reserve_block
+
+# Default number of serials reserved at a time.
+TAG_CHUNK = 1024
+
+_RENDERERS = {"hex": SerialBlock.to_list, "base32": SerialBlock.to_base32, "base62": SerialBlock.to_base62}
+
+
+def _reserver(field, attach, chunk, generator, encoding):
+    """Check a stage's options and build its chunk source.
+
+    Returns:
+        callable: A function of no arguments returning the next chunk of serials as a list.
+
+    Raises:
+        ValueError: If both `field` and `attach` are given, `chunk` is not positive or `encoding` is unknown.
+    """
+    if field is not None and attach is not None:
+        raise ValueError("Give either a field or an attach function, not both")
+    if chunk < 1:
+        raise ValueError(f"Invalid chunk size {chunk}")
+    if encoding not in _RENDERERS:
+        raise ValueError(f"Unknown serial encoding {encoding}")
+    render = _RENDERERS[encoding]
+    if generator is None:
+        return lambda: render(reserve_block(chunk))
+    reserve = generator.reserve_block
+    return lambda: render(reserve(chunk))
+
+
+def tag_records(records, field=None, attach=None, chunk=TAG_CHUNK, generator=None, encoding="hex"):
+    """Attach a serial number to each record of an iterable, lazily.
+
+    By default each record is yielded as a ``(serial, record)`` tuple. With
+    `field`, the serial is stored in ``record[field]`` and the record itself
+    is yielded. With `attach`, ``attach(record, serial)`` is yielded.
+
+    Args:
+        records: An iterable of records, consumed one at a time.
+        field: Optional key to store the serial under in each record, e.g. of a dict.
+        attach (callable): Optional function of a record and its serial returning the tagged record.
+        chunk (int): Number of serials reserved at a time.
+        generator: Generator to reserve serials from, e.g. a `SerialGenerator`. Defaults to the module-level generator.
+        encoding (str): Text encoding of the serials, ``"hex"``, ``"base32"`` or ``"base62"``.
+
+    Returns:
+        iterator: The tagged records, in input order.
+
+    Raises:
+        ValueError: If both `field` and `attach` are given, `chunk` is not positive or `encoding` is unknown.
+    """
+    reserve = _reserver(field, attach, chunk, generator, encoding)
+    return _tag(iter(records), field, attach, chunk, reserve)
+
+
+def _tag(records, field, attach, chunk, reserve):
+    # A separate generator so that tag_records() checks its options when it
+    # is called rather than on the first record.
+    for record in records:
+        # The first record of a chunk is taken alone so a chunk is only
+        # reserved once there is a record for it; zip() and map() then pull
+        # the rest of the chunk in C.
+        serials = iter(reserve())
+        rest = islice(records, chunk - 1)
+        if field is not None:
+            record[field] = next(serials)
+            yield record
+            for record, serial in zip(rest, serials):
+                record[field] = serial
+                yield record
+        elif attach is not None:
+            yield attach(record, next(serials))
+            yield from map(attach, rest, serials)
+        else:
+            yield next(serials), record
+            yield from zip(serials, rest)
+
+
+def atag_records(records, field=None, attach=None, chunk=TAG_CHUNK, generator=None, encoding="hex"):
+    """Attach a serial number to each record of an async iterable, lazily.
+
+    The asynchronous counterpart of `tag_records()`, taking the same options
+    and returning an async iterator. Reserving a chunk does not block, so it
+    is done on the event loop.
+
+    Args:
+        records: An async iterable of records, consumed one at a time.
+        field: Optional key to store the serial under in each record, e.g. of a dict.
+        attach (callable): Optional function of a record and its serial returning the tagged record.
+        chunk (int): Number of serials reserved at a time.
+        generator: Generator to reserve serials from, e.g. a `SerialGenerator`. Defaults to the module-level generator.
+        encoding (str): Text encoding of the serials, ``"hex"``, ``"base32"`` or ``"base62"``.
+
+    Returns:
+        async iterator: The tagged records, in input order.
+
+    Raises:
+        ValueError: If both `field` and `attach` are given, `chunk` is not positive or `encoding` is unknown.
+    """
+    reserve = _reserver(field, attach, chunk, generator, encoding)
+    return _atag(records, field, attach, reserve)
+
+
+async def _atag(records, field, attach, reserve):
+    serials = iter(())
+    async for record in records:
+        try:
+            serial = next(serials)
+        except StopIteration:
+            serials = iter(reserve())
+            serial = next(serials)
+        if field is not None:
+            record[field] = serial
+            yield record
+        elif attach is not None:
+            yield attach(record, serial)
+        else:
+            yield serial, record
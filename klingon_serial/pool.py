@@ -0,0 +1,244 @@
+"""
+This module provides `SerialPool`, a client-side buffer of pre-fetched serial
+numbers. A background thread keeps the buffer between a low and a high
+watermark by fetching batches from a source, so `get()` usually takes a serial
+from local memory instead of making a round trip to a central allocator.
+
+A source is any callable taking a count and returning a list of serials; it
+may return fewer than asked for. `local_fetcher()`, `http_fetcher()` and
+`tcp_fetcher()` build sources for this process's generator, the OpenFaaS
+``/serials`` endpoint and `klingon_serial.server` respectively.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+from .generate import reserve_block
+from .validate import SERIAL_BYTES, SERIAL_LENGTH
+
+PoolStats = namedtuple("PoolStats", ["hits", "stalls", "hit_rate", "refills", "fetched", "errors", "size"])
+PoolStats.__doc__ = """Counters describing how well a `SerialPool` kept up with demand."""
+
+
+class SerialPool:
+    """A buffer of pre-fetched serial numbers refilled in the background.
+
+    When a `get()` leaves `low` or fewer serials in the buffer, the refill
+    thread fetches enough to bring it back up to `high`. A `get()` that finds
+    the buffer empty stalls until the refill lands. Taking a serial from the
+    buffer takes no lock, and a stall is counted under the pool's condition
+    lock, so the statistics are exact.
+
+    Args:
+        fetch (callable): Source returning a list of up to `count` serials. Defaults to `local_fetcher()`.
+        low (int): Refill when this many serials or fewer are left.
+        high (int): Number of serials a refill fills the buffer up to.
+        retry_delay (float): Seconds to wait before retrying a failed fetch.
+
+    Raises:
+        ValueError: If the watermarks are not ``0 <= low < high``.
+    """
+
+    def __init__(self, fetch=None, low=1024, high=8192, retry_delay=1.0):
+        if not 0 <= low < high:
+            raise ValueError("Watermarks must satisfy 0 <= low < high")
+        self.fetch = fetch or local_fetcher()
+        self.low = low
+        self.high = high
+        self.retry_delay = retry_delay
+        self._serials = deque()
+        self._available = threading.Condition()
+        self._wanted = threading.Event()
+        self._closed = threading.Event()
+        self._stalls = self._stalled_hits = 0
+        self._refills = self._fetched = self._errors = 0
+        self._error = None
+        self._wanted.set()
+        self._thread = threading.Thread(target=self._refill, name="SerialPool", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._serials)
+
+    def _refill(self):
+        """Fetch serials whenever the buffer drops to the low watermark."""
+        while True:
+            self._wanted.wait()
+            if self._closed.is_set():
+                return
+            count = self.high - len(self._serials)
+            if count > 0:
+                try:
+                    serials = self.fetch(count)
+                except Exception as error:
+                    with self._available:
+                        self._error = error
+                        self._errors += 1
+                        self._available.notify_all()
+                    self._closed.wait(self.retry_delay)
+                    continue
+                with self._available:
+                    self._serials.extend(serials)
+                    self._error = None
+                    self._refills += 1
+                    self._fetched += len(serials)
+                    self._available.notify_all()
+            self._wanted.clear()
+            # A get() may have drained the buffer between the fetch and the clear.
+            if len(self._serials) <= self.low:
+                self._wanted.set()
+
+    def get(self, timeout=None):
+        """Take a serial number from the pool.
+
+        Args:
+            timeout (float): Seconds to wait if the pool is empty, or None to wait for the refill.
+
+        Returns:
+            str: A serial number.
+
+        Raises:
+            TimeoutError: If no serial arrived within `timeout`.
+            RuntimeError: If the pool is empty and closed.
+            Exception: The error raised by the source, if the pool is empty and the last fetch failed.
+        """
+        try:
+            serial = self._serials.popleft()
+        except IndexError:
+            return self._stall(timeout)
+        if len(self._serials) <= self.low and not self._wanted.is_set():
+            self._wanted.set()
+        return serial
+
+    async def aget(self):
+        """Take a serial number from the pool without blocking the event loop.
+
+        The buffer is read directly; only a stall waits for the refill, in a
+        worker thread.
+
+        Returns:
+            str: A serial number.
+        """
+        try:
+            serial = self._serials.popleft()
+        except IndexError:
+            import asyncio
+            return await asyncio.to_thread(self._stall, None)
+        if len(self._serials) <= self.low and not self._wanted.is_set():
+            self._wanted.set()
+        return serial
+
+    def _stall(self, timeout):
+        """Wait for the refill thread to supply a serial."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            self._stalls += 1
+            self._wanted.set()
+            while True:
+                try:
+                    serial = self._serials.popleft()
+                except IndexError:
+                    pass
+                else:
+                    self._stalled_hits += 1
+                    return serial
+                if self._error is not None:
+                    raise self._error
+                if self._closed.is_set():
+                    raise RuntimeError("Serial pool is closed")
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No serial arrived from the pool's source in time")
+                self._available.wait(remaining)
+
+    def stats(self):
+        """Get the pool's counters.
+
+        Hits are serials handed out without waiting, worked out from the
+        serials fetched, still buffered and handed out after a stall.
+
+        Returns:
+            PoolStats: Hits, stalls, hit rate, refills, serials fetched, failed fetches and the current buffer size.
+        """
+        with self._available:
+            size = len(self._serials)
+            hits = self._fetched - size - self._stalled_hits
+            requests = hits + self._stalls
+            hit_rate = hits / requests if requests else 1.0
+            return PoolStats(hits, self._stalls, hit_rate, self._refills, self._fetched, self._errors, size)
+
+    def close(self):
+        """Stop the refill thread. Serials already buffered can still be taken."""
+        self._closed.set()
+        self._wanted.set()
+        self._thread.join()
+        with self._available:
+            self._available.notify_all()
+
+
+def local_fetcher(generator=None):
+    """Build a source that reserves blocks from a local generator.
+
+    Args:
+        generator: A `SerialGenerator` or `ThreadSafeSerialGenerator`. Defaults to the module-level generator.
+
+    Returns:
+        callable: A source for `SerialPool`.
+    """
+    reserve = generator.reserve_block if generator is not None else reserve_block
+    return lambda count: reserve(count).to_list()
+
+
+def http_fetcher(url, max_count=100_000, timeout=5.0):
+    """Build a source that fetches batches from the OpenFaaS ``/serials`` endpoint.
+
+    Args:
+        url (str): The ``/serials`` endpoint URL.
+        max_count (int): Largest batch to ask for; match the server's ``KLINGON_MAX_SERIALS``.
+        timeout (float): Seconds to wait for a response.
+
+    Returns:
+        callable: A source for `SerialPool`.
+    """
+    from urllib.request import Request, urlopen
+
+    def fetch(count):
+        request = Request(f"{url}?count={min(count, max_count)}", headers={"Accept": "text/plain"})
+        with urlopen(request, timeout=timeout) as response:
+            return response.read().decode().split()
+    return fetch
+
+
+def tcp_fetcher(host, port=None, timeout=5.0):
+    """Build a source that fetches batches from `klingon_serial.server` over its binary protocol.
+
+    Args:
+        host (str): The server's address.
+        port (int): The server's port. Defaults to `klingon_serial.server.DEFAULT_PORT`.
+        timeout (float): Seconds to wait for a connection and each read.
+
+    Returns:
+        callable: A source for `SerialPool`.
+    """
+    import socket
+    from .server import DEFAULT_PORT, MAX_COUNT
+
+    def fetch(count):
+        count = min(count, MAX_COUNT)
+        size = 4 + SERIAL_BYTES * count
+        with socket.create_connection((host, port or DEFAULT_PORT), timeout) as connection:
+            connection.sendall(count.to_bytes(4, "big"))
+            response = bytearray()
+            while len(response) < size:
+                chunk = connection.recv(size - len(response))
+                if not chunk:
+                    raise ConnectionError("Serial server closed the connection")
+                response += chunk
+        packed = response[4:].hex()
+        return [packed[i:i + SERIAL_LENGTH] for i in range(0, len(packed), SERIAL_LENGTH)]
+    return fetch
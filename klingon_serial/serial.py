@@ -0,0 +1,132 @@
+"""
+This module provides the `Serial` value type, which holds a serial number as
+a packed 112-bit integer and renders it as hexadecimal, Crockford base32,
+base62, bytes or int on demand.
+"""
+from functools import total_ordering
+
+from .encoding import decode_base32, decode_base62, encode_base32, encode_base62
+from .generate import SERIAL_BYTES
+
+
+@total_ordering
+class Serial:
+    """A serial number held as a packed 112-bit integer.
+
+    Only the integer is stored; each representation is rendered directly from
+    it when asked for, so converting between forms never builds intermediate
+    strings. Serials compare and sort by value, which matches the order of
+    their hexadecimal form.
+
+    Args:
+        value (int): The serial number as an integer.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    @classmethod
+    def from_hex(cls, serial):
+        """Build a `Serial` from its hexadecimal form.
+
+        Args:
+            serial (str): The serial number as hexadecimal, in either case.
+
+        Returns:
+            Serial: The parsed serial number.
+        """
+        return cls(int(serial, 16))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Build a `Serial` from its packed form.
+
+        Args:
+            data (bytes): The serial number as 14 big-endian bytes.
+
+        Returns:
+            Serial: The parsed serial number.
+        """
+        return cls(int.from_bytes(data, "big"))
+
+    @classmethod
+    def from_base32(cls, serial):
+        """Build a `Serial` from its Crockford base32 form.
+
+        Args:
+            serial (str): The serial number as Crockford base32, in either case.
+
+        Returns:
+            Serial: The parsed serial number.
+        """
+        return cls(decode_base32(serial))
+
+    @classmethod
+    def from_base62(cls, serial):
+        """Build a `Serial` from its base62 form.
+
+        Args:
+            serial (str): The serial number as base62.
+
+        Returns:
+            Serial: The parsed serial number.
+        """
+        return cls(decode_base62(serial))
+
+    def hex(self, upper=False):
+        """Render the serial number as 28 hexadecimal characters.
+
+        Args:
+            upper (bool): Use uppercase hexadecimal digits.
+
+        Returns:
+            str: The serial number as hexadecimal.
+        """
+        if upper:
+            return f"{self.value:028X}"
+        return f"{self.value:028x}"
+
+    def base32(self):
+        """Render the serial number as 23 Crockford base32 characters.
+
+        Returns:
+            str: The serial number as base32.
+        """
+        return encode_base32(self.value)
+
+    def base62(self):
+        """Render the serial number as 19 base62 characters.
+
+        Returns:
+            str: The serial number as base62.
+        """
+        return encode_base62(self.value)
+
+    def __str__(self):
+        return f"{self.value:028x}"
+
+    def __repr__(self):
+        return f"Serial('{self.value:028x}')"
+
+    def __int__(self):
+        return self.value
+
+    __index__ = __int__
+
+    def __bytes__(self):
+        return self.value.to_bytes(SERIAL_BYTES, "big")
+
+    def __eq__(self, other):
+        if isinstance(other, Serial):
+            return self.value == other.value
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Serial):
+            return self.value < other.value
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.value)
@@ -0,0 +1,161 @@
+"""
+This module provides a lightweight asyncio serial number server for internal
+callers that do not need HTTP. It is not imported by the package, so asyncio
+is only loaded when the server is used:
+
+    python -m klingon_serial.server --host 0.0.0.0 --port 7878
+
+Each connection speaks one of two protocols, chosen by its first byte:
+
+- Binary: a request is a 4-byte big-endian count N, and the response is the
+  4-byte big-endian count followed by N packed 14-byte serials. Counts are
+  capped below 2**24, so a binary request always starts with a zero byte.
+- Text: a request is a line holding a decimal count, or an empty line for one
+  serial, and the response is N lines of hexadecimal serials. An invalid
+  request gets a single ``ERR <reason>`` line.
+
+Requests can be pipelined: every complete request in a read is answered with
+one write, in order, before the next read.
+"""
+import asyncio
+from .generate import reserve_block
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7878
+
+# Largest count a single request may ask for; must stay below 2**24.
+MAX_COUNT = 1 << 20
+
+# Longest text request line, including the newline.
+MAX_LINE = 16
+
+_COUNT_BYTES = 4
+
+
+class SerialProtocol(asyncio.Protocol):
+    """Serve serial numbers over the binary or text protocol.
+
+    Reading is paused while the transport's write buffer is above its high
+    water mark, so a client that pipelines requests without reading the
+    responses cannot make the server buffer without bound.
+
+    Args:
+        max_count (int): Largest count a single request may ask for.
+        reserve (callable): Function reserving a `SerialBlock` of a given size. Defaults to `klingon_serial.generate.reserve_block()`.
+    """
+
+    def __init__(self, max_count=MAX_COUNT, reserve=reserve_block):
+        if not 0 < max_count < 1 << 24:
+            raise ValueError("max_count must be between 1 and 2**24 - 1")
+        self.max_count = max_count
+        self.reserve = reserve
+        self.transport = None
+        self._buffer = b""
+        self._binary = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        buffer = self._buffer + data if self._buffer else data
+        if self._binary is None:
+            self._binary = buffer[0] == 0
+        if self._binary:
+            responses, self._buffer = self._binary_requests(buffer)
+        else:
+            responses, self._buffer = self._text_requests(buffer)
+        if responses:
+            self.transport.write(b"".join(responses))
+
+    def _binary_requests(self, buffer):
+        """Answer every complete binary request in `buffer`.
+
+        Returns:
+            tuple: The responses and the unconsumed remainder of the buffer.
+        """
+        responses = []
+        end = len(buffer) - len(buffer) % _COUNT_BYTES
+        for offset in range(0, end, _COUNT_BYTES):
+            request = buffer[offset:offset + _COUNT_BYTES]
+            count = int.from_bytes(request, "big")
+            if count > self.max_count:
+                # There is no way to report an error in-band, so drop the connection.
+                self.transport.write(b"".join(responses))
+                self.transport.close()
+                return [], b""
+            responses.append(request)
+            if count:
+                responses.append(self.reserve(count).to_packed())
+        return responses, buffer[end:]
+
+    def _text_requests(self, buffer):
+        """Answer every complete text request in `buffer`.
+
+        Returns:
+            tuple: The responses and the unconsumed remainder of the buffer.
+        """
+        responses = []
+        *lines, remainder = buffer.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if not line:
+                count = 1
+            elif line.isdigit() and int(line) <= self.max_count:
+                count = int(line)
+            else:
+                responses.append(b"ERR invalid count\n")
+                continue
+            if count:
+                responses.append(self.reserve(count).to_bytes(b"\n"))
+        if len(remainder) >= MAX_LINE:
+            self.transport.write(b"".join(responses) + b"ERR line too long\n")
+            self.transport.close()
+            return [], b""
+        return responses, remainder
+
+
+async def start_server(host=DEFAULT_HOST, port=DEFAULT_PORT, max_count=MAX_COUNT, **kwargs):
+    """Start serving serial numbers on `host` and `port`.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on; 0 picks a free port.
+        max_count (int): Largest count a single request may ask for.
+        **kwargs: Passed on to `loop.create_server()`.
+
+    Returns:
+        asyncio.Server: The listening server.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(lambda: SerialProtocol(max_count), host, port, **kwargs)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, max_count=MAX_COUNT):
+    """Serve serial numbers until cancelled."""
+    server = await start_server(host, port, max_count)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Run the server from the command line."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve klingon serial numbers over TCP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument("--max-count", type=int, default=MAX_COUNT, help="Largest count a single request may ask for.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_count))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,38 @@
 """
 This module provides utility functions for the klingon_serial package, including
-retrieving the MAC address and network interface, and determining the debug mode.
+retrieving the MAC address and network interface, determining the debug mode,
+and decoding serial numbers back into their fields.
 """
 import os
-import psutil
-import re
+import struct
+from array import array
+from collections import namedtuple
 from .str2bool import str2bool
+from .validate import MAC_ADDRESS_BITS, PROCESS_ID_BITS, SERIAL_BYTES, TIMESTAMP_BITS, _import_numpy, is_serial
+
+SerialFields = namedtuple("SerialFields", ["mac_address", "process_id", "timestamp", "sequence"])
+SerialFields.__doc__ = """Fields decoded from a serial number, or columns of fields from many serials.
+
+Attributes:
+    mac_address: The 48-bit MAC address.
+    process_id: The process ID.
+    timestamp: The epoch time in milliseconds.
+    sequence: The in-millisecond sequence, 0 unless the generator used sequence bits.
+"""
 
 
 def validate_serial(serial):
     """Validate the generated serial number against the expected format.
 
+    Delegates to `klingon_serial.validate.is_serial()`.
+
     Args:
         serial (str): The serial number to validate.
 
     Returns:
         bool: True if the serial number is valid, False otherwise.
     """
-    pattern = re.compile(r'^[a-fA-F0-9]{12}[a-fA-F0-9]{5}[a-fA-F0-9]{11}$')
-    return bool(pattern.match(serial))
+    return is_serial(serial)
 
 def get_debug():
     """Get debug mode from environment.
@@ -37,21 +51,133 @@ def get_debug():
 def get_mac_address_and_interface():
     """Returns a tuple containing the MAC address and the network interface of the local machine's primary network interface.
 
+    `psutil` is imported on first use so that importing the package stays cheap.
+
     Returns:
     tuple: A tuple containing the MAC address and the network interface.
             If the MAC address and interface cannot be determined, returns (None, None).
     """
     try:
-        # Get primary network interface by looking at the default route
-        primary_interface = None
+        import psutil
+        from .node import _default_route_interface
+        # Get primary network interface by looking at the default route,
+        # skipping loopback and other interfaces without a hardware address
+        primary_interface = _default_route_interface()
+        candidates = []
         for interface, addrs in psutil.net_if_addrs().items():
             for addr in addrs:
-                if addr.family == psutil.AF_LINK:
-                    primary_interface = interface
-                    mac_address = addr.address
-                    return mac_address, primary_interface  # Return on first found interface
+                if addr.family == psutil.AF_LINK and addr.address and addr.address.strip("0:-"):
+                    candidates.append((interface != primary_interface, addr.address, interface))
+        if candidates:
+            _, mac_address, interface = min(candidates, key=lambda candidate: candidate[0])
+            return mac_address, interface
     except Exception as e:
         import logging
         logging.error(f"Error retrieving network interface: {e}")
 
     return None, None  # Return None, None if no interface found
+
+def parse_serial(serial, sequence_bits=0):
+    """Decode a serial number into its fields.
+
+    Args:
+        serial (str, bytes or int): The serial number as 28 hexadecimal characters, 14 packed bytes or an integer.
+        sequence_bits (int): Number of timestamp field bits the generator used for its sequence.
+
+    Returns:
+        SerialFields: The MAC address, process ID, timestamp and sequence as integers.
+
+    Raises:
+        ValueError: If `serial` is not a valid serial number.
+    """
+    if isinstance(serial, str):
+        if not is_serial(serial):
+            raise ValueError(f"Invalid serial {serial!r}")
+        value = int(serial, 16)
+    elif isinstance(serial, (bytes, bytearray)):
+        if len(serial) != SERIAL_BYTES:
+            raise ValueError(f"Invalid serial {serial!r}")
+        value = int.from_bytes(serial, "big")
+    else:
+        value = int(serial)
+        if value >> (8 * SERIAL_BYTES) or value < 0:
+            raise ValueError(f"Invalid serial {serial!r}")
+    tick = value & ((1 << TIMESTAMP_BITS) - 1)
+    return SerialFields(
+        value >> (TIMESTAMP_BITS + PROCESS_ID_BITS),
+        (value >> TIMESTAMP_BITS) & ((1 << PROCESS_ID_BITS) - 1),
+        tick >> sequence_bits,
+        tick & ((1 << sequence_bits) - 1),
+    )
+
+def _pack_serials(serials):
+    """Hex-decode many serial numbers into one buffer of 14-byte records.
+
+    Args:
+        serials: A list of serial strings, a NumPy string array, or a buffer of 28-byte ASCII records.
+
+    Returns:
+        tuple: The packed buffer and the number of serials.
+
+    Raises:
+        ValueError: If any serial is not 28 hexadecimal characters.
+    """
+    if isinstance(serials, (bytes, bytearray, memoryview)):
+        text = bytes(serials)
+    elif hasattr(serials, "dtype"):
+        text = serials.astype(f"S{2 * SERIAL_BYTES}").tobytes() if serials.dtype.kind == "U" else serials.tobytes()
+    else:
+        if set(map(len, serials)) - {2 * SERIAL_BYTES}:
+            raise ValueError("Serials must be 28 hexadecimal characters")
+        text = "".join(serials)
+    count, remainder = divmod(len(text), 2 * SERIAL_BYTES)
+    try:
+        packed = bytes.fromhex(text.decode("ascii") if isinstance(text, bytes) else text)
+    except (UnicodeDecodeError, ValueError):
+        packed = b""
+    if remainder or len(packed) != count * SERIAL_BYTES:
+        raise ValueError("Serials must be 28 hexadecimal characters")
+    return packed, count
+
+def parse_serials(serials, sequence_bits=0):
+    """Decode many serial numbers into columns of fields.
+
+    The serials are hex-decoded in one pass and split into columns without a
+    per-serial Python loop when NumPy is installed, in which case each column
+    is a ``uint64`` array. Without NumPy the columns are ``array("Q")``.
+
+    Args:
+        serials: A list of serial strings, a NumPy string array, or a buffer of 28-byte ASCII records.
+        sequence_bits (int): Number of timestamp field bits the generator used for its sequence.
+
+    Returns:
+        SerialFields: Columns of MAC addresses, process IDs, timestamps and sequences.
+
+    Raises:
+        ValueError: If any serial is not 28 hexadecimal characters.
+    """
+    packed, count = _pack_serials(serials)
+    tick_mask = (1 << TIMESTAMP_BITS) - 1
+    sequence_mask = (1 << sequence_bits) - 1
+    numpy = _import_numpy()
+    if numpy is not None:
+        records = numpy.frombuffer(packed, dtype=numpy.uint8).reshape(count, SERIAL_BYTES)
+        mac_bytes = numpy.zeros((count, 8), dtype=numpy.uint8)
+        mac_bytes[:, 2:] = records[:, :6]
+        mac_addresses = mac_bytes.view(">u8").ravel().astype(numpy.uint64)
+        low = records[:, 6:].copy().view(">u8").ravel().astype(numpy.uint64)
+        ticks = low & numpy.uint64(tick_mask)
+        return SerialFields(
+            mac_addresses,
+            low >> numpy.uint64(TIMESTAMP_BITS),
+            ticks >> numpy.uint64(sequence_bits),
+            ticks & numpy.uint64(sequence_mask),
+        )
+    fields = struct.iter_unpack(">HIQ", packed)
+    high, middle, low = zip(*fields) if count else ((), (), ())
+    return SerialFields(
+        array("Q", [a << 32 | b for a, b in zip(high, middle)]),
+        array("Q", [value >> TIMESTAMP_BITS for value in low]),
+        array("Q", [(value & tick_mask) >> sequence_bits for value in low]),
+        array("Q", [value & sequence_mask for value in low]),
+    )
@@ -0,0 +1,160 @@
+"""
+This module provides the serial number validators used throughout the
+klingon_serial package. Validation is a length check plus a hexadecimal
+charset check with no regular expression, and `validate_serials()` checks many
+serials in one call. Serials in the base32 and base62 encodings of
+`klingon_serial.encoding` are validated by decoding them.
+"""
+# Widths of the serial number fields in bits (12, 5 and 11 hexadecimal characters).
+MAC_ADDRESS_BITS = 48
+PROCESS_ID_BITS = 20
+TIMESTAMP_BITS = 44
+
+# Width of a packed serial number in bytes (28 hexadecimal characters).
+SERIAL_BYTES = 14
+
+HEX_DIGITS = "0123456789abcdefABCDEF"
+_HEX_DIGITS_BYTES = HEX_DIGITS.encode()
+
+# Length of a serial number in hexadecimal characters.
+SERIAL_LENGTH = 2 * SERIAL_BYTES
+
+# Offsets of the process ID and timestamp fields in the hexadecimal form.
+_PROCESS_ID_START = SERIAL_LENGTH - (PROCESS_ID_BITS + TIMESTAMP_BITS) // 4
+_TIMESTAMP_START = SERIAL_LENGTH - TIMESTAMP_BITS // 4
+
+
+def _import_numpy():
+    """Import NumPy if it is installed.
+
+    Returns:
+        module: The `numpy` module, or None if it is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def is_serial(serial, timestamp_range=None, process_id_bits=None, sequence_bits=0, encoding="hex"):
+    """Validate the serial number format.
+
+    Args:
+        serial (str): The serial number to validate.
+        timestamp_range (tuple): Optional inclusive range of epoch milliseconds the timestamp must fall in.
+        process_id_bits (int): Optional width in bits the process ID must fit in.
+        sequence_bits (int): Number of timestamp field bits the generator used for its sequence.
+        encoding (str): The serial's text encoding, ``"hex"``, ``"base32"`` or ``"base62"``.
+
+    Returns:
+        bool: True if the serial number is valid, False otherwise.
+    """
+    if encoding != "hex":
+        serial = _to_hex(serial, encoding)
+    # Deleting every hexadecimal digit must leave nothing behind; any other
+    # character, including non-ASCII ones, survives the translate.
+    if type(serial) is not str or len(serial) != SERIAL_LENGTH or serial.encode().translate(None, _HEX_DIGITS_BYTES):
+        return False
+    if process_id_bits is not None and int(serial[_PROCESS_ID_START:_TIMESTAMP_START], 16) >> process_id_bits:
+        return False
+    if timestamp_range is not None:
+        timestamp = int(serial[_TIMESTAMP_START:], 16) >> sequence_bits
+        return timestamp_range[0] <= timestamp <= timestamp_range[1]
+    return True
+
+
+def validate_serials(serials, timestamp_range=None, process_id_bits=None, sequence_bits=0, encoding="hex"):
+    """Validate many serial numbers in one call.
+
+    A NumPy string array is checked with array operations and gives a NumPy
+    boolean mask; any other iterable gives a list of booleans. Without strict
+    options a batch in which every serial is valid is confirmed with a single
+    check over the joined serials, before falling back to checking each one.
+
+    Args:
+        serials: An iterable of serial numbers, or a NumPy string array.
+        timestamp_range (tuple): Optional inclusive range of epoch milliseconds the timestamps must fall in.
+        process_id_bits (int): Optional width in bits the process IDs must fit in.
+        sequence_bits (int): Number of timestamp field bits the generator used for its sequence.
+        encoding (str): The serials' text encoding, ``"hex"``, ``"base32"`` or ``"base62"``.
+
+    Returns:
+        list or numpy.ndarray: True for each valid serial number, False otherwise.
+    """
+    if encoding != "hex":
+        return [is_serial(serial, timestamp_range, process_id_bits, sequence_bits, encoding) for serial in serials]
+    if hasattr(serials, "dtype") and serials.dtype.kind == "U":
+        return _validate_array(serials, timestamp_range, process_id_bits, sequence_bits)
+    if timestamp_range is None and process_id_bits is None:
+        serials = serials if isinstance(serials, list) else list(serials)
+        try:
+            if set(map(len, serials)) <= {SERIAL_LENGTH} and not "".join(serials).encode().translate(None, _HEX_DIGITS_BYTES):
+                return [True] * len(serials)
+        except TypeError:
+            pass
+        return [is_serial(serial) for serial in serials]
+    return [is_serial(serial, timestamp_range, process_id_bits, sequence_bits) for serial in serials]
+
+
+def _to_hex(serial, encoding):
+    """Decode a base32 or base62 serial number to its hexadecimal form.
+
+    Returns:
+        str: The serial as 28 hexadecimal characters, or None if it is not a valid serial in `encoding`.
+
+    Raises:
+        ValueError: If `encoding` is unknown.
+    """
+    from .encoding import base32_length, base62_length, decode_base32, decode_base62
+    if encoding == "base32":
+        length, decode = base32_length(), decode_base32
+    elif encoding == "base62":
+        length, decode = base62_length(), decode_base62
+    else:
+        raise ValueError(f"Unknown serial encoding {encoding}")
+    if type(serial) is not str or len(serial) != length:
+        return None
+    try:
+        value = decode(serial)
+    except ValueError:
+        return None
+    return None if value >> (8 * SERIAL_BYTES) else f"{value:0{SERIAL_LENGTH}x}"
+
+
+def _validate_array(serials, timestamp_range, process_id_bits, sequence_bits):
+    """Validate a NumPy string array of serial numbers with array operations.
+
+    Returns:
+        numpy.ndarray: Boolean mask of valid serial numbers.
+    """
+    numpy = _import_numpy()
+    serials = numpy.asarray(serials).ravel()
+    if serials.dtype.itemsize < 4 * SERIAL_LENGTH:
+        return numpy.zeros(len(serials), dtype=bool)
+    mask = numpy.char.str_len(serials) == SERIAL_LENGTH
+    codes = serials.astype(f"U{SERIAL_LENGTH}").view(numpy.uint32).reshape(-1, SERIAL_LENGTH)
+    lower = codes | 32
+    digits = (codes >= 48) & (codes <= 57)
+    letters = (lower >= 97) & (lower <= 102)
+    mask &= (digits | letters).all(axis=1)
+    if timestamp_range is None and process_id_bits is None:
+        return mask
+    values = numpy.where(digits, codes - 48, lower - 87).astype(numpy.uint64)
+    if process_id_bits is not None:
+        process_ids = _fold_hex(numpy, values[:, _PROCESS_ID_START:_TIMESTAMP_START])
+        mask &= (process_ids >> numpy.uint64(process_id_bits)) == 0
+    if timestamp_range is not None:
+        timestamps = _fold_hex(numpy, values[:, _TIMESTAMP_START:]) >> numpy.uint64(sequence_bits)
+        mask &= (timestamps >= timestamp_range[0]) & (timestamps <= timestamp_range[1])
+    return mask
+
+
+def _fold_hex(numpy, digits):
+    """Combine columns of hexadecimal digit values into integers.
+
+    Returns:
+        numpy.ndarray: The ``uint64`` value of each row.
+    """
+    weights = numpy.uint64(16) ** numpy.arange(digits.shape[1] - 1, -1, -1, dtype=numpy.uint64)
+    return (digits * weights).sum(axis=1, dtype=numpy.uint64)
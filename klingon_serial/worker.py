@@ -0,0 +1,331 @@
+"""
+This module leases compact worker IDs to embed in serial numbers in place of
+the process ID.
+
+Process IDs are a weak source of uniqueness in containers, where every pod
+is PID 1 or close to it, and PIDs wider than the 20-bit field wrap. A worker
+ID is instead leased from a table shared by every process on the host, so no
+two live processes hold the same one, and IDs are handed out from 0 upwards,
+which lets a layout with a narrow process ID field stay collision-free.
+
+The default backend, `FileLeaseBackend`, keeps the table in a memory-mapped
+file (``/dev/shm`` is a good home for it) guarded by ``flock()``. Each slot
+records when its lease expires; a `WorkerLease` renews it from a heartbeat
+thread, and a slot whose lease has expired, because its owner died or hung,
+is reclaimed by the next process that needs one. If a lease is found to
+have been reclaimed, a new one is taken and the generators are rebuilt with
+it. Any object with the `FileLeaseBackend` methods can replace the backend.
+
+Leasing is off unless ``KLINGON_WORKER_LEASE`` names a lease file or
+`lease_worker_id()` is called. The worker ID is read once when a generator
+is built, so it costs nothing per serial. Forked children take their own
+lease.
+"""
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+WORKER_LEASE_ENV = "KLINGON_WORKER_LEASE"
+
+# Default number of worker IDs in a lease table, which fits a 12-bit field.
+LEASE_SLOTS = 4096
+
+# Default seconds a lease lasts without a heartbeat; heartbeats come three times per TTL.
+LEASE_TTL = 30.0
+
+# Table layout: a header of magic and slot count, then per slot the lease
+# expiry in epoch milliseconds, the owner's token and the owner's PID.
+_MAGIC = b"KSLEASE1"
+_HEADER = struct.Struct(">8sI4x")
+_SLOT = struct.Struct(">QII")
+
+
+class LeaseError(RuntimeError):
+    """Raised when no worker ID can be leased."""
+
+
+class FileLeaseBackend:
+    """A table of worker ID leases in a memory-mapped file shared by the host's processes.
+
+    Changes to the table are made under an exclusive ``flock()`` on the file,
+    and under a thread lock, since ``flock()`` does not exclude threads that
+    share the file descriptor.
+
+    Args:
+        path (str): The lease file, created if missing.
+        slots (int): Number of worker IDs in the table when it is created.
+
+    Raises:
+        LeaseError: If the file is not a lease table.
+    """
+
+    def __init__(self, path, slots=LEASE_SLOTS):
+        import fcntl
+        import mmap
+        self._flock = fcntl.flock
+        self._exclusive, self._unlock = fcntl.LOCK_EX, fcntl.LOCK_UN
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            with self._locked_file():
+                header = os.pread(self._fd, _HEADER.size, 0)
+                if len(header) < _HEADER.size or header == bytes(_HEADER.size):
+                    os.ftruncate(self._fd, _HEADER.size + slots * _SLOT.size)
+                    os.pwrite(self._fd, _HEADER.pack(_MAGIC, slots), 0)
+                    header = _HEADER.pack(_MAGIC, slots)
+                magic, self.slots = _HEADER.unpack(header)
+                if magic != _MAGIC or os.fstat(self._fd).st_size < _HEADER.size + self.slots * _SLOT.size:
+                    raise LeaseError(f"{path} is not a worker lease table")
+            self._map = mmap.mmap(self._fd, _HEADER.size + self.slots * _SLOT.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    @contextmanager
+    def _locked_file(self):
+        """Hold the thread lock and the file lock."""
+        with self._lock:
+            self._flock(self._fd, self._exclusive)
+            try:
+                yield
+            finally:
+                self._flock(self._fd, self._unlock)
+
+    def _slot(self, slot):
+        return _SLOT.unpack_from(self._map, _HEADER.size + slot * _SLOT.size)
+
+    def _write(self, slot, expires, token, pid):
+        _SLOT.pack_into(self._map, _HEADER.size + slot * _SLOT.size, expires, token, pid)
+
+    def acquire(self, token, ttl):
+        """Lease the lowest free worker ID.
+
+        Args:
+            token (int): A random 32-bit value identifying the owner.
+            ttl (float): Seconds until the lease expires unless renewed.
+
+        Returns:
+            int: The worker ID.
+
+        Raises:
+            LeaseError: If every worker ID is leased.
+        """
+        with self._locked_file():
+            now = _now_ms()
+            for slot in range(self.slots):
+                if self._slot(slot)[0] <= now:
+                    self._write(slot, now + int(ttl * 1000), token, os.getpid())
+                    return slot
+        raise LeaseError(f"All {self.slots} worker IDs are leased")
+
+    def renew(self, slot, token, ttl):
+        """Extend a lease.
+
+        Returns:
+            bool: True if the lease was extended, False if it was lost to another owner.
+        """
+        with self._locked_file():
+            # A reclaimed slot has a new owner's token; an expired slot that
+            # still has ours was not reclaimed and can be kept.
+            if self._slot(slot)[1] != token:
+                return False
+            self._write(slot, _now_ms() + int(ttl * 1000), token, os.getpid())
+            return True
+
+    def release(self, slot, token):
+        """End a lease, if it is still held by `token`."""
+        with self._locked_file():
+            if self._slot(slot)[1] == token:
+                self._write(slot, 0, 0, 0)
+
+    def leases(self):
+        """List the live leases.
+
+        Returns:
+            dict: Worker ID -> PID of its owner.
+        """
+        with self._locked_file():
+            now = _now_ms()
+            return {slot: pid for slot in range(self.slots) for expires, _, pid in [self._slot(slot)] if expires > now}
+
+    def close(self):
+        """Unmap and close the lease file."""
+        self._map.close()
+        os.close(self._fd)
+
+
+class WorkerLease:
+    """A leased worker ID, kept alive by a heartbeat thread.
+
+    Args:
+        backend: The lease backend, e.g. a `FileLeaseBackend`.
+        ttl (float): Seconds a lease lasts without a heartbeat.
+        on_lost (callable): Called from the heartbeat thread with the lease after it was lost and replaced.
+
+    Raises:
+        LeaseError: If no worker ID is free.
+    """
+
+    def __init__(self, backend, ttl=LEASE_TTL, on_lost=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.on_lost = on_lost
+        self.losses = 0
+        self._token = int.from_bytes(os.urandom(4), "big") or 1
+        self.worker_id = backend.acquire(self._token, ttl)
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, name="klingon-serial-lease", daemon=True)
+        self._heartbeat.start()
+
+    def _beat(self):
+        """Renew the lease every third of its TTL until released."""
+        while not self._stopped.wait(self.ttl / 3):
+            self.renew()
+
+    def renew(self):
+        """Renew the lease, taking a new worker ID if it was lost.
+
+        Returns:
+            bool: True if the lease was still held.
+        """
+        try:
+            if self.backend.renew(self.worker_id, self._token, self.ttl):
+                return True
+            self.worker_id = self.backend.acquire(self._token, self.ttl)
+        except (OSError, ValueError, LeaseError):
+            return False
+        self.losses += 1
+        if self.on_lost is not None:
+            try:
+                self.on_lost(self)
+            except Exception:
+                # Keep the heartbeat alive; generators that cannot take the
+                # new ID raise when they are next rebuilt.
+                pass
+        return False
+
+    def release(self):
+        """Stop the heartbeat, give the worker ID back and close the backend."""
+        self._stopped.set()
+        try:
+            self.backend.release(self.worker_id, self._token)
+            self.backend.close()
+        except (OSError, ValueError):
+            pass
+
+
+# The lease generators embed, the factory of its backend and its TTL.
+_lease = None
+_backend_factory = None
+_lease_ttl = LEASE_TTL
+_lease_lock = threading.RLock()
+
+
+def lease_worker_id(path=None, slots=LEASE_SLOTS, ttl=LEASE_TTL, backend=None):
+    """Lease a worker ID and rebuild every generator to embed it in place of the process ID.
+
+    Args:
+        path (str): The lease file for a `FileLeaseBackend`. Defaults to ``KLINGON_WORKER_LEASE``.
+        slots (int): Number of worker IDs in a newly created lease file.
+        ttl (float): Seconds a lease lasts without a heartbeat.
+        backend (callable): A factory returning a lease backend, used instead of `path`. It is called again in forked children.
+
+    Returns:
+        WorkerLease: The lease.
+
+    Raises:
+        LeaseError: If no worker ID is free.
+        ValueError: If neither `path`, `backend` nor ``KLINGON_WORKER_LEASE`` is given.
+    """
+    global _backend_factory, _lease_ttl
+    path = path or os.environ.get(WORKER_LEASE_ENV)
+    if backend is None and not path:
+        raise ValueError(f"A lease file path, a backend or {WORKER_LEASE_ENV} is required")
+    with _lease_lock:
+        release_worker_id(rebuild=False)
+        _backend_factory = backend or (lambda: FileLeaseBackend(path, slots))
+        _lease_ttl = ttl
+        lease = _take_lease()
+    _rebuild_generators()
+    return lease
+
+
+def release_worker_id(rebuild=True):
+    """Give up the leased worker ID and go back to embedding the process ID.
+
+    Args:
+        rebuild (bool): Rebuild every generator to embed the process ID.
+    """
+    global _lease, _backend_factory
+    with _lease_lock:
+        lease, _lease, _backend_factory = _lease, None, None
+    if lease is not None:
+        lease.release()
+    if rebuild:
+        _rebuild_generators()
+
+
+def current_lease():
+    """Get the current worker ID lease.
+
+    Returns:
+        WorkerLease: The lease, or None if worker IDs are not leased.
+    """
+    return _lease
+
+
+def worker_id():
+    """Get the ID generators embed in the process ID field.
+
+    Takes a lease first if ``KLINGON_WORKER_LEASE`` is set and no lease is
+    held yet.
+
+    Returns:
+        int: The leased worker ID, or the process ID if worker IDs are not leased.
+    """
+    if _lease is None and (_backend_factory is not None or os.environ.get(WORKER_LEASE_ENV)):
+        with _lease_lock:
+            if _lease is None:
+                if _backend_factory is None:
+                    _configure_from_env()
+                _take_lease()
+    return os.getpid() if _lease is None else _lease.worker_id
+
+
+def _configure_from_env():
+    """Lease from the file named by ``KLINGON_WORKER_LEASE``."""
+    global _backend_factory
+    path = os.environ[WORKER_LEASE_ENV]
+    _backend_factory = lambda: FileLeaseBackend(path)
+
+
+def _take_lease():
+    """Take a lease from the configured backend."""
+    global _lease
+    _lease = WorkerLease(_backend_factory(), _lease_ttl, on_lost=lambda lease: _rebuild_generators())
+    return _lease
+
+
+def _rebuild_generators():
+    """Rebuild the prefix of every live `SerialGenerator`."""
+    from .generate import SerialGenerator, _generators
+    for generator in list(_generators):
+        if isinstance(generator, SerialGenerator):
+            generator._reset()
+
+
+def _now_ms():
+    return time.time_ns() // 1_000_000
+
+
+def _reset_after_fork():
+    """Drop the parent's lease in a forked child; the child leases its own on first use."""
+    global _lease, _lease_lock
+    _lease = None
+    _lease_lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -4,28 +4,108 @@ handler.py
 This module defines the FastAPI application that serves as the OpenFaaS function for generating unique hexadecimal serial numbers.
 It includes endpoints for generating serial numbers in various formats based on the Accept header of the request.
 
-The module uses the `klingon_serial` Python module to generate the serial numbers and defines custom response classes to handle
-different content types.
+The module uses the `klingon_serial` Python module to generate the serial numbers. The Accept header is negotiated once per
+distinct header value, with q-values, and each format is rendered from precomputed byte templates.
 
 It can be run standalone using Uvicorn for local development and testing purposes.
 """
 
 from fastapi import FastAPI, Header, Query, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
-from starlette.testclient import TestClient
-from klingon_serial.generate import generate_serial
-from starlette.responses import Response as StarletteResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from functools import lru_cache, partial
+from klingon_serial import metrics
+from klingon_serial.generate import generate_serial, reserve_block
+from klingon_serial.validate import is_serial
 from typing import Optional
+import logging
+import os
+import time
 import uvicorn
-import yaml
 
-class XMLResponse(Response):
-    media_type = "application/xml"
+app = FastAPI()
 
-class YAMLResponse(Response):
-    media_type = "application/yaml"
+# Maximum number of serials a single /serials request may ask for.
+MAX_SERIALS = int(os.environ.get("KLINGON_MAX_SERIALS", "100000"))
+
+# Content type of the Prometheus text exposition format served by /metrics.
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Number of serials rendered per chunk of a streamed /serials response.
+STREAM_CHUNK = 4096
+
+XHTML_HEAD = '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd"><html xmlns="http://www.w3.org/1999/xhtml"><head><title>Serial Number</title></head><body>'
+
+# Single serial formats, in order of server preference: media type -> (response media type, prefix, suffix).
+serial_formats = {
+    "application/json": ("application/json", b'{"serial":"', b'"}'),
+    "text/plain": ("text/plain", b"", b""),
+    "text/html": ("text/html", b"<html><body><p>", b"</p></body></html>"),
+    "application/xml": ("application/xml", b"<root><serial>", b"</serial></root>"),
+    "application/xhtml+xml": ("text/html", XHTML_HEAD.encode() + b"<p>", b"</p></body></html>"),
+    "application/yaml": ("application/yaml", b'serial: "', b'"\n'),
+}
+
+# Batch formats: media type -> (response media type, document start, record opening, record separator, document end).
+# Records are rendered as opening + SERIAL + separator; for JSON the final
+# separator's trailing comma is dropped before the document end.
+batch_formats = {
+    "application/json": ("application/json", b"[", b'"', b'",', b"]"),
+    "application/x-ndjson": ("application/x-ndjson", b"", b'{"serial":"', b'"}\n', b""),
+    "text/plain": ("text/plain; charset=utf-8", b"", b"", b"\n", b""),
+    "text/html": ("text/html; charset=utf-8", b"<html><body><ul>", b"<li>", b"</li>", b"</ul></body></html>"),
+    "application/xml": ("application/xml", b"<root>", b"<serial>", b"</serial>", b"</root>"),
+    "application/xhtml+xml": ("text/html; charset=utf-8", XHTML_HEAD.encode() + b"<ul>", b"<li>", b"</li>", b"</ul></body></html>"),
+    "application/yaml": ("application/yaml", b"serials:\n", b'- "', b'"\n', b""),
+    "application/octet-stream": ("application/octet-stream", b"", b"", b"", b""),
+}
+
+SERIAL_MEDIA_TYPES = tuple(serial_formats)
+BATCH_MEDIA_TYPES = tuple(batch_formats)
 
-app = FastAPI()
+
+@lru_cache(maxsize=1024)
+def negotiate(accept, offered):
+    """Pick the offered media type that an Accept header prefers.
+
+    Each offered type takes the q-value of the most specific matching media
+    range (``type/subtype``, then ``type/*``, then ``*/*``). The highest
+    non-zero q-value wins, with ties going to the earlier offered type. A
+    missing header accepts anything. Results are cached by header value, so
+    each distinct header is parsed once.
+
+    Args:
+        accept (str): The Accept header value, or None.
+        offered (tuple): Media types the endpoint can produce, in order of preference.
+
+    Returns:
+        str: The chosen media type, or None if nothing offered is acceptable.
+    """
+    ranges = []
+    for item in (accept if accept is not None else "*/*").split(","):
+        media, _, parameters = item.partition(";")
+        media = media.strip().lower()
+        if not media:
+            continue
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media, quality))
+    best, best_quality = None, 0.0
+    for media_type in offered:
+        wildcard = media_type.split("/")[0] + "/*"
+        quality, specificity = None, -1
+        for media, value in ranges:
+            rank = 2 if media == media_type else 1 if media == wildcard else 0 if media == "*/*" else -1
+            if rank > specificity:
+                quality, specificity = value, rank
+        if quality and quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
 
 response_types = {  # Define the possible response types and their descriptions
     "application/json": {"description": "JSON response"},
@@ -36,32 +116,55 @@ response_types = {  # Define the possible response types and their descriptions
     "application/yaml": {"description": "YAML response"},
 }
 
+# Seconds a readiness result is reused before /ready checks again.
+READINESS_TTL = 5.0
+
+readiness = {"ready": False, "checked": None}
+
+
+def self_check():
+    """Generate a serial and validate it, raising if the library is not working."""
+    serial = generate_serial(upper=True)
+    if not is_serial(serial):
+        raise RuntimeError(f"Generated an invalid serial {serial!r}")
+
+
 @app.get("/health")
 async def health():
     """
-    This endpoint does two things:
-    - Ensures that the klingon-serial library is working and can generate a valid serial
-    number using the is_valid_serial function. This step is a functional test of
-    the library itself.
-    - Ensures that the / http endpoint is working and returns a 200 status code with
-    a valid serial number in the response body. This step should be considered
-    as an end to end test of the library and the fastAPI server, as it will
-    actually make an API call to the / endpoint and check the response.
-
-    In the event that anything doesn't work, the exception should be caught and
-    dumped to the result as a string and a 500 error should be returned.
+    Liveness probe. Ensures that the klingon-serial library can generate a
+    valid serial number by calling the generator and validator directly, so
+    a probe costs about as much as one serial and never blocks the event loop.
+
+    If anything fails, the error is logged and a 500 response is returned.
     """
     try:
-        client = TestClient(app)
-        response = client.get("/", headers={"Accept": "application/json"})
-        if response.status_code == 200 and "serial" in response.json():
-            return {"status": "ok"}
-        else:
-            raise Exception("The / endpoint did not return a valid response.")
-    except Exception as e:
-        import logging
+        self_check()
+    except Exception:
         logging.error("An error occurred in the /health endpoint", exc_info=True)
-        return {"status": "error", "message": "An internal error has occurred."}, 500
+        return JSONResponse(status_code=500, content={"status": "error", "message": "An internal error has occurred."})
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe. Returns the cached result of the last self-check and only
+    runs a new one when the cached result is older than READINESS_TTL, so the
+    probe rate does not change its cost. Returns 503 while not ready.
+    """
+    now = time.monotonic()
+    if readiness["checked"] is None or now - readiness["checked"] > READINESS_TTL:
+        try:
+            self_check()
+            readiness["ready"] = True
+        except Exception:
+            logging.error("An error occurred in the /ready endpoint", exc_info=True)
+            readiness["ready"] = False
+        readiness["checked"] = now
+    if readiness["ready"]:
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "not ready"})
 
 
 @app.get("/favicon.ico")
@@ -70,6 +173,22 @@ async def favicon():
     return Response(content="", media_type="image/x-icon", status_code=204)
 
 
+def render_serial(media_type):
+    """Generate a serial and render it as a response in one of the single serial formats."""
+    response_type, prefix, suffix = serial_formats[media_type]
+    return Response(content=prefix + generate_serial(upper=True).encode() + suffix, media_type=response_type)
+
+
+# Renderers for each format of /, sampled into a latency histogram per format when metrics are enabled.
+serial_renderers = {
+    media_type: metrics.sampled(
+        partial(render_serial, media_type), "klingon_serial_root_seconds",
+        "Sampled latency of rendering a serial for /.", format=media_type,
+    )
+    for media_type in SERIAL_MEDIA_TYPES
+}
+
+
 @app.get("/", responses={  # Update the responses parameter to use proper status codes
     "200": {
         "description": "Successful Response",
@@ -91,30 +210,56 @@ async def favicon():
 })
 async def root(accept: Optional[str] = Header(None)):
     # Root endpoint that generates and returns a unique serial number in the requested format.
-    # The Accept header determines the response content type: JSON, plain text, HTML, XML, or XHTML.
+    # The Accept header determines the response content type: JSON, plain text, HTML, XML, XHTML or YAML.
     # If the Accept header is not supported, it returns a 406 Not Acceptable with an error message.
-    unique_serial = generate_serial().upper()
-    data = {"serial": unique_serial}
-    # Check if 'Accept' is provided as a query parameter and override the header value
-    accept_header = accept or ""
-    if accept_header:
-        if "application/json" in accept:
-            return JSONResponse(content=data)
-        elif "text/plain" in accept:
-            return PlainTextResponse(unique_serial)
-        elif "text/html" in accept:
-            html_content = f'<html><body><p>{unique_serial}</p></body></html>'
-            return HTMLResponse(content=html_content)
-        elif "application/xml" in accept:
-            xml_content = f'<root><serial>{unique_serial}</serial></root>'
-            return XMLResponse(content=xml_content)
-        elif "application/xhtml+xml" in accept:
-            xhtml_content = f'<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd"><html xmlns="http://www.w3.org/1999/xhtml"><head><title>Serial Number</title></head><body><p>{unique_serial}</p></body></html>'
-            return HTMLResponse(content=xhtml_content)
-        elif "application/yaml" in accept:
-            yaml_content = yaml.dump(data)
-            return YAMLResponse(content=yaml_content)
-    raise HTTPException(status_code=406, detail="Unsupported Accept header")
+    media_type = negotiate(accept, SERIAL_MEDIA_TYPES)
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Unsupported Accept header")
+    return serial_renderers[media_type]()
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    # Prometheus scrape endpoint. Counters and histograms are only collected when
+    # metrics are enabled with the KLINGON_METRICS environment variable.
+    return Response(content=metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+def stream_block(block, media_type):
+    """Render a reserved block chunk by chunk in the given batch format.
+
+    Yields:
+        bytes: The next part of the response body.
+    """
+    if media_type == "application/octet-stream":
+        for chunk in block.chunks(STREAM_CHUNK):
+            yield chunk.to_packed()
+        return
+    _, start, opening, separator, end = batch_formats[media_type]
+    trailing_comma = media_type == "application/json"
+    yield start
+    remaining = len(block)
+    for chunk in block.chunks(STREAM_CHUNK):
+        body = chunk.to_bytes(separator, upper=True, opening=opening)
+        remaining -= len(chunk)
+        if trailing_comma and not remaining:
+            body = body[:-1]
+        yield body
+    yield end
+
+
+@app.get("/serials")
+async def serials(count: int = Query(1, ge=1), accept: Optional[str] = Header(None)):
+    # Batch endpoint that returns `count` serials, reserved as one block, in the requested format.
+    # Supports every format of / plus NDJSON (application/x-ndjson) and packed 14-byte
+    # records (application/octet-stream). The body is streamed in chunks of STREAM_CHUNK serials.
+    if count > MAX_SERIALS:
+        raise HTTPException(status_code=400, detail=f"count must not exceed {MAX_SERIALS}")
+    media_type = negotiate(accept, BATCH_MEDIA_TYPES)
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Unsupported Accept header")
+    block = reserve_block(count)
+    return StreamingResponse(stream_block(block, media_type), media_type=batch_formats[media_type][0])
 
 
 if __name__ == "__main__":
@@ -1,20 +1,23 @@
+import json
 import pytest
 import sys
+import yaml
 from pathlib import Path
 from starlette.testclient import TestClient
 
 # Add the directory containing `openfaas` to the Python path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+from openfaas import handler
 from openfaas.handler import app
 
 client = TestClient(app)
 
 def test_root_default_json():
     response = client.get("/")
-    assert response.status_code == 406
+    assert response.status_code == 200
     assert response.headers['content-type'] == 'application/json'
-    assert 'detail' in response.json()
+    assert 'serial' in response.json()
 
 def test_root_accept_json():
     response = client.get("/", headers={"Accept": "application/json"})
@@ -52,8 +55,97 @@ def test_root_invalid_accept_header():
     assert response.headers['content-type'] == 'application/json'
     assert 'detail' in response.json()
 #    assert 'error' in response.json()
+def test_root_quality_values():
+    response = client.get("/", headers={"Accept": "text/plain;q=0.5, application/yaml"})
+    assert response.headers['content-type'] == 'application/yaml'
+    assert len(yaml.safe_load(response.text)['serial']) == 28
+    response = client.get("/", headers={"Accept": "application/json;q=0, */*;q=0.1"})
+    assert response.headers['content-type'] == 'text/plain; charset=utf-8'
+    response = client.get("/", headers={"Accept": "text/*"})
+    assert response.headers['content-type'] == 'text/plain; charset=utf-8'
+    response = client.get("/", headers={"Accept": "application/json;q=0"})
+    assert response.status_code == 406
+
+def test_negotiate():
+    offered = ("application/json", "text/plain")
+    assert handler.negotiate(None, offered) == "application/json"
+    assert handler.negotiate("text/plain, application/json", offered) == "application/json"
+    assert handler.negotiate("text/plain;q=1, application/json;q=0.9", offered) == "text/plain"
+    assert handler.negotiate("*/*, application/json;q=0", offered) == "text/plain"
+    assert handler.negotiate("image/png", offered) is None
+
 def test_health_endpoint():
     client = TestClient(app)
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+def test_health_endpoint_error(monkeypatch):
+    def broken(upper=False):
+        raise RuntimeError("generator failure")
+    monkeypatch.setattr(handler, "generate_serial", broken)
+    response = client.get("/health")
+    assert response.status_code == 500
+    assert response.json()["status"] == "error"
+
+def test_ready_endpoint(monkeypatch):
+    monkeypatch.setitem(handler.readiness, "checked", None)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+def test_ready_endpoint_is_cached(monkeypatch):
+    monkeypatch.setitem(handler.readiness, "checked", None)
+    assert client.get("/ready").status_code == 200
+    def broken(upper=False):
+        raise RuntimeError("generator failure")
+    monkeypatch.setattr(handler, "generate_serial", broken)
+    assert client.get("/ready").status_code == 200
+    monkeypatch.setitem(handler.readiness, "checked", None)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "not ready"}
+
+def test_serials_json():
+    response = client.get("/serials?count=5000", headers={"Accept": "application/json"})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/json'
+    serials = response.json()
+    assert len(serials) == len(set(serials)) == 5000
+    assert all(serial == serial.upper() and len(serial) == 28 for serial in serials)
+
+def test_serials_text_ndjson_yaml():
+    response = client.get("/serials?count=10", headers={"Accept": "text/plain"})
+    assert len(response.text.splitlines()) == 10
+    response = client.get("/serials?count=10", headers={"Accept": "application/x-ndjson"})
+    assert [len(json.loads(line)["serial"]) for line in response.text.splitlines()] == [28] * 10
+    response = client.get("/serials?count=10", headers={"Accept": "application/yaml"})
+    assert len(yaml.safe_load(response.text)["serials"]) == 10
+
+def test_serials_markup():
+    response = client.get("/serials?count=10", headers={"Accept": "application/xml"})
+    assert response.text.startswith("<root><serial>") and response.text.count("<serial>") == 10
+    response = client.get("/serials?count=10", headers={"Accept": "text/html"})
+    assert response.text.count("<li>") == 10
+    response = client.get("/serials?count=10", headers={"Accept": "application/xhtml+xml"})
+    assert response.text.count("<li>") == 10
+
+def test_serials_binary():
+    response = client.get("/serials?count=100", headers={"Accept": "application/octet-stream"})
+    assert response.headers['content-type'] == 'application/octet-stream'
+    assert len(response.content) == 14 * 100
+
+def test_serials_limits():
+    response = client.get(f"/serials?count={handler.MAX_SERIALS + 1}", headers={"Accept": "text/plain"})
+    assert response.status_code == 400
+    response = client.get("/serials?count=0", headers={"Accept": "text/plain"})
+    assert response.status_code == 422
+    response = client.get("/serials?count=1", headers={"Accept": "application/invalid"})
+    assert response.status_code == 406
+
+def test_metrics_endpoint():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert 'klingon_serial_issued_total' in response.text
+    assert 'klingon_serial_node_info{' in response.text
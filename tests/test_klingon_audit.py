@@ -0,0 +1,88 @@
+"""Tests for the serial auditor in `klingon_serial.audit` and the ``audit`` command."""
+import io
+import json
+
+import pytest
+from klingon_serial import main
+from klingon_serial.audit import audit, format_report
+from klingon_serial.clock import wall_clock
+from klingon_serial.generate import SerialGenerator
+
+NODE = 0x0242AC110002
+
+
+def serial(process_id, timestamp, node=NODE):
+    return f"{node:012x}{process_id:05x}{timestamp:011x}"
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    serials = SerialGenerator().reserve_block(5000).to_list()
+    duplicated = serials[:3]
+    lines = serials + duplicated + [duplicated[0], "not-a-serial", "", "zz" * 14]
+    path = tmp_path / "serials.log"
+    path.write_text("\n".join(lines) + "\n")
+    return path, duplicated
+
+
+@pytest.mark.parametrize("options", [{}, {"run_size": 700}, {"bloom": True}])
+def test_audit_finds_duplicates(corpus, options):
+    path, duplicated = corpus
+    report = audit([str(path)], **options)
+    assert report.total == 5006
+    assert report.invalid == 2
+    assert report.unique == 5000
+    assert report.duplicates == 4
+    assert dict(report.duplicate_serials) == {duplicated[0]: 3, duplicated[1]: 2, duplicated[2]: 2}
+    assert sum(report.nodes.values()) == 5004
+    assert report.future == 0
+    assert report.regressions == 2
+
+
+def test_audit_distributions_and_anomalies():
+    now = wall_clock()
+    lines = [
+        serial(1, now), serial(1, now), serial(1, now + 1),
+        serial(2, now), serial(1, now - 5), serial(1, now + 2),
+        serial(3, now + 3_600_000, node=1),
+    ]
+    report = audit([io.BytesIO("\n".join(lines).encode())])
+    assert report.duplicates == 1
+    assert report.nodes == {NODE: 6, 1: 1}
+    assert report.processes == {(NODE, 1): 5, (NODE, 2): 1, (1, 3): 1}
+    assert report.per_ms == {2: 1, 1: 5}
+    assert report.max_per_ms == 2
+    assert report.regressions == 1
+    assert report.max_regression_ms == 6
+    assert report.future == 1
+    assert report.first_timestamp == now - 5
+    assert report.last_timestamp == now + 3_600_000
+
+
+def test_audit_sequence_bits_and_encodings():
+    generator = SerialGenerator(sequence_bits=2)
+    block = generator.reserve_block(100)
+    report = audit([io.BytesIO(b"\n".join(text.encode() for text in block.to_base62()))], encoding="base62", sequence_bits=2)
+    assert report.invalid == 0
+    assert report.duplicates == 0
+    assert report.max_per_ms <= 4
+    with pytest.raises(ValueError):
+        audit([io.BytesIO(b"")], bloom=True)
+    with pytest.raises(ValueError):
+        audit([io.BytesIO(b"")], encoding="base64")
+
+
+def test_audit_command(corpus, capsys):
+    path, duplicated = corpus
+    assert main(["audit", str(path)]) == 1
+    output = capsys.readouterr().out
+    assert "duplicates: 4" in output
+    assert f"  {duplicated[0]} x3" in output
+
+    assert main(["audit", "--json", "--bloom", str(path)]) == 1
+    fields = json.loads(capsys.readouterr().out)
+    assert fields["duplicates"] == 4
+    assert sum(fields["nodes"].values()) == 5004
+
+    assert main(["audit", str(path.parent / "missing.log")]) == 2
+    assert format_report(audit([])).startswith("serials: 0\n")
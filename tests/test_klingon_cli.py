@@ -0,0 +1,61 @@
+"""Tests for the ``klingon_serial`` command in `klingon_serial.main`."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from klingon_serial import WRITE_BLOCK, Serial, SerialGenerator, main
+from klingon_serial.validate import is_serial
+
+ROOT = str(Path(__file__).resolve().parents[1])
+
+
+def run(capsysbinary, *args):
+    assert main(list(args)) == 0
+    return capsysbinary.readouterr().out
+
+
+def test_default_prints_one_serial(capsysbinary):
+    lines = run(capsysbinary).splitlines()
+    assert len(lines) == 1 and is_serial(lines[0].decode())
+
+
+@pytest.mark.parametrize("count", [0, 5, WRITE_BLOCK + 7])
+def test_count_and_formats(capsysbinary, count):
+    hex_lines = run(capsysbinary, "--count", str(count)).decode().splitlines()
+    assert len(hex_lines) == len(set(hex_lines)) == count
+    assert all(is_serial(serial) for serial in hex_lines)
+    assert hex_lines == sorted(hex_lines)
+
+    upper = run(capsysbinary, "--count", str(count), "--format", "upper").decode().splitlines()
+    integers = run(capsysbinary, "--count", str(count), "--format", "int").decode().splitlines()
+    packed = run(capsysbinary, "--count", str(count), "--format", "bytes")
+    base32 = run(capsysbinary, "--count", str(count), "--format", "base32").decode().splitlines()
+    assert all(serial == serial.upper() and is_serial(serial) for serial in upper)
+    assert all(is_serial(Serial(int(value)).hex()) for value in integers)
+    assert len(packed) == 14 * count
+    assert len(integers) == len(base32) == count
+    assert all(is_serial(serial, encoding="base32") for serial in base32)
+    if count:
+        assert int(integers[-1]) > int(hex_lines[-1], 16)
+
+
+def test_stream_stops_when_the_reader_goes_away():
+    command = f"{sys.executable} -c 'from klingon_serial import main; raise SystemExit(main())' --stream | head -n 3"
+    result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=ROOT, timeout=60)
+    assert [is_serial(line) for line in result.stdout.splitlines()] == [True] * 3
+    assert result.stderr == ""
+
+
+def test_validate(tmp_path, capsys):
+    path = tmp_path / "serials.txt"
+    serials = SerialGenerator().reserve_block(3).to_list()
+    path.write_text("\n".join([serials[0], "not-a-serial", serials[1], serials[2][:-1]]) + "\n")
+    assert main(["--validate", str(path)]) == 1
+    assert capsys.readouterr().out == f"2: not-a-serial\n4: {serials[2][:-1]}\n"
+    path.write_text("\n".join(serials) + "\n")
+    assert main(["--validate", str(path)]) == 0
+    with pytest.raises(SystemExit):
+        main(["--validate", str(path), "--format", "bytes"])
+    with pytest.raises(SystemExit):
+        main(["--count", "-1"])
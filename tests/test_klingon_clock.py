@@ -0,0 +1,78 @@
+"""Tests for the time sources in `klingon_serial.clock` and clock regression handling."""
+import threading
+import time
+
+import pytest
+from klingon_serial.clock import ClockRegressionError, MonotonicClock, default_clock, wall_clock
+from klingon_serial.generate import SerialGenerator, ThreadSafeSerialGenerator, clock_regressions
+
+
+class SteppedClock:
+    """A clock that returns the readings it is given, then repeats the last one."""
+
+    def __init__(self, *readings):
+        self.readings = list(readings)
+
+    def __call__(self):
+        if len(self.readings) > 1:
+            return self.readings.pop(0)
+        return self.readings[0]
+
+
+def test_monotonic_clock_tracks_wall_clock():
+    clock = MonotonicClock()
+    assert abs(clock() - wall_clock()) <= 1
+    assert abs(default_clock() - wall_clock()) <= 1
+    readings = [clock() for _ in range(1000)]
+    assert readings == sorted(readings)
+
+
+def test_monotonic_clock_resync():
+    clock = MonotonicClock(resync_interval=0)
+    resync_at = clock._resync_at
+    clock()
+    assert clock._resync_at > resync_at
+    clock = MonotonicClock(resync_interval=None)
+    assert clock._resync_at == float("inf")
+
+
+def test_regression_hold():
+    generator = SerialGenerator(clock=SteppedClock(1000, 1000, 1005, 990, 991))
+    ticks = [generator._claim() for _ in range(4)]
+    assert ticks == [1000, 1005, 1006, 1007]
+    assert generator.regressions == 2
+    assert generator.regression_ms == 15
+
+
+def test_regression_raise():
+    generator = SerialGenerator(clock=SteppedClock(1000, 1000, 990), regression="raise")
+    generator._claim()
+    with pytest.raises(ClockRegressionError):
+        generator._claim()
+    assert generator.regressions == 1
+    assert generator._last == 1000
+
+
+def test_regression_wait(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    generator = SerialGenerator(clock=SteppedClock(1000, 1000, 990, 995, 1002), regression="wait")
+    generator._claim()
+    assert generator._claim() == 1002
+    assert sleeps == [0.01, 0.005]
+    assert generator.regressions == 1
+
+
+def test_regression_policy_invalid():
+    with pytest.raises(ValueError):
+        SerialGenerator(regression="ignore")
+
+
+def test_thread_safe_regressions():
+    generator = ThreadSafeSerialGenerator(thread_bits=1, clock=SteppedClock(1000, 1000, 1000, 900))
+    thread = threading.Thread(target=lambda: [generator.generate() for _ in range(2)])
+    thread.start()
+    thread.join()
+    assert generator.regressions == 1
+    assert generator.regression_ms == 100
+    assert clock_regressions() == (0, 0)
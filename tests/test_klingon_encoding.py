@@ -0,0 +1,87 @@
+"""Tests for the base32 and base62 encodings in `klingon_serial.encoding`."""
+import random
+
+import pytest
+from klingon_serial import Serial
+from klingon_serial.encoding import (
+    base32_length, base62_length, decode_base32, decode_base62,
+    encode_base32, encode_base32_batch, encode_base62, encode_base62_batch,
+)
+from klingon_serial.generate import (
+    SerialGenerator, generate_serial_base32, generate_serial_base62, generate_serials, reserve_block,
+)
+from klingon_serial.layout import SerialLayout
+from klingon_serial.validate import is_serial, validate_serials
+
+
+def test_lengths():
+    assert base32_length() == 23
+    assert base62_length() == 19
+    assert len(encode_base32(0)) == 23
+    assert len(encode_base62((1 << 112) - 1)) == 19
+
+
+@pytest.mark.parametrize("bits", [112, 108, 92])
+def test_round_trip(bits):
+    values = [0, 1, (1 << bits) - 1] + [random.getrandbits(bits) for _ in range(500)]
+    for value in values:
+        assert decode_base32(encode_base32(value, bits)) == value
+        assert decode_base62(encode_base62(value, bits)) == value
+    size = (bits + 7) // 8
+    packed = b"".join(value.to_bytes(size, "big") for value in values)
+    assert encode_base32_batch(packed, size, bits) == [encode_base32(value, bits) for value in values]
+    assert encode_base62_batch(packed, size, bits) == [encode_base62(value, bits) for value in values]
+
+
+def test_encodings_sort_like_values():
+    values = sorted(random.getrandbits(112) for _ in range(1000))
+    assert [encode_base32(value) for value in values] == sorted(encode_base32(value) for value in values)
+    assert [encode_base62(value) for value in values] == sorted(encode_base62(value) for value in values)
+
+
+def test_crockford_decoding():
+    serial = encode_base32(0x10)
+    assert serial.endswith("G")
+    assert decode_base32(serial.lower()) == 0x10
+    assert decode_base32("OIL") == decode_base32("011")
+    for invalid in ("U", "", "+1", "1_2", " 1", "é"):
+        with pytest.raises(ValueError):
+            decode_base32(invalid)
+    with pytest.raises(ValueError):
+        decode_base62("abc-")
+    with pytest.raises(ValueError):
+        encode_base32_batch(b"\0" * 15)
+
+
+def test_generators_and_blocks():
+    base32 = generate_serial_base32()
+    base62 = generate_serial_base62()
+    assert is_serial(base32, encoding="base32")
+    assert is_serial(base62, encoding="base62")
+    block = reserve_block(5000)
+    hex_serials = block.to_list()
+    assert block.to_base32() == [Serial.from_hex(serial).base32() for serial in hex_serials]
+    assert block.to_base62() == [Serial.from_hex(serial).base62() for serial in hex_serials]
+    assert block.to_base32() == sorted(block.to_base32())
+    assert all(validate_serials(generate_serials(100, encoding="base62"), encoding="base62"))
+    with pytest.raises(ValueError):
+        generate_serials(1, encoding="base64")
+
+    layout = SerialLayout(process_id_bits=24, checksum_bits=8)
+    generator = SerialGenerator(layout=layout)
+    assert len(generator.generate_base32()) == base32_length(layout.bits)
+    assert generator.reserve_block(3).to_base62()[0] != ""
+
+
+def test_validators():
+    serial = Serial.from_hex(generate_serials(1)[0])
+    assert Serial.from_base32(serial.base32()) == serial
+    assert Serial.from_base62(serial.base62()) == serial
+    assert is_serial(serial.base32().lower(), encoding="base32")
+    assert not is_serial(serial.base32()[1:], encoding="base32")
+    assert not is_serial("Z" * 23, encoding="base32")
+    assert not is_serial("z" * 19, encoding="base62")
+    assert not is_serial(serial.base62()[:-1] + "-", encoding="base62")
+    assert validate_serials([serial.base32(), "U" * 23], encoding="base32") == [True, False]
+    with pytest.raises(ValueError):
+        is_serial(str(serial), encoding="base64")
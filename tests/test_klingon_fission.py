@@ -0,0 +1,34 @@
+"""Tests for the Fission function in ``functions/fission/klingon_serial/app.py``."""
+import importlib.util
+from pathlib import Path
+
+import pytest
+from klingon_serial.validate import is_serial
+
+APP = Path(__file__).resolve().parents[1] / "functions" / "fission" / "klingon_serial" / "app.py"
+
+
+@pytest.fixture(scope="module")
+def app():
+    spec = importlib.util.spec_from_file_location("fission_app", APP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_single_serial(app):
+    first, second = app.main(), app.main(None, {})
+    assert first["status"] == 200 and first["serial"] == first["serial"].upper()
+    assert is_serial(first["serial"]) and first["serial"] < second["serial"]
+
+
+def test_count(app):
+    response = app.main(None, {"count": "5"})
+    serials = response["serials"]
+    assert response["status"] == 200 and len(set(serials)) == 5
+    assert all(is_serial(serial) and serial == serial.upper() for serial in serials)
+    assert serials == sorted(serials) and serials[-1] < app.main()["serial"]
+    assert app.main(None, {"count": 0})["serials"] == []
+    for count in ("-1", "many", app.MAX_SERIALS + 1):
+        body, status = app.main(None, {"count": count})
+        assert status == 400 and body["status"] == 400
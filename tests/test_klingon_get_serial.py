@@ -1,8 +1,14 @@
 """Tests for the `generate_serial()` function in `klingon.generate_serial`.
 
 """
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
-from klingon_serial.generate import generate_serial, get_mac_address_hex, get_process_id, get_millisecond_epoch_hex, is_valid_serial
+from klingon_serial.generate import shard_initializer, SerialBlock, SerialGenerator, ThreadSafeSerialGenerator, generate_serial, generate_serials, reserve_block, get_mac_address_hex, get_process_id, get_millisecond_epoch_hex, is_valid_serial
 
 def test_get_mac_address_hex():
     """Test that the `get_mac_address_hex()` function returns a valid MAC address hex string."""
@@ -40,3 +46,152 @@ def test_generate_and_validate_serial():
     """Test that a generated serial is valid according to `is_valid_serial()`."""
     serial = generate_serial()
     assert is_valid_serial(serial) == True
+
+def test_generate_serial_unique():
+    """Test that serials generated in a tight loop are never repeated."""
+    serials = [generate_serial() for _ in range(10000)]
+    assert len(set(serials)) == len(serials)
+    assert serials == sorted(serials)
+
+def test_serial_generator_prefix():
+    """Test that `SerialGenerator` caches the MAC address and process ID prefix."""
+    generator = SerialGenerator()
+    assert generator.prefix == get_mac_address_hex() + get_process_id()
+    assert generator.generate().startswith(generator.prefix)
+
+def test_serial_generator_spin():
+    """Test that the spin policy never runs ahead of the wall clock."""
+    generator = SerialGenerator(overflow="spin")
+    for _ in range(5):
+        serial = generator.generate()
+        assert int(serial[17:], 16) <= int(get_millisecond_epoch_hex(), 16)
+
+def test_serial_generator_sequence_bits():
+    """Test that sequence bits allow several serials per millisecond without borrowing."""
+    generator = SerialGenerator(sequence_bits=2)
+    serials = [generator.generate() for _ in range(100)]
+    assert len(set(serials)) == len(serials)
+    assert all(len(serial) == 28 for serial in serials)
+
+def test_serial_generator_invalid_arguments():
+    """Test that `SerialGenerator` rejects unknown policies and oversized sequences."""
+    with pytest.raises(ValueError):
+        SerialGenerator(overflow="invalid")
+    with pytest.raises(ValueError):
+        SerialGenerator(sequence_bits=8)
+
+def test_generate_serials():
+    """Test that `generate_serials()` returns consecutive, unique and valid serials."""
+    serials = generate_serials(5000)
+    assert len(set(serials)) == 5000
+    assert all(is_valid_serial(serial) for serial in serials)
+    assert serials == sorted(serials)
+    assert generate_serial() > serials[-1]
+
+def test_generate_serials_as_bytes():
+    """Test that the buffer form holds fixed 28-byte records."""
+    buffer = generate_serials(1000, as_bytes=True)
+    assert len(buffer) == 28 * 1000
+    serials = [buffer[i:i + 28].decode() for i in range(0, len(buffer), 28)]
+    assert all(is_valid_serial(serial) for serial in serials)
+
+def test_reserve_block_rendering():
+    """Test that every rendering of a block matches per-serial formatting, across digit boundaries."""
+    block = SerialBlock("0" * 17, 0xffffe, 5000)
+    expected = [f"{'0' * 17}{tick:011x}" for tick in range(0xffffe, 0xffffe + 5000)]
+    assert list(block) == expected
+    assert block.to_list() == expected
+    assert block.to_bytes(b"\n") == "".join(serial + "\n" for serial in expected).encode()
+    assert reserve_block(0).to_list() == []
+
+def test_serial_generator_shards():
+    """Test that generators sharing a prefix but not a shard never collide."""
+    generators = [SerialGenerator(shard=shard, shards=3) for shard in range(3)]
+    serials = []
+    for generator in generators:
+        serials += [generator.generate() for _ in range(100)]
+        serials += generator.reserve_block(3000).to_list()
+    assert len(set(serials)) == len(serials)
+    with pytest.raises(ValueError):
+        SerialGenerator(shard=3, shards=3)
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_forked_children_do_not_collide():
+    """Test that forked children rebuild the cached prefix and never repeat each other's serials."""
+    children, per_child = 8, 250_000
+    parent_serials = generate_serials(1000)
+    with tempfile.TemporaryDirectory() as directory:
+        pids = []
+        for index in range(children):
+            path = os.path.join(directory, str(index))
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    with open(path, "wb") as output:
+                        output.write(generate_serial().encode())
+                        output.write(generate_serials(per_child - 1, as_bytes=True))
+                finally:
+                    os._exit(0)
+            pids.append((pid, path))
+        serials = {serial.encode() for serial in parent_serials}
+        for pid, path in pids:
+            os.waitpid(pid, 0)
+            with open(path, "rb") as output:
+                buffer = output.read()
+            assert len(buffer) == 28 * per_child
+            assert buffer[12:17].decode() == f"{pid:05x}"
+            serials.update(buffer[i:i + 28] for i in range(0, len(buffer), 28))
+    assert len(serials) == len(parent_serials) + children * per_child
+
+def test_shard_initializer_process_pool():
+    """Test that pool workers configured by `shard_initializer()` issue unique serials."""
+    counter = multiprocessing.Value("i", 0)
+    with ProcessPoolExecutor(2, initializer=shard_initializer, initargs=(counter, 2)) as pool:
+        batches = list(pool.map(generate_serials, [2000] * 8))
+    serials = [serial for batch in batches for serial in batch]
+    assert len(set(serials)) == len(serials)
+    assert counter.value == 2
+
+def test_thread_safe_generator_threads():
+    """Test that threads sharing a `ThreadSafeSerialGenerator` never collide."""
+    generator = ThreadSafeSerialGenerator(thread_bits=4, sequence_bits=3)
+    results = [None] * 16
+
+    def worker(index):
+        serials = [generator.generate() for _ in range(2000)]
+        results[index] = serials + generator.reserve_block(2000).to_list()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    serials = [serial for batch in results for serial in batch]
+    assert len(set(serials)) == 16 * 4000
+
+def test_thread_safe_generator_slot_reuse():
+    """Test that slots are returned when threads exit and reuse does not repeat serials."""
+    generator = ThreadSafeSerialGenerator(thread_bits=0)
+    serials = []
+    for _ in range(3):
+        thread = threading.Thread(target=lambda: serials.extend(generator.generate() for _ in range(500)))
+        thread.start()
+        thread.join()
+    assert len(set(serials)) == 1500
+
+def test_thread_safe_generator_too_many_threads():
+    """Test that leasing more slots than `thread_bits` allows raises `RuntimeError`."""
+    generator = ThreadSafeSerialGenerator(thread_bits=0)
+    generator.generate()
+    errors = []
+
+    def worker():
+        try:
+            generator.generate()
+        except RuntimeError as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1
@@ -0,0 +1,51 @@
+"""Import-time regression tests for the `klingon_serial` package.
+
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = str(Path(__file__).resolve().parents[1])
+
+# Budget for the cumulative import time of `klingon_serial`, in microseconds.
+IMPORT_BUDGET_US = 50_000
+
+
+def run_python(*args, env=None):
+    """Run a fresh interpreter from the repository root and return the completed process."""
+    environment = dict(os.environ, PYTHONPATH=ROOT, **(env or {}))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=ROOT, env=environment, check=True)
+
+
+def import_times():
+    """Import `generate_serial` under `-X importtime` and return the cumulative time of each module."""
+    result = run_python("-X", "importtime", "-c", "from klingon_serial import generate_serial")
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_only_touches_stdlib():
+    """Test that importing `generate_serial` does not load psutil, logging or NumPy."""
+    modules = import_times()
+    assert "klingon_serial" in modules
+    for name in ("psutil", "logging", "numpy"):
+        assert name not in modules
+
+
+def test_import_time_budget():
+    """Test that importing the package stays within `IMPORT_BUDGET_US`."""
+    best = min(import_times()["klingon_serial"] for _ in range(3))
+    assert best < IMPORT_BUDGET_US
+
+
+def test_import_has_no_side_effects():
+    """Test that importing the package neither prints nor configures logging, even in debug mode."""
+    code = "import logging, klingon_serial; print(len(logging.getLogger().handlers))"
+    result = run_python("-c", code, env={"DEBUG": "true"})
+    assert result.stdout == "0\n"
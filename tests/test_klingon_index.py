@@ -0,0 +1,105 @@
+"""Tests for the memory-mapped serial index in `klingon_serial.index`."""
+import random
+
+import pytest
+from klingon_serial import Serial, SerialGenerator
+from klingon_serial.index import SerialIndex
+from klingon_serial.utils import parse_serial
+
+NOW = 1_750_000_000_000
+NODES = (0x0242AC110002, 0x0242AC110003)
+
+
+def make_serial(node, process_id, timestamp):
+    return Serial((node << 20 | process_id) << 44 | timestamp)
+
+
+@pytest.fixture
+def corpus():
+    serials = [make_serial(node, process_id, NOW + offset) for node in NODES for process_id in (7, 9) for offset in range(50)]
+    random.Random(0).shuffle(serials)
+    return serials
+
+
+def timestamps(records):
+    return [parse_serial(bytes(records[at:at + 14])).timestamp for at in range(0, len(records), 14)]
+
+
+def test_timestamp_ranges(tmp_path, corpus):
+    index = SerialIndex(str(tmp_path / "serials.idx"))
+    assert index.add(corpus[:150]) == 150
+    assert index.add(corpus[150:]) == 50
+    assert len(index) == 200
+    everything = [parse_serial(bytes(record)).timestamp for record in index]
+    assert everything == sorted(everything)
+
+    view = index.select(NOW + 10, NOW + 19)
+    assert isinstance(view, memoryview) and len(view) == 40 * 14
+    assert timestamps(view) == sorted([NOW + offset for offset in range(10, 20)] * 4)
+    assert index.count(start=NOW + 45) == 20 and index.count(end=NOW) == 4
+    assert index.count() == 200 and index.count(NOW + 50, NOW + 99) == index.count(NOW + 5, NOW) == 0
+    with pytest.raises(ValueError):
+        index.select(node=NODES[0])
+    index.close()
+
+    reopened = SerialIndex(str(tmp_path / "serials.idx"), order="serial")
+    assert reopened.order == "timestamp" and len(reopened) == 200
+    assert parse_serial(bytes(reopened[-1])).timestamp == NOW + 49
+    reopened.close()
+
+
+def test_serial_ranges(tmp_path, corpus):
+    with SerialIndex(str(tmp_path / "serials.idx"), order="serial") as index:
+        for start in range(0, 200, 30):
+            index.add(corpus[start:start + 30])
+        assert [Serial.from_bytes(record) for record in index] == sorted(corpus)
+        assert index.count(node=NODES[1]) == 100
+        assert index.count(node=NODES[1], process_id=9) == 50
+        view = index.select(NOW + 3, NOW + 4, node=NODES[0], process_id=7)
+        assert [Serial.from_bytes(view[at:at + 14]) for at in (0, 14)] == [make_serial(NODES[0], 7, NOW + 3), make_serial(NODES[0], 7, NOW + 4)]
+        assert len(view) == 28
+        assert index.count(node=NODES[0], process_id=8) == index.count(node=1) == 0
+        with pytest.raises(ValueError):
+            index.select(NOW, NOW + 1)
+        with pytest.raises(ValueError):
+            index.select(NOW, node=NODES[0])
+
+
+def test_adding_forms_and_merging(tmp_path):
+    generator = SerialGenerator()
+    block = generator.reserve_block(10)
+    with SerialIndex(str(tmp_path / "a.idx")) as index, SerialIndex(str(tmp_path / "b.idx"), order="serial") as other:
+        assert index.add(block) == 10
+        serials = [generator.generate(), generator.generate_bytes(), generator.generate_int(), Serial(generator.generate_int())]
+        assert index.add(serials) == 4
+        assert index.add(b"") == 0
+        other.add(SerialGenerator().reserve_block(5).to_packed())
+        assert index.merge(other) == 5
+        assert len(index) == 19
+        assert {Serial.from_bytes(record) for record in index} >= {Serial.from_hex(serial) for serial in block}
+        assert timestamps(index.select()) == sorted(timestamps(index.select()))
+        for bad in (["xyz"], [b"short"], [-1], [1 << 112], b"\x00" * 15):
+            with pytest.raises(ValueError):
+                index.add(bad)
+        assert len(index) == 19
+
+
+def test_views_and_refresh(tmp_path, corpus):
+    path = str(tmp_path / "serials.idx")
+    writer = SerialIndex(path)
+    writer.add(corpus[:100])
+    reader = SerialIndex(path)
+    view = reader.select()
+    writer.add([make_serial(NODES[0], 7, NOW + 1000)])
+    assert len(reader) == 100
+    reader.refresh()
+    assert len(reader) == 101 and reader.count(start=NOW + 1000) == 1
+    reader.close()
+    assert len(view) == 100 * 14
+    writer.close()
+
+    (tmp_path / "junk.idx").write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        SerialIndex(str(tmp_path / "junk.idx"))
+    with pytest.raises(ValueError):
+        SerialIndex(str(tmp_path / "new.idx"), order="random")
@@ -0,0 +1,116 @@
+"""Tests for `SerialLayout` in `klingon_serial.layout`."""
+import os
+
+import pytest
+from klingon_serial.clock import wall_clock
+from klingon_serial.generate import SerialGenerator, ThreadSafeSerialGenerator
+from klingon_serial.layout import DEFAULT_LAYOUT, SerialLayout
+from klingon_serial.node import resolve_node_id
+from klingon_serial.utils import parse_serial
+from klingon_serial.validate import is_serial
+
+EPOCH_2024 = 1_704_067_200_000
+
+
+def test_default_layout():
+    assert DEFAULT_LAYOUT == (48, 20, 44, 0, 0, 0)
+    assert DEFAULT_LAYOUT.length == 28
+    assert DEFAULT_LAYOUT.size == 14
+    serial = SerialGenerator().generate()
+    assert DEFAULT_LAYOUT.is_serial(serial)
+    assert DEFAULT_LAYOUT.parse(serial) == parse_serial(serial)
+
+
+@pytest.mark.parametrize("fields", [
+    {"node_bits": 46},
+    {"timestamp_bits": -4},
+    {"sequence_bits": 44},
+    {"checksum_bits": 4},
+    {"checksum_bits": 36},
+    {"epoch": -1},
+])
+def test_invalid_layouts(fields):
+    with pytest.raises(ValueError):
+        SerialLayout(**fields)
+    with pytest.raises(ValueError):
+        DEFAULT_LAYOUT._replace(**fields)
+
+
+def test_custom_layout_round_trip():
+    layout = SerialLayout(node_bits=28, process_id_bits=24, timestamp_bits=44, sequence_bits=4, epoch=EPOCH_2024, checksum_bits=12)
+    generator = SerialGenerator(layout=layout)
+    before = wall_clock()
+    serials = [generator.generate() for _ in range(100)]
+    after = wall_clock()
+    assert all(len(serial) == 27 and layout.is_serial(serial) for serial in serials)
+    assert len(set(serials)) == 100
+    fields = [layout.parse(serial) for serial in serials]
+    assert {field.mac_address for field in fields} == {resolve_node_id().node_id & 0xFFFFFFF}
+    assert {field.process_id for field in fields} == {os.getpid()}
+    assert all(before <= field.timestamp <= after + 100 for field in fields)
+    assert [field.sequence for field in fields[:3]] == [0, 1, 2]
+    assert layout.parse(generator.generate_int()).process_id == os.getpid()
+    assert layout.parse(generator.generate_bytes()).process_id == os.getpid()
+
+
+def test_checksum_detects_typos():
+    layout = SerialLayout(checksum_bits=16)
+    serial = SerialGenerator(layout=layout).generate()
+    assert layout.is_serial(serial)
+    for index in range(layout.length - 4):
+        changed = serial[:index] + ("0" if serial[index] != "0" else "1") + serial[index + 1:]
+        assert not layout.is_serial(changed)
+        swapped = serial[:index] + serial[index + 1] + serial[index] + serial[index + 2:]
+        assert swapped == serial or not layout.is_serial(swapped)
+    with pytest.raises(ValueError):
+        layout.parse(serial[:-1] + ("0" if serial[-1] != "0" else "1"))
+
+
+@pytest.mark.parametrize("layout", [DEFAULT_LAYOUT, SerialLayout(process_id_bits=24, epoch=EPOCH_2024, checksum_bits=8)])
+def test_compiled_encoders_match_reference(layout):
+    generator = SerialGenerator(clock=lambda: EPOCH_2024 + 12345, layout=layout)
+    for upper in (False, True):
+        generator._last = 0
+        compiled = generator.generate(upper)
+        generator._last = 0
+        assert compiled == SerialGenerator.generate(generator, upper)
+    generator._last = 0
+    compiled = generator.generate_bytes()
+    generator._last = 0
+    assert compiled == SerialGenerator.generate_bytes(generator)
+
+
+def test_block_with_custom_layout():
+    layout = SerialLayout(node_bits=32, timestamp_bits=40, epoch=EPOCH_2024, checksum_bits=8)
+    generator = ThreadSafeSerialGenerator(thread_bits=1, sequence_bits=2, layout=layout)
+    block = generator.reserve_block(50)
+    serials = block.to_list()
+    assert serials == list(block)
+    assert all(layout.is_serial(serial) for serial in serials)
+    assert block.to_bytes(b"\n") == "".join(serial + "\n" for serial in serials).encode()
+    assert block.to_packed() == b"".join(int(serial, 16).to_bytes(layout.size, "big") for serial in serials)
+    assert generator.layout.sequence_bits == 2
+
+    layout = SerialLayout(node_bits=32, timestamp_bits=40, epoch=EPOCH_2024)
+    block = SerialGenerator(layout=layout).reserve_block(5000)
+    serials = block.to_list()
+    assert serials == list(block)
+    assert len(serials[0]) == 23
+    assert block.to_packed() == b"".join(int(serial, 16).to_bytes(12, "big") for serial in serials)
+
+    layout = SerialLayout(node_bits=36, timestamp_bits=40, epoch=EPOCH_2024)
+    block = SerialGenerator(layout=layout).reserve_block(5000)
+    assert block.to_packed() == bytes.fromhex("".join(block))
+
+
+def test_wide_process_id_keeps_length(monkeypatch):
+    monkeypatch.setattr(os, "getpid", lambda: 0x3FFFFF)
+    serial = SerialGenerator().generate()
+    assert is_serial(serial)
+    assert serial[12:17] == "fffff"
+    assert SerialGenerator(layout=SerialLayout(process_id_bits=24)).generate()[12:18] == "3fffff"
+
+
+def test_epoch_in_the_future():
+    with pytest.raises(ValueError):
+        SerialGenerator(layout=SerialLayout(epoch=wall_clock() + 60_000))
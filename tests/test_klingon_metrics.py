@@ -0,0 +1,80 @@
+"""Tests for the opt-in instrumentation in `klingon_serial.metrics`."""
+import pytest
+from klingon_serial import metrics
+from klingon_serial.generate import SerialGenerator, ThreadSafeSerialGenerator
+
+NOW = 1_750_000_000_000
+
+
+def scrape():
+    """Parse the exposition into a dict of sample name (with labels) -> value."""
+    samples = {}
+    for line in metrics.render().splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.fixture
+def enabled():
+    metrics.enable(every=1)
+    yield
+    metrics.disable()
+
+
+def test_disabled_generators_are_not_wrapped():
+    assert not metrics.enabled
+    generator = SerialGenerator()
+    assert "_claim" not in vars(generator)
+    assert generator._tally is None
+    before = scrape()
+    generator.generate()
+    assert scrape()["klingon_serial_issued_total"] == before["klingon_serial_issued_total"]
+
+
+def test_counters(enabled):
+    before = scrape()
+    readings = iter([NOW, NOW, NOW, NOW, NOW - 7, NOW + 5])
+    generator = SerialGenerator(clock=lambda: next(readings))
+    generator.generate()
+    generator.generate_int()
+    generator.reserve_block(3)
+    generator.generate_bytes()
+    generator.generate(upper=True)
+    after = scrape()
+    assert after["klingon_serial_issued_total"] - before["klingon_serial_issued_total"] == 7
+    assert after["klingon_serial_sequence_exhausted_total"] - before["klingon_serial_sequence_exhausted_total"] == 4
+    assert after["klingon_serial_clock_regressions_total"] - before["klingon_serial_clock_regressions_total"] == 1
+    assert after["klingon_serial_clock_regression_max_ms"] >= 7
+    assert generator.regressions == 1
+
+
+def test_sampled_histograms(enabled):
+    generator = ThreadSafeSerialGenerator(thread_bits=1)
+    label = 'klingon_serial_generate_seconds_count{method="generate"}'
+    before = scrape().get(label, 0)
+    for _ in range(10):
+        generator.generate()
+    samples = scrape()
+    assert samples[label] - before == 10
+    assert samples['klingon_serial_generate_seconds_bucket{method="generate",le="+Inf"}'] == samples[label]
+    assert samples['klingon_serial_generate_seconds_sum{method="generate"}'] > 0
+
+    metrics.enable(every=4)
+    before = samples[label]
+    for _ in range(12):
+        generator.generate()
+    assert scrape()[label] - before == 3
+
+
+def test_render_format():
+    exposition = metrics.render()
+    assert exposition.endswith("\n")
+    assert "# TYPE klingon_serial_issued_total counter" in exposition
+    assert 'klingon_serial_node_info{node_id="' in exposition
+    histogram = metrics.Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4 and histogram.sum == 6.0
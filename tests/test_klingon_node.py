@@ -0,0 +1,71 @@
+"""Tests for node ID resolution in `klingon_serial.node`.
+
+"""
+import pytest
+from klingon_serial import node
+from klingon_serial.generate import get_mac_address_hex
+from klingon_serial.node import NODE_ID_SOURCES, NodeIdentity, resolve_node_id
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear the cached node ID before and after each test."""
+    node._resolve.cache_clear()
+    yield
+    node._resolve.cache_clear()
+
+
+def test_resolve_node_id_from_env(monkeypatch):
+    """Test that `KLINGON_NODE_ID` takes priority and accepts MAC address notation."""
+    monkeypatch.setenv("KLINGON_NODE_ID", "02:42:ac:11:00:02")
+    assert resolve_node_id() == NodeIdentity(0x0242AC110002, "env")
+
+
+def test_resolve_node_id_is_cached(monkeypatch):
+    """Test that the node ID is resolved once and then stays stable."""
+    monkeypatch.setenv("KLINGON_NODE_ID", "0242ac110002")
+    first = resolve_node_id()
+    monkeypatch.setenv("KLINGON_NODE_ID", "0242ac110003")
+    assert resolve_node_id() is first
+
+
+def test_resolve_node_id_priority(monkeypatch):
+    """Test that sources are tried in the configured order, skipping those that fail."""
+    monkeypatch.setitem(NODE_ID_SOURCES, "broken", lambda: 1 // 0)
+    monkeypatch.setitem(NODE_ID_SOURCES, "empty", lambda: None)
+    monkeypatch.setitem(NODE_ID_SOURCES, "fixed", lambda: 0xABCDEF)
+    assert resolve_node_id(["broken", "empty", "fixed"]) == NodeIdentity(0xABCDEF, "fixed")
+    monkeypatch.setenv("KLINGON_NODE_SOURCES", "empty, fixed")
+    assert resolve_node_id().source == "fixed"
+
+
+def test_resolve_node_id_hashed_sources(monkeypatch, tmp_path):
+    """Test that pod UID and machine ID hashes are stable and marked as non-hardware."""
+    uid_file = tmp_path / "uid"
+    uid_file.write_text("6f2d9c1e-0000-4000-8000-000000000000\n")
+    monkeypatch.setenv("KLINGON_POD_UID_FILE", str(uid_file))
+    identity = resolve_node_id(["pod-uid"])
+    assert identity.source == "pod-uid"
+    assert identity.node_id & (1 << 40)
+    node._resolve.cache_clear()
+    assert resolve_node_id(["pod-uid"]) == identity
+
+
+def test_resolve_node_id_random_fallback(monkeypatch):
+    """Test that a random node ID is drawn once when every source fails."""
+    monkeypatch.setitem(NODE_ID_SOURCES, "empty", lambda: None)
+    identity = resolve_node_id(["empty"])
+    assert identity.source == "random"
+    assert resolve_node_id(["empty"]) == identity
+
+
+def test_resolve_node_id_unknown_source():
+    """Test that an unregistered source name raises `ValueError`."""
+    with pytest.raises(ValueError):
+        resolve_node_id(["missing"])
+
+
+def test_get_mac_address_hex_uses_resolver(monkeypatch):
+    """Test that the serial prefix uses the resolved node ID."""
+    monkeypatch.setenv("KLINGON_NODE_ID", "0242ac110002")
+    assert get_mac_address_hex() == "0242ac110002"
@@ -0,0 +1,76 @@
+"""Tests for the record-tagging pipeline stages in `klingon_serial.pipeline`."""
+import asyncio
+
+import pytest
+from klingon_serial import SerialGenerator, atag_records, is_serial, tag_records
+
+
+class CountingGenerator:
+    """Wrap a generator and record the size of every reservation."""
+
+    def __init__(self):
+        self.generator = SerialGenerator()
+        self.reserved = []
+
+    def reserve_block(self, count):
+        self.reserved.append(count)
+        return self.generator.reserve_block(count)
+
+
+def records(count, pulled):
+    for number in range(count):
+        pulled.append(number)
+        yield {"number": number}
+
+
+def test_tag_records_streams_in_chunks():
+    generator = CountingGenerator()
+    pulled = []
+    tagged = tag_records(records(10, pulled), field="id", chunk=4, generator=generator)
+    assert pulled == [] and generator.reserved == []
+    first = next(tagged)
+    assert pulled == [0] and generator.reserved == [4] and is_serial(first["id"])
+    rest = list(tagged)
+    assert [record["number"] for record in [first] + rest] == list(range(10))
+    assert generator.reserved == [4, 4, 4]
+    serials = [record["id"] for record in [first] + rest]
+    assert serials == sorted(serials) and len(set(serials)) == 10
+
+    pairs = list(tag_records(range(5), chunk=2))
+    assert [record for _, record in pairs] == list(range(5))
+    assert all(is_serial(serial) for serial, _ in pairs)
+    assert list(tag_records([], generator=generator)) == [] and generator.reserved == [4, 4, 4]
+
+
+def test_tag_records_attach_and_encodings():
+    rows = list(tag_records([(1, "a"), (2, "b")], attach=lambda row, serial: row + (serial,), encoding="base32"))
+    assert [row[:2] for row in rows] == [(1, "a"), (2, "b")]
+    assert all(is_serial(row[2], encoding="base32") for row in rows)
+    with pytest.raises(ValueError):
+        tag_records([], field="id", attach=print)
+    with pytest.raises(ValueError):
+        tag_records([], chunk=0)
+    with pytest.raises(ValueError):
+        tag_records([], encoding="int")
+
+
+def test_atag_records():
+    async def source():
+        for number in range(7):
+            await asyncio.sleep(0)
+            yield {"number": number}
+
+    async def collect(stage):
+        return [record async for record in stage]
+
+    generator = CountingGenerator()
+    tagged = asyncio.run(collect(atag_records(source(), field="id", chunk=3, generator=generator)))
+    assert [record["number"] for record in tagged] == list(range(7))
+    assert generator.reserved == [3, 3, 3]
+    assert len({record["id"] for record in tagged}) == 7
+    pairs = asyncio.run(collect(atag_records(source(), encoding="base62")))
+    assert all(is_serial(serial, encoding="base62") for serial, _ in pairs)
+    numbers = asyncio.run(collect(atag_records(source(), attach=lambda record, serial: record["number"])))
+    assert numbers == list(range(7))
+    with pytest.raises(ValueError):
+        atag_records(source(), chunk=-1)
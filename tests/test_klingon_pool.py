@@ -0,0 +1,118 @@
+"""Tests for `SerialPool` in `klingon_serial.pool`."""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from klingon_serial.generate import SerialGenerator, generate_serials
+from klingon_serial.pool import SerialPool, http_fetcher, local_fetcher, tcp_fetcher
+from klingon_serial.server import start_server
+from klingon_serial.validate import is_serial
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_pool_refills_between_watermarks():
+    with SerialPool(low=10, high=50) as pool:
+        wait_for(lambda: len(pool) == 50)
+        serials = [pool.get() for _ in range(40)]
+        wait_for(lambda: len(pool) == 50)
+        stats = pool.stats()
+    assert all(is_serial(serial) for serial in serials)
+    assert len(set(serials)) == 40
+    assert stats == (40, 0, 1.0, 2, 90, 0, 50)
+
+
+def test_pool_stalls_and_counts():
+    release = threading.Event()
+    fetch = local_fetcher(SerialGenerator())
+
+    def slow_fetch(count):
+        release.wait()
+        return fetch(count)
+
+    with SerialPool(slow_fetch, low=0, high=4) as pool:
+        with pytest.raises(TimeoutError):
+            pool.get(timeout=0.01)
+        release.set()
+        serials = [pool.get() for _ in range(10)]
+        stats = pool.stats()
+    assert len(set(serials)) == 10
+    assert stats.stalls >= 2
+    assert stats.hits + stats.stalls - 1 == 10
+    assert stats.hit_rate == stats.hits / (stats.hits + stats.stalls)
+
+
+def test_pool_reports_fetch_errors():
+    def broken(count):
+        raise ConnectionError("allocator down")
+
+    with SerialPool(broken, low=0, high=4, retry_delay=0.01) as pool:
+        with pytest.raises(ConnectionError):
+            pool.get()
+        assert pool.stats().errors >= 1
+
+
+def test_pool_closed():
+    pool = SerialPool(lambda count: [], low=0, high=4)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.get()
+    with pytest.raises(ValueError):
+        SerialPool(low=4, high=4)
+
+
+def test_pool_aget():
+    async def take(pool):
+        return [await pool.aget() for _ in range(20)]
+
+    with SerialPool(low=2, high=8) as pool:
+        serials = asyncio.run(take(pool))
+    assert len(set(serials)) == 20
+
+
+def test_http_fetcher():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            count = int(self.path.split("count=")[1])
+            body = "\n".join(generate_serials(count)).encode() + b"\n"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        fetch = http_fetcher(f"http://127.0.0.1:{server.server_port}/serials", max_count=5)
+        assert len(fetch(3)) == 3
+        with SerialPool(fetch, low=2, high=12) as pool:
+            serials = [pool.get() for _ in range(30)]
+    finally:
+        server.shutdown()
+    assert all(is_serial(serial) for serial in serials)
+    assert len(set(serials)) == 30
+
+
+def test_tcp_fetcher():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server("127.0.0.1", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    try:
+        port = server.sockets[0].getsockname()[1]
+        with SerialPool(tcp_fetcher("127.0.0.1", port), low=5, high=20) as pool:
+            serials = [pool.get() for _ in range(50)]
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+    assert all(is_serial(serial) for serial in serials)
+    assert len(set(serials)) == 50
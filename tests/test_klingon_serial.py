@@ -0,0 +1,47 @@
+"""Tests for the `Serial` value type in `klingon_serial.serial`.
+
+"""
+import pytest
+from klingon_serial.generate import generate_serial, generate_serial_bytes, generate_serial_int, is_valid_serial
+from klingon_serial.serial import Serial
+
+
+def test_generate_serial_int():
+    """Test that `generate_serial_int()` returns a 112-bit integer matching the hex layout."""
+    value = generate_serial_int()
+    assert isinstance(value, int)
+    assert value.bit_length() <= 112
+    assert is_valid_serial(f"{value:028x}")
+
+def test_generate_serial_bytes():
+    """Test that `generate_serial_bytes()` returns 14 packed bytes."""
+    data = generate_serial_bytes()
+    assert isinstance(data, bytes)
+    assert len(data) == 14
+    assert is_valid_serial(data.hex())
+
+def test_generate_serial_upper():
+    """Test that `generate_serial(upper=True)` renders uppercase hex directly."""
+    serial = generate_serial(upper=True)
+    assert serial == serial.upper()
+    assert is_valid_serial(serial)
+
+def test_serial_representations():
+    """Test that a `Serial` renders consistently as hex, bytes and int."""
+    value = generate_serial_int()
+    serial = Serial(value)
+    assert int(serial) == value
+    assert str(serial) == f"{value:028x}"
+    assert serial.hex(upper=True) == f"{value:028X}"
+    assert bytes(serial) == value.to_bytes(14, "big")
+    assert Serial.from_hex(serial.hex(upper=True)) == serial
+    assert Serial.from_bytes(bytes(serial)) == serial
+    assert hash(Serial(value)) == hash(serial)
+
+def test_serial_ordering_and_slots():
+    """Test that serials sort by value and carry no instance dict."""
+    serials = [Serial(generate_serial_int()) for _ in range(100)]
+    assert sorted(serials, key=str) == sorted(serials)
+    assert Serial(1) < Serial(2)
+    with pytest.raises(AttributeError):
+        Serial(1).extra = True
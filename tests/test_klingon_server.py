@@ -0,0 +1,58 @@
+"""Tests for the asyncio server in `klingon_serial.server`."""
+import asyncio
+
+import pytest
+from klingon_serial.server import SerialProtocol, start_server
+from klingon_serial.validate import is_serial
+
+
+def exchange(request, response_size=None, max_count=1000):
+    """Start a server, send `request` on one connection and return everything it answers."""
+    async def run():
+        server = await start_server("127.0.0.1", 0, max_count)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            if response_size is None:
+                writer.write_eof()
+                response = await reader.read()
+            else:
+                response = await reader.readexactly(response_size)
+            writer.close()
+            return response
+    return asyncio.run(run())
+
+
+def test_binary_protocol_pipelined():
+    response = exchange((3).to_bytes(4, "big") + (0).to_bytes(4, "big") + (2).to_bytes(4, "big"), 4 + 42 + 4 + 4 + 28)
+    assert int.from_bytes(response[:4], "big") == 3
+    serials = [response[4 + 14 * i:18 + 14 * i].hex() for i in range(3)]
+    assert all(is_serial(serial) for serial in serials)
+    assert response[46:50] == (0).to_bytes(4, "big")
+    assert int.from_bytes(response[50:54], "big") == 2
+    assert len(set(serials + [response[54:68].hex(), response[68:].hex()])) == 5
+
+
+def test_binary_protocol_rejects_large_count():
+    assert exchange((1001).to_bytes(4, "big")) == b""
+
+
+def test_text_protocol_pipelined():
+    lines = exchange(b"2\n\nfoo\n0\n3\n").decode().splitlines()
+    assert lines[3] == "ERR invalid count"
+    serials = lines[:3] + lines[4:]
+    assert len(serials) == 6
+    assert all(is_serial(serial) for serial in serials)
+    assert len(set(serials)) == 6
+
+
+def test_text_protocol_limits():
+    assert exchange(b"1001\n") == b"ERR invalid count\n"
+    assert exchange(b"1" * 20).endswith(b"ERR line too long\n")
+
+
+def test_protocol_max_count():
+    with pytest.raises(ValueError):
+        SerialProtocol(max_count=1 << 24)
@@ -1,9 +1,12 @@
 from klingon_serial.str2bool import str2bool
-from klingon_serial.utils import get_debug, get_mac_address_and_interface
+from klingon_serial.generate import generate_serial, generate_serials, get_process_id
+from klingon_serial import utils
+from klingon_serial.utils import get_debug, get_mac_address_and_interface, parse_serial, parse_serials
 import psutil
 import os
 import platform
 import pytest
+import time
 import unittest.mock
 import uuid
 
@@ -53,3 +56,50 @@ def get_mac_address_and_interface():
                 return addr.address, interface  # Return MAC address and interface name
 
     return None, None  # Return None, None if no suitable interface found
+
+
+def test_parse_serial():
+    """Test that `parse_serial()` recovers the MAC address, process ID and timestamp."""
+    serial = generate_serial()
+    fields = parse_serial(serial)
+    assert fields.mac_address == int(serial[:12], 16)
+    assert fields.process_id == int(get_process_id(), 16)
+    assert fields.timestamp == int(serial[17:], 16)
+    assert fields.sequence == 0
+    assert parse_serial(bytes.fromhex(serial)) == fields
+    assert parse_serial(int(serial, 16)) == fields
+
+
+def test_parse_serial_sequence_bits():
+    """Test that `parse_serial()` splits the timestamp field by sequence bits."""
+    fields = parse_serial("00000000000000001" + f"{(1234 << 3) | 5:011x}", sequence_bits=3)
+    assert fields == (0, 1, 1234, 5)
+
+
+def test_parse_serial_invalid():
+    """Test that `parse_serial()` rejects malformed serials."""
+    with pytest.raises(ValueError):
+        parse_serial("not-a-serial")
+    with pytest.raises(ValueError):
+        parse_serial(b"short")
+
+
+def test_parse_serials_numpy():
+    """Test that `parse_serials()` decodes lists, NumPy arrays and buffers into uint64 columns."""
+    numpy = pytest.importorskip("numpy")
+    serials = generate_serials(1000)
+    expected = [parse_serial(serial) for serial in serials]
+    for source in (serials, numpy.array(serials), "".join(serials).encode()):
+        columns = parse_serials(source)
+        assert columns.timestamp.dtype == numpy.uint64
+        assert list(zip(*(column.tolist() for column in columns))) == expected
+
+
+def test_parse_serials_without_numpy(monkeypatch):
+    """Test that `parse_serials()` falls back to `array` columns without NumPy."""
+    monkeypatch.setattr(utils, "_import_numpy", lambda: None)
+    serials = generate_serials(100)
+    columns = parse_serials(serials)
+    assert list(zip(*columns)) == [parse_serial(serial) for serial in serials]
+    with pytest.raises(ValueError):
+        parse_serials(serials[:-1] + ["z" * 28])
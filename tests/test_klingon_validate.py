@@ -0,0 +1,62 @@
+"""Tests for the validators in `klingon_serial.validate`.
+
+"""
+import time
+
+import pytest
+from klingon_serial.generate import generate_serial, generate_serials, is_valid_serial
+from klingon_serial.utils import validate_serial
+from klingon_serial.validate import is_serial, validate_serials
+
+INVALID_SERIALS = ["", "abc", "g" * 28, "0" * 27, "0" * 29, "0" * 27 + "é", "0" * 27 + " ", None, b"0" * 28]
+
+
+def test_is_serial_valid():
+    """Test that generated serials in either case are valid."""
+    serial = generate_serial()
+    assert is_serial(serial)
+    assert is_serial(serial.upper())
+
+
+def test_is_serial_invalid():
+    """Test that wrong lengths, non-hex characters and non-strings are rejected."""
+    for serial in INVALID_SERIALS:
+        assert is_serial(serial) is False
+
+
+def test_existing_validators_delegate():
+    """Test that `validate_serial()` and `is_valid_serial()` agree with `is_serial()`."""
+    for serial in [generate_serial()] + INVALID_SERIALS:
+        assert validate_serial(serial) == is_valid_serial(serial) == is_serial(serial)
+
+
+def test_is_serial_strict():
+    """Test the timestamp range and process ID width options."""
+    serial = generate_serial()
+    now = time.time_ns() // 1_000_000
+    assert is_serial(serial, timestamp_range=(now - 60_000, now + 60_000_000))
+    assert not is_serial(serial, timestamp_range=(0, now - 60_000))
+    assert is_serial("0" * 12 + "0ffff" + "0" * 11, process_id_bits=16)
+    assert not is_serial("0" * 12 + "10000" + "0" * 11, process_id_bits=16)
+
+
+def test_validate_serials_mask():
+    """Test that `validate_serials()` returns one boolean per input, in order."""
+    serials = generate_serials(1000)
+    assert validate_serials(serials) == [True] * 1000
+    assert validate_serials(iter(serials + INVALID_SERIALS)) == [True] * 1000 + [False] * len(INVALID_SERIALS)
+    assert validate_serials([]) == []
+
+
+def test_validate_serials_numpy():
+    """Test that NumPy string arrays are validated into a boolean mask."""
+    numpy = pytest.importorskip("numpy")
+    serials = generate_serials(1000) + ["g" * 28, "0" * 27, "0" * 29]
+    now = time.time_ns() // 1_000_000
+    mask = validate_serials(numpy.array(serials))
+    assert mask.dtype == bool
+    assert mask.tolist() == [True] * 1000 + [False] * 3
+    strict = validate_serials(numpy.array(serials), timestamp_range=(0, now - 60_000))
+    assert strict.tolist() == validate_serials(serials, timestamp_range=(0, now - 60_000))
+    strict = validate_serials(numpy.array(serials), process_id_bits=1)
+    assert strict.tolist() == validate_serials(serials, process_id_bits=1)
@@ -0,0 +1,109 @@
+"""Tests for worker ID leasing in `klingon_serial.worker`."""
+import multiprocessing
+import os
+import time
+
+import pytest
+from klingon_serial import worker
+from klingon_serial.generate import SerialGenerator, ThreadSafeSerialGenerator, generate_serial
+from klingon_serial.layout import SerialLayout
+from klingon_serial.utils import parse_serial
+from klingon_serial.worker import FileLeaseBackend, LeaseError, WorkerLease
+
+
+@pytest.fixture
+def lease_file(tmp_path):
+    yield str(tmp_path / "leases")
+    worker.release_worker_id()
+
+
+def test_backend_hands_out_lowest_free_ids(lease_file):
+    backend = FileLeaseBackend(lease_file, slots=3)
+    assert [backend.acquire(token, 30) for token in (1, 2, 3)] == [0, 1, 2]
+    with pytest.raises(LeaseError):
+        backend.acquire(4, 30)
+    backend.release(1, 2)
+    assert backend.acquire(5, 30) == 1
+    assert backend.leases() == {0: os.getpid(), 1: os.getpid(), 2: os.getpid()}
+    assert not backend.renew(1, 2, 30)
+    assert backend.renew(1, 5, 30)
+    backend.close()
+
+    reopened = FileLeaseBackend(lease_file, slots=100)
+    assert reopened.slots == 3
+    reopened.close()
+    with open(lease_file, "r+b") as handle:
+        handle.write(b"garbage!")
+    with pytest.raises(LeaseError):
+        FileLeaseBackend(lease_file)
+
+
+def test_expired_leases_are_reclaimed(lease_file):
+    backend = FileLeaseBackend(lease_file, slots=2)
+    lost = []
+    first = WorkerLease(backend, ttl=0.05, on_lost=lost.append)
+    first._stopped.set()  # the owner hangs and stops heartbeating
+    time.sleep(0.1)
+    other = FileLeaseBackend(lease_file)
+    assert other.acquire(99, 30) == first.worker_id == 0
+    assert not first.renew()
+    assert first.worker_id == 1
+    assert first.losses == 1 and lost == [first]
+    other.close()
+    first.release()
+
+
+def test_heartbeat_keeps_lease(lease_file):
+    lease = WorkerLease(FileLeaseBackend(lease_file), ttl=0.06)
+    time.sleep(0.2)
+    backend = FileLeaseBackend(lease_file)
+    assert backend.acquire(7, 30) == 1
+    assert lease.losses == 0
+    backend.close()
+    lease.release()
+
+
+def test_generators_embed_worker_id(lease_file):
+    layout = SerialLayout(process_id_bits=8)
+    narrow = SerialGenerator(layout=layout)
+    threaded = ThreadSafeSerialGenerator(thread_bits=1)
+    lease = worker.lease_worker_id(lease_file, slots=256, ttl=30)
+    assert worker.current_lease() is lease and worker.worker_id() == lease.worker_id == 0
+    assert parse_serial(generate_serial()).process_id == 0
+    assert parse_serial(threaded.generate()).process_id == 0
+    assert layout.parse(narrow.generate()).process_id == 0
+    assert len(narrow.generate()) == 25
+
+    worker.release_worker_id()
+    assert worker.worker_id() == os.getpid()
+    assert parse_serial(generate_serial()).process_id == os.getpid() & 0xFFFFF
+
+
+def test_worker_id_must_fit_the_layout(lease_file):
+    backend = FileLeaseBackend(lease_file, slots=32)
+    for token in range(1, 17):
+        backend.acquire(token, 30)
+    worker.lease_worker_id(backend=lambda: FileLeaseBackend(lease_file))
+    assert worker.worker_id() == 16
+    with pytest.raises(ValueError):
+        SerialGenerator(layout=SerialLayout(process_id_bits=4))
+    backend.close()
+
+
+def _child_worker_id(queue):
+    queue.put((worker.worker_id(), parse_serial(generate_serial()).process_id))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_children_lease_their_own_id(lease_file):
+    worker.lease_worker_id(lease_file)
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    children = [context.Process(target=_child_worker_id, args=(queue,)) for _ in range(3)]
+    for child in children:
+        child.start()
+    results = [queue.get(timeout=10) for _ in children]
+    for child in children:
+        child.join()
+    assert all(leased == embedded for leased, embedded in results)
+    assert sorted(leased for leased, _ in results) == [1, 2, 3]